@@ -1,10 +1,30 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
 from typing import Optional, List, Dict, Any
-from ..utils.stock_predictor import StockPredictor
-from ..routers.stocks import get_historical_data
+from ..utils.stock_predictor import StockPredictor, train_predictor
+from ..utils.fallback import DriftPredictor, fallback_forecast
+from ..utils.batch_ar import batch_forecast
+from ..utils.backtest import backtest
+from ..utils.order_search import ORDER_SEARCH_MODE, ORDER_SEARCH_MODES, TrainingCancelled, make_order_search
+from ..utils.model_cache import model_cache
+from ..utils.model_store import model_store
+from ..utils.executors import run_io, run_model, run_cpu
+from ..utils.bar_store import bar_store
+from ..utils.shared_bars import SharedBars
+from ..utils.snapshots import snapshot_store
+from ..utils.single_flight import SingleFlight
+from ..utils.conditional import bars_etag, make_etag, not_modified
+from ..routers.stocks import fetch_bars
 from pydantic import BaseModel, Field
 from datetime import datetime
+import os
+import time
 import logging
+import asyncio
+import threading
+import json
+import copy
+from contextlib import ExitStack, aclosing
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -12,6 +32,10 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Concurrent requests for the same cache key share one training run; the
+# forecast horizon does not take part since it only affects predict_next_days
+training_flight = SingleFlight("training")
+
 class PredictionItem(BaseModel):
     day: int
     date: str
@@ -30,6 +54,15 @@ class ModelMetrics(BaseModel):
     volatility: float
     last_known_price: float
     last_date: str
+    order: Optional[List[int]] = None
+    order_search: Optional[str] = None
+    order_search_fits: Optional[int] = None
+
+MAX_BATCH_SYMBOLS = 500
+BATCH_ENGINES = ("arima", "batch_ar")
+
+# Default latency budget for /forecast/{symbol} in milliseconds, 0 for none
+FORECAST_DEADLINE_MS = int(os.getenv('FORECAST_DEADLINE_MS', 0))
 
 class PredictionResponse(BaseModel):
     symbol: str
@@ -40,13 +73,240 @@ class PredictionResponse(BaseModel):
     data_points_used: int
     model_metrics: ModelMetrics
     last_updated: str = Field(default_factory=lambda: datetime.now().isoformat())
+    source: str = "live"
+    snapshot_version: Optional[str] = None
+    snapshot_age_seconds: Optional[float] = None
+
+class BatchForecastRequest(BaseModel):
+    symbols: List[str]
+    days: int = 7
+    history_period: str = "5y"
+    interval: str = "1d"
+    search: Optional[str] = None
+    # "arima" fits a model per symbol, "batch_ar" fits ARIMA(p,1,0) models
+    # for all symbols at once with batched NumPy linear algebra
+    engine: str = "arima"
+
+class BatchForecastItem(BaseModel):
+    symbol: str
+    forecast: Optional[PredictionResponse] = None
+    error: Optional[str] = None
+
+class BatchForecastResponse(BaseModel):
+    results: List[BatchForecastItem]
+    succeeded: int
+    failed: int
+
+class BacktestHorizon(BaseModel):
+    horizon: int
+    count: int
+    mae: float
+    rmse: float
+    mape: float
+    bias: float
+    coverage: float
+    mean_width_pct: float
+    naive_mae: float
+    skill: Optional[float] = None
+
+class BacktestResponse(BaseModel):
+    symbol: str
+    training_period: str
+    interval: str
+    order: List[int]
+    search: str
+    observations: int
+    initial: int
+    origins: int
+    horizon: int
+    step: int
+    refits: int
+    per_horizon: List[BacktestHorizon]
+    seconds: float
+
+class BatchBacktestRequest(BaseModel):
+    symbols: List[str]
+    history_period: str = "5y"
+    interval: str = "1d"
+    horizon: int = 30
+    step: int = 1
+    initial: Optional[int] = None
+    refit_every: Optional[int] = None
+    search: Optional[str] = None
+
+class BatchBacktestItem(BaseModel):
+    symbol: str
+    backtest: Optional[BacktestResponse] = None
+    error: Optional[str] = None
+
+class BatchBacktestResponse(BaseModel):
+    results: List[BatchBacktestItem]
+    succeeded: int
+    failed: int
+
+def _check_search_mode(search):
+    """Resolve the requested order search mode, raising 400 for unknown ones"""
+    search = search or ORDER_SEARCH_MODE
+    if search not in ORDER_SEARCH_MODES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"search must be one of: {', '.join(ORDER_SEARCH_MODES)}"
+        )
+    return search
+
+async def _load_stored(cache_key):
+    """Load a persisted model for cache_key into the cache, None if there is none"""
+    predictor = await run_io(model_store.load, cache_key)
+    if predictor is not None:
+        logger.info(f"Loaded stored model for {cache_key[0]}")
+        model_cache.put(cache_key, predictor)
+    return predictor
+
+async def _store(cache_key, predictor):
+    """Cache a compact predictor and persist it for warm restarts"""
+    model_cache.put(cache_key, predictor)
+    try:
+        await run_io(model_store.save, cache_key, predictor)
+    except Exception as e:
+        logger.error(f"Error saving model for {cache_key[0]}: {str(e)}")
+    return predictor
+
+async def _fit_predictor(symbol, bars, history_period, interval, cache_key, search, progress=None):
+    """
+    Train a predictor for bars and cache it, extending an older fit of the
+    same series when one is cached or stored. Runs once per cache key at a
+    time; progress is passed on to StockPredictor.train/update.
+    """
+    stored = await _load_stored(cache_key)
+    if stored is not None:
+        return stored
+
+    previous = model_cache.latest(symbol, history_period, interval, search)
+    if previous is None:
+        previous = await run_io(model_store.latest, symbol, history_period, interval, search)
+    if previous is not None and previous.last_date.strftime('%Y-%m-%d') < bars.last_date:
+        logger.info(f"Updating cached model for {symbol} with new bars")
+        predictor = copy.copy(previous)
+        await run_model(predictor.update, bars, progress)
+    else:
+        logger.info(f"Training model for {symbol}")
+        predictor = StockPredictor(make_order_search(search))
+        await run_model(predictor.train, bars, progress)
+    return await _store(cache_key, predictor.compact())
+
+async def _fit_predictor_on_pool(bars, cache_key, search):
+    """Train a predictor entirely inside a pool worker and cache it"""
+    stored = await _load_stored(cache_key)
+    if stored is not None:
+        return stored
+
+    with SharedBars.create(bars) as shared:
+        predictor = await run_cpu(train_predictor, shared, search)
+    return await _store(cache_key, predictor)
+
+def _check_forecast_request(days, search):
+    """Validate the horizon and resolve the search mode"""
+    if days <= 0 or days > 365:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Forecast days must be between 1 and 365"
+        )
+    return _check_search_mode(search)
+
+async def _snapshot_response(symbol, days, history_period, interval, search):
+    """The precomputed nightly forecast when it covers this request, else None"""
+    # The lookup stats the snapshot pointer and re-reads the document when it changes
+    cached = await run_io(snapshot_store.lookup,symbol, history_period, interval, days, search)
+    if cached is None:
+        return None
+    entry, snapshot, age = cached
+    logger.info(f"Serving {symbol} from snapshot {snapshot['version']}")
+    return PredictionResponse(
+        symbol=symbol.upper(),
+        predictions=entry['predictions'][:days],
+        forecast_days=days,
+        training_period=history_period,
+        data_points_used=entry['data_points_used'],
+        model_metrics=entry['model_metrics'],
+        last_updated=snapshot['created_at'],
+        source="snapshot",
+        snapshot_version=snapshot['version'],
+        snapshot_age_seconds=round(age, 1)
+    )
+
+async def _forecast_bars(symbol, history_period, interval):
+    """Load the history to train on, raising HTTPException when it is unusable"""
+    logger.info(f"Fetching historical data for {symbol}")
+    try:
+        bars = await fetch_bars(symbol, period=history_period, interval=interval)
+    except Exception as e:
+        logger.error(f"Error fetching historical data for {symbol}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+    
+    if len(bars) == 0:
+        logger.error(f"No historical data found for {symbol}")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No historical data found for symbol {symbol}"
+        )
+    
+    # Ensure sufficient historical data
+    if len(bars) < 252:
+        logger.warning(f"Insufficient historical data for {symbol}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Insufficient historical data. Got {len(bars)} days, need at least 252 days."
+        )
+    return bars
+
+async def _forecast_response(symbol, predictor, bars, days, history_period):
+    """Run predictions and metrics for a fitted predictor"""
+    # Generate predictions
+    try:
+        logger.info(f"Generating predictions for {symbol}")
+        predictions = await run_model(predictor.predict_next_days, days=days)
+    except Exception as e:
+        logger.error(f"Error generating predictions for {symbol}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error generating predictions: {str(e)}"
+        )
+    
+    # Get model metrics
+    try:
+        logger.info(f"Calculating model metrics for {symbol}")
+        model_metrics = await run_model(predictor.get_model_metrics)
+    except Exception as e:
+        logger.error(f"Error getting model metrics for {symbol}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error getting model metrics: {str(e)}"
+        )
+    
+    return PredictionResponse(
+        symbol=symbol.upper(),
+        predictions=predictions['predictions'],
+        model_type=predictor.model_type,
+        forecast_days=days,
+        training_period=history_period,
+        data_points_used=len(bars),
+        model_metrics=model_metrics
+    )
 
 @router.get("/forecast/{symbol}", response_model=PredictionResponse)
 async def get_stock_forecast(
+    request: Request,
+    response: Response,
     symbol: str, 
     days: Optional[int] = 7,
     history_period: Optional[str] = "5y",
-    interval: Optional[str] = "1d"
+    interval: Optional[str] = "1d",
+    search: Optional[str] = None,
+    live: Optional[bool] = False,
+    deadline_ms: Optional[int] = None
 ):
     """
     Get stock price predictions for the next n days using ARIMA
@@ -56,90 +316,471 @@ async def get_stock_forecast(
     - days: Number of days to forecast (1-365)
     - history_period: Historical data period (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max)
     - interval: Data interval (1m, 2m, 5m, 15m, 30m, 60m, 90m, 1h, 1d, 5d, 1wk, 1mo, 3mo)
+    - search: ARIMA order search, 'grid' (fixed p<=2, d<=1, q<=2 grid) or
+      'stepwise' (KPSS-chosen d, then neighbouring orders up to p, q <= 5)
+    - live: skip the nightly snapshot and compute the forecast now
+    - deadline_ms: latency budget (default FORECAST_DEADLINE_MS, 0 for none). When
+      no fitted model is ready in time the answer comes from a drift model with
+      the same volatility bands (model_type "drift") while ARIMA training
+      continues in the background for later requests
+
+    Responses carry an ETag tied to the snapshot version or the last bar, so
+    a client revalidating with If-None-Match gets 304 without a model run.
     """
+    started = time.perf_counter()
     try:
         # Input validation
-        if days <= 0 or days > 365:
+        search = _check_forecast_request(days, search)
+        deadline_ms = FORECAST_DEADLINE_MS if deadline_ms is None else deadline_ms
+        if deadline_ms < 0:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Forecast days must be between 1 and 365"
+                detail="deadline_ms must not be negative"
             )
+        response.headers["Cache-Control"] = "no-cache"
+
+        # Serve the precomputed nightly forecast when it covers this request
+        if not live:
+            snapshot = await _snapshot_response(symbol, days, history_period, interval, search)
+            if snapshot is not None:
+                etag = make_etag(
+                    snapshot.snapshot_version, symbol.upper(), days, history_period, interval, search
+                )
+                response.headers["ETag"] = etag
+                return not_modified(request, etag) or snapshot
 
-        logger.info(f"Fetching historical data for {symbol}")
-        stock_data = await get_historical_data(
-            symbol,
-            period=history_period,
-            interval=interval
+        bars = await _forecast_bars(symbol, history_period, interval)
+
+        etag = bars_etag(bars, symbol.upper(), days, history_period, interval, search)
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+        response.headers["ETag"] = etag
+
+        # Reuse a fitted model when the same data was already trained on
+        cache_key = model_cache.make_key(
+            symbol, history_period, interval, bars.last_date, search
         )
-        
-        if not stock_data or 'data' not in stock_data:
-            logger.error(f"No historical data found for {symbol}")
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"No historical data found for symbol {symbol}"
+        predictor = model_cache.get(cache_key)
+
+        if predictor is None:
+            # Training is a shared task that keeps running when the deadline
+            # passes, so it still fills the cache for the next request
+            training = training_flight.start(
+                cache_key, _fit_predictor, symbol, bars, history_period, interval, cache_key, search
             )
-            
-        historical_data = stock_data.get('data', [])
+            try:
+                if deadline_ms:
+                    remaining = deadline_ms / 1000 - (time.perf_counter() - started)
+                    predictor = await asyncio.wait_for(asyncio.shield(training), max(0.0, remaining))
+                else:
+                    predictor = await asyncio.shield(training)
+            except asyncio.TimeoutError:
+                logger.info(f"Deadline of {deadline_ms}ms passed for {symbol}, answering with the fallback model")
+                del response.headers["ETag"]
+                response.headers["Cache-Control"] = "no-store"
+                return await _fallback_response(symbol, bars, days, history_period)
+            except Exception as e:
+                logger.error(f"Error training model for {symbol}: {str(e)}")
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Error training prediction model: {str(e)}"
+                )
+        else:
+            logger.info(f"Using cached model for {symbol}")
         
-        # Ensure sufficient historical data
-        if len(historical_data) < 252:
-            logger.warning(f"Insufficient historical data for {symbol}")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Insufficient historical data. Got {len(historical_data)} days, need at least 252 days."
-            )
+        forecast = await _forecast_response(symbol, predictor, bars, days, history_period)
+        
+        logger.info(f"Successfully generated forecast for {symbol}")
+        return forecast
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error in get_stock_forecast for {symbol}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An unexpected error occurred: {str(e)}"
+        )
+
+async def _fallback_response(symbol, bars, days, history_period):
+    """Forecast from the drift fallback model"""
+    try:
+        # On the I/O lane: the model lane may be busy with the training run being bypassed
+        predictions, model_metrics = await run_io(fallback_forecast, bars, days)
+    except Exception as e:
+        logger.error(f"Error generating fallback predictions for {symbol}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error generating predictions: {str(e)}"
+        )
+    return PredictionResponse(
+        symbol=symbol.upper(),
+        predictions=predictions,
+        model_type=DriftPredictor.model_type,
+        forecast_days=days,
+        training_period=history_period,
+        data_points_used=len(bars),
+        model_metrics=model_metrics
+    )
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
-        # Initialize and train predictor
+async def _train_with_progress(symbol, bars, history_period, interval, cache_key, search):
+    """
+    Train like _fit_predictor, yielding (stage, details) progress events from
+    the training thread and finally ('trained', predictor). The run is
+    registered with training_flight so other requests for the same key join
+    it. If the consumer stops iterating (client disconnect) and nobody has
+    joined, the training run is cancelled at its next progress report, which
+    frees the worker.
+    """
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+    cancelled = threading.Event()
+
+    def progress(stage, details):
+        if cancelled.is_set():
+            raise TrainingCancelled()
+        loop.call_soon_threadsafe(events.put_nowait, (stage, details))
+
+    task = training_flight.start(
+        cache_key, _fit_predictor, symbol, bars, history_period, interval, cache_key, search, progress
+    )
+    try:
+        while not task.done() or not events.empty():
+            getter = asyncio.ensure_future(events.get())
+            await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+            if getter.done():
+                yield getter.result()
+            else:
+                getter.cancel()
+        yield 'trained', task.result()
+    finally:
+        if not task.done() and not training_flight.joined(cache_key):
+            cancelled.set()
+            task.cancel()
+
+@router.get("/forecast/{symbol}/stream")
+async def stream_stock_forecast(
+    symbol: str,
+    days: Optional[int] = 7,
+    history_period: Optional[str] = "5y",
+    interval: Optional[str] = "1d",
+    search: Optional[str] = None,
+    live: Optional[bool] = False
+):
+    """
+    Same forecast as /forecast/{symbol}, streamed as Server-Sent Events.
+    Progress events (started, history_loaded, data_prepared, candidate,
+    order_selected, model_fitted) are sent as each stage finishes, then a
+    forecast event with the PredictionResponse, or an error event. Closing
+    the connection cancels training at the next candidate fit.
+    """
+    search = _check_forecast_request(days, search)
+
+    async def events():
+        yield _sse('started', {'symbol': symbol.upper(), 'days': days})
         try:
-            logger.info(f"Training model for {symbol}")
-            predictor = StockPredictor()
-            predictor.train(historical_data)
+            if not live:
+                response = await _snapshot_response(symbol, days, history_period, interval, search)
+                if response is not None:
+                    yield _sse('forecast', response.model_dump(mode='json'))
+                    return
+
+            bars = await _forecast_bars(symbol, history_period, interval)
+            yield _sse('history_loaded', {'bars': len(bars), 'last_date': bars.last_date})
+
+            cache_key = model_cache.make_key(symbol, history_period, interval, bars.last_date, search)
+            predictor = model_cache.get(cache_key)
+            if predictor is None and training_flight.running(cache_key):
+                # Someone else is already training this model, wait for theirs
+                yield _sse('waiting', {'reason': 'training in progress'})
+                predictor = await training_flight.do(
+                    cache_key, _fit_predictor, symbol, bars, history_period, interval, cache_key, search
+                )
+            elif predictor is None:
+                stages = _train_with_progress(symbol, bars, history_period, interval, cache_key, search)
+                try:
+                    async with aclosing(stages):
+                        async for stage, details in stages:
+                            if stage == 'trained':
+                                predictor = details
+                            else:
+                                yield _sse(stage, details)
+                except Exception as e:
+                    logger.error(f"Error training model for {symbol}: {str(e)}")
+                    raise HTTPException(
+                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                        detail=f"Error training prediction model: {str(e)}"
+                    )
+            else:
+                yield _sse('model_cached', {'order': list(predictor.order)})
+
+            response = await _forecast_response(symbol, predictor, bars, days, history_period)
+            yield _sse('forecast', response.model_dump(mode='json'))
+        except HTTPException as e:
+            yield _sse('error', {'status_code': e.status_code, 'detail': e.detail})
         except Exception as e:
-            logger.error(f"Error training model for {symbol}: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Error training prediction model: {str(e)}"
+            logger.error(f"Unexpected error in stream_stock_forecast for {symbol}: {str(e)}")
+            yield _sse('error', {'status_code': 500, 'detail': f"An unexpected error occurred: {str(e)}"})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _batch_item(symbol, bars, predictions, model_metrics, request, model_type="ARIMA"):
+    return BatchForecastItem(
+        symbol=symbol,
+        forecast=PredictionResponse(
+            symbol=symbol,
+            predictions=predictions['predictions'],
+            model_type=model_type,
+            forecast_days=request.days,
+            training_period=request.history_period,
+            data_points_used=len(bars),
+            model_metrics=model_metrics
+        )
+    )
+
+async def _batch_forecast_one(symbol, bars, request):
+    """Forecast one symbol of a batch, returning its error instead of raising"""
+    try:
+        if isinstance(bars, Exception):
+            raise bars
+        if len(bars) < 252:
+            raise ValueError(f"Insufficient historical data. Got {len(bars)} days, need at least 252 days.")
+
+        cache_key = model_cache.make_key(
+            symbol, request.history_period, request.interval, bars.last_date, request.search
+        )
+        predictor = model_cache.get(cache_key)
+        if predictor is None:
+            predictor = await training_flight.do(
+                cache_key, _fit_predictor_on_pool, bars, cache_key, request.search
             )
-        
-        # Generate predictions
-        try:
-            logger.info(f"Generating predictions for {symbol}")
-            predictions = predictor.predict_next_days(days=days)
-        except Exception as e:
-            logger.error(f"Error generating predictions for {symbol}: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Error generating predictions: {str(e)}"
+
+        predictions = await run_model(predictor.predict_next_days, days=request.days)
+        model_metrics = await run_model(predictor.get_model_metrics)
+
+        return _batch_item(symbol, bars, predictions, model_metrics, request, predictor.model_type)
+    except Exception as e:
+        logger.error(f"Batch forecast failed for {symbol}: {str(e)}")
+        return BatchForecastItem(symbol=symbol, error=str(e))
+
+async def _batch_forecast_vectorized(symbols, bars_by_symbol, request):
+    """All symbols of a batch through the cross-sectional AR engine in one pool task"""
+    usable, results = {}, {}
+    for symbol in symbols:
+        bars = bars_by_symbol[symbol]
+        if isinstance(bars, Exception):
+            results[symbol] = BatchForecastItem(symbol=symbol, error=str(bars))
+        elif len(bars) < 252:
+            results[symbol] = BatchForecastItem(
+                symbol=symbol,
+                error=f"Insufficient historical data. Got {len(bars)} days, need at least 252 days."
             )
-        
-        # Get model metrics
+        else:
+            usable[symbol] = bars
+
+    if usable:
         try:
-            logger.info(f"Calculating model metrics for {symbol}")
-            model_metrics = predictor.get_model_metrics()
+            with ExitStack() as stack:
+                shared = {
+                    symbol: stack.enter_context(SharedBars.create(bars)) for symbol, bars in usable.items()
+                }
+                forecasts = await run_cpu(batch_forecast, shared, request.days)
         except Exception as e:
-            logger.error(f"Error getting model metrics for {symbol}: {str(e)}")
+            logger.error(f"Batch AR forecast failed: {str(e)}")
+            forecasts = {symbol: e for symbol in usable}
+        for symbol, forecast in forecasts.items():
+            if isinstance(forecast, Exception):
+                results[symbol] = BatchForecastItem(symbol=symbol, error=str(forecast))
+            else:
+                results[symbol] = _batch_item(
+                    symbol, usable[symbol], forecast, forecast['model_metrics'], request, "batch_ar"
+                )
+    return [results[symbol] for symbol in symbols]
+
+@router.post("/forecast/batch", response_model=BatchForecastResponse)
+async def get_batch_forecast(request: BatchForecastRequest):
+    """
+    Forecast several symbols in one request. History is fetched in bulk and
+    models are fitted concurrently on the worker pool; a failing symbol gets
+    an error entry without failing the rest of the batch. With engine
+    "batch_ar" every symbol is fitted in one vectorized pass instead.
+    """
+    symbols = list(dict.fromkeys(symbol.upper() for symbol in request.symbols))
+    if not symbols:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one symbol is required"
+        )
+    if len(symbols) > MAX_BATCH_SYMBOLS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_BATCH_SYMBOLS} symbols per batch"
+        )
+    if request.days <= 0 or request.days > 365:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Forecast days must be between 1 and 365"
+        )
+    request.search = _check_search_mode(request.search)
+    if request.engine not in BATCH_ENGINES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"engine must be one of {', '.join(BATCH_ENGINES)}"
+        )
+
+    logger.info(f"Fetching historical data for {len(symbols)} symbols")
+    bars_by_symbol = await run_io(
+        bar_store.get_bars_many, symbols, request.history_period, request.interval
+    )
+
+    if request.engine == "batch_ar":
+        results = await _batch_forecast_vectorized(symbols, bars_by_symbol, request)
+    else:
+        results = await asyncio.gather(*[
+            _batch_forecast_one(symbol, bars_by_symbol[symbol], request)
+            for symbol in symbols
+        ])
+
+    failed = sum(1 for item in results if item.error is not None)
+    return BatchForecastResponse(
+        results=results,
+        succeeded=len(results) - failed,
+        failed=failed
+    )
+
+def _check_backtest_request(horizon, step, initial, refit_every, search):
+    if horizon <= 0 or horizon > 365:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Backtest horizon must be between 1 and 365"
+        )
+    if step <= 0 or (refit_every is not None and refit_every <= 0) or (initial is not None and initial < 252):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="step and refit_every must be positive and initial at least 252"
+        )
+    return _check_search_mode(search)
+
+@router.get("/backtest/{symbol}", response_model=BacktestResponse)
+async def get_backtest(
+    symbol: str,
+    history_period: Optional[str] = "5y",
+    interval: Optional[str] = "1d",
+    horizon: Optional[int] = 30,
+    step: Optional[int] = 1,
+    initial: Optional[int] = None,
+    refit_every: Optional[int] = None,
+    search: Optional[str] = None
+):
+    """
+    Walk-forward backtest of the forecast model over the history
+
+    Parameters:
+    - horizon: Days ahead evaluated from every origin (1-365)
+    - step: Distance in days between forecast origins
+    - initial: Observations used to choose the order and fit first (default a third, at least 252)
+    - refit_every: Re-estimate parameters every this many days; by default they are
+      fitted once and the filter state is carried forward
+    - search: ARIMA order search mode, as for /forecast/{symbol}
+    """
+    try:
+        search = _check_backtest_request(horizon, step, initial, refit_every, search)
+        bars = await _forecast_bars(symbol, history_period, interval)
+
+        # Segments between refits go to the process pool from the model lane
+        try:
+            result = await run_model(backtest, bars, horizon, step, initial, refit_every, search)
+        except ValueError as e:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Error getting model metrics: {str(e)}"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
             )
-        
-        response = PredictionResponse(
+        return BacktestResponse(
             symbol=symbol.upper(),
-            predictions=predictions,
-            forecast_days=days,
             training_period=history_period,
-            data_points_used=len(historical_data),
-            model_metrics=model_metrics
+            interval=interval,
+            **result
         )
-        
-        logger.info(f"Successfully generated forecast for {symbol}")
-        return response
-        
+
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Unexpected error in get_stock_forecast for {symbol}: {str(e)}")
+        logger.error(f"Unexpected error in get_backtest for {symbol}: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An unexpected error occurred: {str(e)}"
         )
+
+async def _batch_backtest_one(symbol, bars, request):
+    """Backtest one symbol of a batch on a pool worker, returning its error instead of raising"""
+    try:
+        if isinstance(bars, Exception):
+            raise bars
+        result = await run_cpu(
+            backtest, bars, request.horizon, request.step, request.initial, request.refit_every, request.search
+        )
+        return BatchBacktestItem(
+            symbol=symbol,
+            backtest=BacktestResponse(
+                symbol=symbol,
+                training_period=request.history_period,
+                interval=request.interval,
+                **result
+            )
+        )
+    except Exception as e:
+        logger.error(f"Batch backtest failed for {symbol}: {str(e)}")
+        return BatchBacktestItem(symbol=symbol, error=str(e))
+
+@router.post("/backtest/batch", response_model=BatchBacktestResponse)
+async def get_batch_backtest(request: BatchBacktestRequest):
+    """
+    Backtest several symbols, one per process pool worker. A failing symbol
+    gets an error entry without failing the rest of the batch.
+    """
+    symbols = list(dict.fromkeys(symbol.upper() for symbol in request.symbols))
+    if not symbols:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one symbol is required"
+        )
+    if len(symbols) > MAX_BATCH_SYMBOLS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_BATCH_SYMBOLS} symbols per batch"
+        )
+    request.search = _check_backtest_request(
+        request.horizon, request.step, request.initial, request.refit_every, request.search
+    )
+
+    bars_by_symbol = await run_io(
+        bar_store.get_bars_many, symbols, request.history_period, request.interval
+    )
+    with ExitStack() as stack:
+        for symbol, bars in bars_by_symbol.items():
+            if not isinstance(bars, Exception):
+                bars_by_symbol[symbol] = stack.enter_context(SharedBars.create(bars))
+        results = await asyncio.gather(*[
+            _batch_backtest_one(symbol, bars_by_symbol[symbol], request)
+            for symbol in symbols
+        ])
+
+    failed = sum(1 for item in results if item.error is not None)
+    return BatchBacktestResponse(
+        results=results,
+        succeeded=len(results) - failed,
+        failed=failed
+    )
+
+@router.get("/cache/stats")
+async def get_model_cache_stats():
+    """Hit, miss and eviction counters for the fitted model cache"""
+    return model_cache.stats()
@@ -1,74 +1,88 @@
-from fastapi import APIRouter, HTTPException
-import yfinance as yf
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse
 from typing import List, Optional
 from datetime import datetime, timedelta
-import requests
+from ..utils.bar_store import bar_store
+from ..utils.bars import Bars
+from ..utils.executors import run_io
+from ..utils.logo_resolver import logo_resolver
+from ..utils.single_flight import SingleFlight
+from ..utils.metrics import stage_seconds
+from ..utils.lazy_imports import lazy_module
+from ..utils.conditional import bars_etag, not_modified
 
 router = APIRouter()
 
-def get_logo_url(symbol: str) -> str:
+yf = lazy_module('yfinance')
+
+history_flight = SingleFlight("history")
+
+def get_logo_url(symbol: str, info: Optional[dict] = None) -> Optional[str]:
     """Get company logo URL using multiple sources"""
     try:
-        # Try multiple sources for logos
-        sources = [
-            f"https://logo.clearbit.com/{yf.Ticker(symbol).info.get('website', '').replace('http://', '').replace('https://', '').split('/')[0]}",
-            f"https://storage.googleapis.com/iex/api/logos/{symbol.lower()}.png",
-            f"https://companieslogo.com/img/orig/{symbol}.D-93b0e5e0.png",
-            f"https://companiesmarketcap.com/img/company-logos/64/{symbol}.png"
-        ]
-        
-        # Return the first working URL
-        for url in sources:
-            try:
-                response = requests.head(url, timeout=2)
-                if response.status_code == 200:
-                    return url
-            except:
-                continue
-                
-        return None
-    except:
+        return logo_resolver.resolve(symbol, info)
+    except Exception:
         return None
 
+def load_bars(symbol: str, period: str = "1y", interval: str = "1d") -> Bars:
+    """Historical bars for a symbol in columnar form"""
+    with stage_seconds.time(stage='data_fetch'):
+        return bar_store.get_bars(symbol, period=period, interval=interval)
+
+async def fetch_bars(symbol: str, period: str = "1y", interval: str = "1d") -> Bars:
+    """Load bars off the event loop, sharing one load between concurrent identical requests"""
+    return await history_flight.do(
+        (symbol.upper(), period, interval),
+        run_io, load_bars, symbol, period=period, interval=interval
+    )
+
 @router.get("/historical/{symbol}")
 async def get_historical_data(
+    request: Request,
     symbol: str,
     period: Optional[str] = "1y",
-    interval: Optional[str] = "1d"
+    interval: Optional[str] = "1d",
+    format: Optional[str] = "records"
 ):
-    """Get historical stock data for a given symbol"""
+    """
+    Get historical stock data for a given symbol
+
+    - format: "records" for one object per bar, "columnar" for one array per field
+
+    The ETag changes with the last bar, so clients revalidating with
+    If-None-Match get 304 Not Modified until new data arrives.
+    """
     try:
-        stock = yf.Ticker(symbol)
-        hist = stock.history(period=period, interval=interval)
-        
-        # Reset index to make date a column and sort by date
-        hist = hist.reset_index()
-        hist = hist.sort_values('Date', ascending=True)
-        
-        formatted_data = []
-        for _, row in hist.iterrows():
-            try:
-                record = {
-                    'date': row['Date'].strftime('%Y-%m-%d'),
-                    'open': float(row['Open']),
-                    'high': float(row['High']),
-                    'low': float(row['Low']),
-                    'close': float(row['Close']),
-                    'volume': int(row['Volume']),
-                }
-                formatted_data.append(record)
-            except Exception as e:
-                print(f"Error formatting record: {row}, Error: {str(e)}")
-                continue
+        if format not in ("records", "columnar"):
+            raise HTTPException(status_code=400, detail="format must be 'records' or 'columnar'")
+
+        bars = await fetch_bars(symbol, period=period, interval=interval)
         
-        if not formatted_data:
+        if len(bars) == 0:
             raise HTTPException(status_code=500, detail="Failed to format any records")
+
+        etag = bars_etag(bars, symbol.upper(), period, interval, format)
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+
+        if format == "columnar":
+            content = {
+                "symbol": symbol.upper(),
+                "format": "columnar",
+                "data": await run_io(bars.to_columns)
+            }
+        else:
+            content = {
+                "symbol": symbol.upper(),
+                "data": await run_io(bars.to_records)
+            }
+
+        # The content is plain lists of str/float/int, so skip jsonable_encoder
+        return JSONResponse(content, headers={"ETag": etag, "Cache-Control": "no-cache"})
             
-        return {
-            "symbol": symbol.upper(),
-            "data": formatted_data
-        }
-            
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error fetching historical data: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -79,11 +93,10 @@ async def get_stock_info(symbol: str):
     Get basic information about a stock
     """
     try:
-        stock = yf.Ticker(symbol)
-        info = stock.info
+        info = await run_io(lambda: yf.Ticker(symbol).info)
         
         # Add logo URL to the response
-        info['logoUrl'] = get_logo_url(symbol)
+        info['logoUrl'] = await run_io(get_logo_url, symbol, info)
         
         return {
             "symbol": symbol.upper(),
@@ -0,0 +1,179 @@
+import time
+import logging
+import numpy as np
+from .executors import CPU_WORKERS, submit_cpu
+from .model_artifact import CompactARIMA
+from .order_search import fit_model, make_order_search
+from .stock_predictor import StockPredictor, forecast_table
+from .training_data import trading_closes
+from .bars import as_bars
+
+logger = logging.getLogger(__name__)
+
+
+# Fewest origins worth sending to a worker of their own
+MIN_ORIGINS_PER_TASK = 64
+
+
+def _segment_states(prices, order, start, origins, horizon, fit_start=0):
+    """
+    Fit order on prices[fit_start:start] once, then run the Kalman filter
+    forward and forecast from every origin (origin t has seen prices[:t],
+    t >= start). Returns the (origins, horizon) forecast means, the residual
+    sum and sum of squares as they stood at each origin, and the number of
+    fitted parameters. fit_start is where the training window ending at
+    start begins.
+    """
+    fit_prices = prices[fit_start:start]
+    model = CompactARIMA.from_results(fit_model(fit_prices, order), fit_prices)
+    _, _, _, errors, states = model.filter(prices[start:origins[-1]], keep_states=True)
+    offsets = origins - start
+    means = model.forecast_from(states[offsets], horizon)
+    cumulative = np.concatenate([[0.0], np.cumsum(errors)])[offsets] + model.sums['resid_sum']
+    cumulative_sq = np.concatenate([[0.0], np.cumsum(errors**2)])[offsets] + model.sums['resid_sq_sum']
+    return means, cumulative, cumulative_sq, model.k
+
+
+def _origin_bounds(prices, origins, means, cumulative, cumulative_sq, k, bar_step=1, fit_start=0):
+    """
+    Served predictions and bounds from the forecast means and residual sums
+    _segment_states carried to each origin. Origins are independent, so any
+    slice of them can be computed on its own worker. bar_step is the
+    predictor's spacing of observations in business days.
+    """
+    predictor = StockPredictor()
+    predictor.step = bar_step
+    # Observations the model has filtered by each origin
+    seen = (origins - fit_start)[:, None].astype(float)
+    residual_mean = cumulative[:, None] / seen
+    residual_std = np.sqrt(np.maximum(0.0, cumulative_sq[:, None] / seen - residual_mean**2))
+    volatility = np.array([[predictor.calculate_volatility(prices[:t])] for t in origins])
+    table = forecast_table(
+        means, np.sqrt(cumulative_sq[:, None] / seen), seen, seen - k, volatility,
+        residual_mean, residual_std, predictor.periods_per_year
+    )
+    return table['predicted_price'], table['lower_bound'], table['upper_bound']
+
+
+def _segment_forecasts(prices, order, start, origins, horizon, bar_step=1, fit_start=0):
+    """
+    Forecasts from every origin of one segment in a single process. Returns
+    (predicted, lower, upper) arrays of shape (origins, horizon) with the same
+    bounds predict_next_days would serve at each origin.
+    """
+    means, cumulative, cumulative_sq, k = _segment_states(prices, order, start, origins, horizon, fit_start)
+    return _origin_bounds(prices, origins, means, cumulative, cumulative_sq, k, bar_step, fit_start)
+
+
+def _origin_chunks(count, workers):
+    """Split count origins into contiguous slices, one per worker at most"""
+    chunks = max(1, min(workers, count // MIN_ORIGINS_PER_TASK))
+    bounds = np.linspace(0, count, chunks + 1).astype(int)
+    return [slice(lo, hi) for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+
+def horizon_metrics(prices, origins, predicted, lower, upper):
+    """Out-of-sample error and interval coverage for every forecast horizon"""
+    horizon = predicted.shape[1]
+    targets = origins[:, None] + np.arange(horizon)[None, :]
+    valid = targets < len(prices)
+    actual = np.where(valid, prices[np.minimum(targets, len(prices) - 1)], np.nan)
+    naive = prices[origins - 1][:, None]
+
+    rows = []
+    for h in range(horizon):
+        mask = valid[:, h]
+        if not mask.any():
+            break
+        a = actual[mask, h]
+        error = predicted[mask, h] - a
+        naive_mae = float(np.mean(np.abs(naive[mask, 0] - a)))
+        mae = float(np.mean(np.abs(error)))
+        rows.append({
+            'horizon': h + 1,
+            'count': int(mask.sum()),
+            'mae': mae,
+            'rmse': float(np.sqrt(np.mean(error**2))),
+            'mape': float(np.mean(np.abs(error) / a) * 100),
+            'bias': float(np.mean(error)),
+            'coverage': float(np.mean((lower[mask, h] <= a) & (a <= upper[mask, h]))),
+            'mean_width_pct': float(np.mean((upper[mask, h] - lower[mask, h]) / a) * 100),
+            'naive_mae': naive_mae,
+            'skill': float(1 - mae / naive_mae) if naive_mae > 0 else None,
+        })
+    return rows
+
+
+def backtest(historical_data, horizon=30, step=1, initial=None, refit_every=None, search=None, window=None):
+    """
+    Rolling-origin evaluation of StockPredictor on a price history.
+
+    The order is chosen once on the first initial observations. Parameters
+    are fitted on the initial window and, with refit_every, re-estimated for
+    that order every refit_every observations; between refits the Kalman
+    state is carried forward over the actual prices instead of refitting.
+    Each segment between refits is fitted and filtered on the process pool,
+    then its origins are split across the pool with the filter state and
+    residual sums carried to each of them. Forecasts are made from every
+    step-th origin up to horizon days ahead.
+
+    The whole history is evaluated. The training window (window, by default
+    the one StockPredictor uses) only bounds what each fit sees: the order
+    search and every segment fit use the window ending at their start.
+    """
+    started = time.perf_counter()
+    try:
+        predictor = StockPredictor(make_order_search(search), window=window)
+        prices, dates, predictor.step = trading_closes(as_bars(historical_data))
+        window = predictor.window
+        n = len(prices)
+        initial = initial or max(252, n // 3)
+        if n - initial < horizon:
+            raise ValueError(
+                f"Need more than {initial + horizon} observations for initial={initial} "
+                f"and horizon={horizon}, got {n}"
+            )
+
+        order = predictor.find_best_parameters(prices[window.start(dates[:initial]):initial])
+        origins = np.arange(initial, n, step)
+        starts = list(range(initial, n, refit_every)) if refit_every else [initial]
+
+        segments = []
+        for i, start in enumerate(starts):
+            end = starts[i + 1] if i + 1 < len(starts) else n
+            segment = origins[(origins >= start) & (origins < end)]
+            if len(segment):
+                fit_start = window.start(dates[:start])
+                segments.append((segment, fit_start, submit_cpu(
+                    _segment_states, prices, order, start, segment, horizon, fit_start
+                )))
+
+        futures = []
+        for segment, fit_start, states in segments:
+            means, cumulative, cumulative_sq, k = states.result()
+            for chunk in _origin_chunks(len(segment), CPU_WORKERS):
+                futures.append((segment[chunk], submit_cpu(
+                    _origin_bounds, prices[:segment[chunk][-1]], segment[chunk], means[chunk],
+                    cumulative[chunk], cumulative_sq[chunk], k, predictor.step, fit_start
+                )))
+
+        parts = [(segment, future.result()) for segment, future in futures]
+        origins = np.concatenate([segment for segment, _ in parts])
+        predicted, lower, upper = (np.concatenate([part[i] for _, part in parts]) for i in range(3))
+
+        return {
+            'order': list(order),
+            'search': predictor.order_search.mode,
+            'observations': n,
+            'initial': initial,
+            'origins': len(origins),
+            'horizon': horizon,
+            'step': step,
+            'refits': len(segments),
+            'per_horizon': horizon_metrics(prices, origins, predicted, lower, upper),
+            'seconds': round(time.perf_counter() - started, 3),
+        }
+
+    except Exception as e:
+        logger.error(f"Error in backtest: {str(e)}")
+        raise ValueError(f"Error running backtest: {str(e)}")
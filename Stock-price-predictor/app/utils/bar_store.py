@@ -0,0 +1,292 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+import numpy as np
+from .bars import Bars
+from .lazy_imports import lazy_module
+
+pd = lazy_module('pandas')
+yf = lazy_module('yfinance')
+
+logger = logging.getLogger(__name__)
+
+BAR_STORE_DIR = os.getenv('BAR_STORE_DIR', 'data/bars')
+
+# Minimum seconds between tail fetches for the same symbol and interval
+BAR_REFRESH_SECONDS = int(os.getenv('BAR_REFRESH_SECONDS', 300))
+
+# Period and interval values yfinance accepts
+PERIODS = ('1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'ytd', 'max')
+INTERVALS = ('1m', '2m', '5m', '15m', '30m', '60m', '90m', '1h', '1d', '5d', '1wk', '1mo', '3mo')
+
+
+class YFinanceProvider:
+    """Market data provider backed by yfinance"""
+
+    def history(self, symbol, interval, period=None, start=None):
+        """
+        Return OHLCV bars as a DataFrame indexed by timestamp with Open, High,
+        Low, Close and Volume columns. Either a yfinance period or a start
+        date is given.
+        """
+        ticker = yf.Ticker(symbol)
+        if start is not None:
+            return ticker.history(start=start, interval=interval)
+        return ticker.history(period=period, interval=interval)
+
+    def history_many(self, symbols, interval, period=None, start=None):
+        """Bulk download for several symbols, returns {symbol: DataFrame}"""
+        data = yf.download(
+            symbols,
+            period=None if start is not None else period,
+            start=start,
+            interval=interval,
+            group_by='ticker',
+            auto_adjust=True,
+            threads=True,
+            progress=False
+        )
+        frames = {}
+        for symbol in symbols:
+            if isinstance(data.columns, pd.MultiIndex):
+                if symbol not in data.columns.get_level_values(0):
+                    continue
+                df = data[symbol]
+            else:
+                df = data
+            frames[symbol] = df.dropna(how='all')
+        return frames
+
+
+def period_start(period, now=None):
+    """Translate a yfinance period string into the first timestamp it covers, None for 'max'"""
+    now = now if now is not None else pd.Timestamp.now()
+    today = now.normalize()
+
+    if period == 'max':
+        return None
+    if period == 'ytd':
+        return pd.Timestamp(year=today.year, month=1, day=1)
+
+    if period.endswith('mo'):
+        return today - pd.DateOffset(months=int(period[:-2]))
+    if period.endswith('wk'):
+        return today - pd.DateOffset(weeks=int(period[:-2]))
+    if period.endswith('y'):
+        return today - pd.DateOffset(years=int(period[:-1]))
+    if period.endswith('d'):
+        # yfinance counts day periods in trading days
+        return today - pd.offsets.BDay(int(period[:-1]))
+
+    raise ValueError(f"Unsupported period: {period}")
+
+
+def _to_epoch_seconds(index):
+    """Naive exchange-local timestamps as int64 seconds"""
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.values.astype('datetime64[s]').astype(np.int64)
+
+
+class BarStore:
+    """
+    Persistent OHLCV store with one SQLite file per symbol and interval.
+
+    Reads are served from disk. The provider is only called for the missing
+    tail since the last stored bar (at most once per refresh_seconds), or for
+    a full download when the requested period reaches further back than what
+    has been stored so far.
+    """
+
+    def __init__(self, root=BAR_STORE_DIR, provider=None, refresh_seconds=BAR_REFRESH_SECONDS):
+        self.root = root
+        self.provider = provider or YFinanceProvider()
+        self.refresh_seconds = refresh_seconds
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _path(self, symbol, interval):
+        return os.path.join(self.root, f"{symbol.upper()}_{interval}.sqlite")
+
+    def _lock(self, path):
+        with self._locks_guard:
+            return self._locks.setdefault(path, threading.Lock())
+
+    def _connect(self, path):
+        os.makedirs(self.root, exist_ok=True)
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS bars ("
+            "ts INTEGER PRIMARY KEY, open REAL, high REAL, low REAL, close REAL, volume INTEGER)"
+        )
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        return conn
+
+    @staticmethod
+    def _get_meta(conn, key):
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _set_meta(conn, key, value):
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    @staticmethod
+    def _upsert(conn, df):
+        if df is None or df.empty:
+            return 0
+        df = df.dropna(subset=['Close'])
+        rows = zip(
+            _to_epoch_seconds(df.index).tolist(),
+            df['Open'].astype(float).tolist(),
+            df['High'].astype(float).tolist(),
+            df['Low'].astype(float).tolist(),
+            df['Close'].astype(float).tolist(),
+            df['Volume'].fillna(0).astype(np.int64).tolist(),
+        )
+        conn.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?)", rows)
+        return len(df)
+
+    @staticmethod
+    def _covers(coverage, start_ts):
+        if coverage is None:
+            return False
+        if coverage == 'max':
+            return True
+        return start_ts is not None and int(coverage) <= start_ts
+
+    def _plan(self, conn, start_ts):
+        """Decide what a read needs from the provider: ('full', None), ('tail', start) or (None, None)"""
+        if not self._covers(self._get_meta(conn, 'coverage_start'), start_ts):
+            return 'full', None
+        checked_at = float(self._get_meta(conn, 'checked_at') or 0)
+        if time.time() - checked_at < self.refresh_seconds:
+            return None, None
+        last_ts = conn.execute("SELECT MAX(ts) FROM bars").fetchone()[0]
+        if last_ts is None:
+            return 'full', None
+        # Refetch from the last stored bar, it may have been partial
+        return 'tail', pd.Timestamp(last_ts, unit='s').strftime('%Y-%m-%d')
+
+    def _record_fetch(self, conn, kind, fetched, start_ts):
+        self._upsert(conn, fetched)
+        if kind == 'full':
+            coverage = self._get_meta(conn, 'coverage_start')
+            if start_ts is None:
+                coverage = 'max'
+            elif coverage is None or start_ts < int(coverage):
+                coverage = start_ts
+            self._set_meta(conn, 'coverage_start', coverage)
+        self._set_meta(conn, 'checked_at', time.time())
+        conn.commit()
+
+    def get_bars(self, symbol, period='1y', interval='1d'):
+        """Return bars for the period as columnar Bars"""
+        path = self._path(symbol, interval)
+        start = period_start(period)
+        start_ts = int(start.timestamp()) if start is not None else None
+
+        with self._lock(path):
+            conn = self._connect(path)
+            try:
+                kind, tail_start = self._plan(conn, start_ts)
+                if kind == 'full':
+                    logger.info(f"Downloading {period} of {interval} bars for {symbol}")
+                    fetched = self.provider.history(symbol, interval, period=period)
+                    self._record_fetch(conn, kind, fetched, start_ts)
+                elif kind == 'tail':
+                    logger.info(f"Fetching {interval} bars for {symbol} since {tail_start}")
+                    fetched = self.provider.history(symbol, interval, start=tail_start)
+                    self._record_fetch(conn, kind, fetched, start_ts)
+                return self._read(conn, start_ts)
+            finally:
+                conn.close()
+
+    def get_bars_many(self, symbols, period='1y', interval='1d'):
+        """
+        Bars for several symbols. Missing data is downloaded with one bulk call
+        for full histories and one for tails when the provider has history_many,
+        otherwise symbol by symbol. Returns {symbol: Bars or Exception}.
+        """
+        if not hasattr(self.provider, 'history_many'):
+            results = {}
+            for symbol in symbols:
+                try:
+                    results[symbol] = self.get_bars(symbol, period=period, interval=interval)
+                except Exception as e:
+                    results[symbol] = e
+            return results
+
+        start = period_start(period)
+        start_ts = int(start.timestamp()) if start is not None else None
+
+        plans = {}
+        for symbol in symbols:
+            conn = self._connect(self._path(symbol, interval))
+            try:
+                plans[symbol] = self._plan(conn, start_ts)
+            finally:
+                conn.close()
+
+        full = [symbol for symbol, (kind, _) in plans.items() if kind == 'full']
+        tails = {symbol: tail_start for symbol, (kind, tail_start) in plans.items() if kind == 'tail'}
+
+        fetched = {}
+        try:
+            if full:
+                logger.info(f"Downloading {period} of {interval} bars for {len(full)} symbols")
+                fetched.update(self.provider.history_many(full, interval, period=period))
+            if tails:
+                logger.info(f"Fetching {interval} bar tails for {len(tails)} symbols")
+                fetched.update(self.provider.history_many(list(tails), interval, start=min(tails.values())))
+        except Exception as e:
+            logger.warning(f"Bulk download failed, fetching symbols one by one: {str(e)}")
+            fetched = {}
+
+        results = {}
+        for symbol in symbols:
+            kind = plans[symbol][0]
+            try:
+                if kind is not None and symbol not in fetched:
+                    # Not part of a successful bulk download, fetch it alone
+                    results[symbol] = self.get_bars(symbol, period=period, interval=interval)
+                    continue
+                path = self._path(symbol, interval)
+                with self._lock(path):
+                    conn = self._connect(path)
+                    try:
+                        if kind is not None:
+                            self._record_fetch(conn, kind, fetched[symbol], start_ts)
+                        results[symbol] = self._read(conn, start_ts)
+                    finally:
+                        conn.close()
+            except Exception as e:
+                results[symbol] = e
+        return results
+
+    @staticmethod
+    def _read(conn, start_ts=None):
+        query = "SELECT ts, open, high, low, close, volume FROM bars"
+        params = ()
+        if start_ts is not None:
+            query += " WHERE ts >= ?"
+            params = (start_ts,)
+        rows = conn.execute(query + " ORDER BY ts", params).fetchall()
+
+        if not rows:
+            return Bars.empty()
+
+        values = np.array(rows, dtype=float)
+        return Bars(
+            values[:, 0].astype(np.int64).astype('datetime64[s]'),
+            values[:, 1],
+            values[:, 2],
+            values[:, 3],
+            values[:, 4],
+            values[:, 5],
+        )
+
+bar_store = BarStore()
@@ -0,0 +1,105 @@
+import numpy as np
+from .lazy_imports import lazy_module
+
+pd = lazy_module('pandas')
+
+FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+
+class Bars:
+    """
+    Columnar OHLCV bars: a sorted datetime64 index plus one NumPy array per
+    field. This is the internal representation shared by the historical data
+    endpoint and StockPredictor, so neither has to go through per-row dicts.
+    """
+
+    __slots__ = ('index', 'open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, index, open, high, low, close, volume):
+        self.index = np.asarray(index, dtype='datetime64[s]')
+        self.open = np.asarray(open, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.close = np.asarray(close, dtype=np.float64)
+        self.volume = np.asarray(volume, dtype=np.int64)
+
+    @classmethod
+    def empty(cls):
+        return cls(*([[]] * 6))
+
+    @classmethod
+    def from_frame(cls, df):
+        """Build from a yfinance-style frame (timestamp index, capitalised columns)"""
+        df = df.dropna(subset=['Close']).sort_index()
+        index = pd.DatetimeIndex(df.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        return cls(
+            index.values,
+            df['Open'].values,
+            df['High'].values,
+            df['Low'].values,
+            df['Close'].values,
+            df['Volume'].fillna(0).values,
+        )
+
+    @classmethod
+    def from_records(cls, records):
+        """Build from the list-of-dicts format returned by get_historical_data"""
+        if not records:
+            return cls.empty()
+        index = pd.to_datetime([record['date'] for record in records]).values
+        columns = {
+            field: np.fromiter((record[field] for record in records), dtype=float, count=len(records))
+            for field in FIELDS
+        }
+        order = np.argsort(index, kind='stable')
+        return cls(index[order], *(columns[field][order] for field in FIELDS))
+
+    def __len__(self):
+        return len(self.close)
+
+    @property
+    def is_intraday(self):
+        return bool(len(self)) and bool(np.any(self.index != self.index.astype('datetime64[D]')))
+
+    @property
+    def last_date(self):
+        """Date of the last bar as YYYY-MM-DD"""
+        return str(self.index[-1].astype('datetime64[D]'))
+
+    def date_strings(self):
+        """ISO dates for daily bars, ISO timestamps for intraday bars"""
+        unit = 's' if self.is_intraday else 'D'
+        return np.datetime_as_string(self.index, unit=unit)
+
+    def to_records(self):
+        """Row format: one dict per bar"""
+        return [
+            {'date': date, 'open': o, 'high': h, 'low': l, 'close': c, 'volume': v}
+            for date, o, h, l, c, v in zip(
+                self.date_strings().tolist(),
+                self.open.tolist(),
+                self.high.tolist(),
+                self.low.tolist(),
+                self.close.tolist(),
+                self.volume.tolist(),
+            )
+        ]
+
+    def to_columns(self):
+        """Columnar format: one list per field"""
+        columns = {'date': self.date_strings().tolist()}
+        columns.update({field: getattr(self, field).tolist() for field in FIELDS})
+        return columns
+
+    def to_series(self, field='close'):
+        """A single field as a pandas Series indexed by timestamp"""
+        return pd.Series(getattr(self, field), index=pd.DatetimeIndex(self.index))
+
+
+def as_bars(historical_data):
+    """Accept either Bars or the list-of-dicts format"""
+    if isinstance(historical_data, Bars):
+        return historical_data
+    return Bars.from_records(historical_data)
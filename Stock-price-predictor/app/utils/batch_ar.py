@@ -0,0 +1,192 @@
+import os
+import logging
+import numpy as np
+from .bars import as_bars
+from .stock_predictor import forecast_table
+from .training_data import TrainingWindow, trading_closes
+from .volatility import TRADING_DAYS, RISKMETRICS_LAMBDA, ewma_horizon
+
+logger = logging.getLogger(__name__)
+
+# Highest AR order tried per symbol; each symbol keeps the order with the lowest AIC
+BATCH_AR_MAX_P = int(os.getenv('BATCH_AR_MAX_P', 3))
+BATCH_AR_MIN_OBSERVATIONS = 60
+
+
+def stack_series(series):
+    """Right-align 1-D arrays into one (symbols, length) array, NaN-padded on the left"""
+    length = max(len(values) for values in series)
+    stacked = np.full((len(series), length), np.nan)
+    for row, values in enumerate(series):
+        stacked[row, length - len(values):] = values
+    return stacked
+
+
+def fit_ar(diffs, p, max_p):
+    """
+    Conditional least squares fit of an AR(p) with constant to every row of
+    diffs at once, on the observations after the first max_p so that fits of
+    different orders are comparable. Padding (NaN) rows are masked out.
+    Returns (params (symbols, p + 1), resid (symbols, T) with NaN where
+    masked, llf (symbols,)).
+    """
+    length = diffs.shape[1]
+    y = diffs[:, max_p:]
+    columns = [np.ones_like(y)] + [diffs[:, max_p - lag:length - lag] for lag in range(1, p + 1)]
+    X = np.stack(columns, axis=2)
+    # Padding is leading, so a row is usable when its deepest lag (max_p) is
+    valid = ~np.isnan(diffs[:, :length - max_p]) & ~np.isnan(y)
+    X = np.where(valid[..., None], X, 0.0)
+    y = np.where(valid, y, 0.0)
+
+    # Normal equations for every symbol in one batched solve; pinv keeps flat
+    # series (singular X'X) from failing the whole batch
+    Xt = X.transpose(0, 2, 1)
+    params = (np.linalg.pinv(Xt @ X) @ (Xt @ y[..., None]))[..., 0]
+
+    resid = np.where(valid, y - (X @ params[..., None])[..., 0], np.nan)
+    n = valid.sum(axis=1)
+    sigma2 = np.nansum(resid**2, axis=1) / n
+    llf = -0.5 * n * (np.log(2 * np.pi * np.maximum(sigma2, 1e-300)) + 1)
+    return params, resid, llf
+
+
+def batch_volatility(prices, periods_per_year, window=30, lambda_param=RISKMETRICS_LAMBDA):
+    """
+    calculate_volatility for every row of prices at once: rolling-window and
+    RiskMetrics EWMA volatilities, annualized per row and combined the same way
+    """
+    returns = np.diff(prices, axis=1) / prices[:, :-1]
+    hist_vol = np.nanstd(returns[:, -window:], axis=1, ddof=1) * np.sqrt(periods_per_year)
+
+    tail = returns[:, -ewma_horizon(lambda_param):]
+    weights = lambda_param ** np.arange(tail.shape[1] - 1, -1, -1, dtype=float)
+    valid = ~np.isnan(tail)
+    weighted = np.nansum(weights * tail**2, axis=1)
+    total = (weights * valid).sum(axis=1)
+    ewma_vol = np.sqrt(weighted / total * periods_per_year)
+
+    # Parkinson volatility falls back to the window volatility, as in StockPredictor
+    return 0.4 * hist_vol + 0.4 * ewma_vol + 0.2 * hist_vol
+
+
+def _prepare(bars, window):
+    """Closes on the model calendar cut to the training window, as prepare_data builds them"""
+    closes, dates, step = trading_closes(as_bars(bars))
+    closes, dates = window.apply(closes, dates)
+    if len(closes) < BATCH_AR_MIN_OBSERVATIONS:
+        raise ValueError(f"Insufficient historical data. Got {len(closes)} observations, "
+                         f"need at least {BATCH_AR_MIN_OBSERVATIONS}")
+    return closes, dates[-1], step
+
+
+def batch_forecast(bars_by_symbol, days=7, max_p=BATCH_AR_MAX_P, window=None):
+    """
+    Fit ARIMA(p, 1, 0) models with a constant to many symbols at once and
+    forecast them. Price series are stacked into one array and every step
+    (order selection over p = 0..max_p by AIC, volatility, forecasts) runs as
+    batched NumPy operations across symbols, instead of one statsmodels fit
+    per symbol. Returns {symbol: {'predictions', 'model_metrics'}} shaped like
+    predict_next_days and get_model_metrics, or the exception for a symbol
+    whose history could not be used.
+    """
+    window = window or TrainingWindow()
+    results, prepared = {}, {}
+    for symbol, bars in bars_by_symbol.items():
+        try:
+            prepared[symbol] = _prepare(bars, window)
+        except Exception as e:
+            logger.error(f"Error preparing {symbol} for the batch fit: {str(e)}")
+            results[symbol] = ValueError(f"Error preparing data: {str(e)}")
+    if not prepared:
+        return results
+
+    symbols = list(prepared)
+    prices = stack_series([prepared[symbol][0] for symbol in symbols])
+    last_dates = np.array([prepared[symbol][1] for symbol in symbols], dtype='datetime64[D]')
+    steps = np.array([prepared[symbol][2] for symbol in symbols])
+    periods_per_year = TRADING_DAYS / steps
+    diffs = np.diff(prices, axis=1)
+
+    # Fit every order for every symbol, keep the lowest AIC per symbol
+    fits = [fit_ar(diffs, p, max_p) for p in range(max_p + 1)]
+    aic = np.stack([-2 * llf + 2 * (p + 2) for p, (_, _, llf) in enumerate(fits)])
+    order = aic.argmin(axis=0)
+
+    params = np.zeros((len(symbols), max_p + 1))
+    resid = np.empty_like(fits[0][1])
+    llf = np.empty(len(symbols))
+    for p, (p_params, p_resid, p_llf) in enumerate(fits):
+        chosen = order == p
+        params[chosen, :p + 1] = p_params[chosen]
+        resid[chosen] = p_resid[chosen]
+        llf[chosen] = p_llf[chosen]
+
+    # Forecast the differences recursively for all symbols, then integrate
+    history = diffs[:, -max_p:] if max_p else np.empty((len(symbols), 0))
+    forecast_diffs = np.empty((len(symbols), days))
+    for h in range(days):
+        next_diff = params[:, 0] + np.einsum('sj,sj->s', params[:, 1:], history[:, ::-1])
+        forecast_diffs[:, h] = next_diff
+        if max_p:
+            history = np.concatenate([history[:, 1:], next_diff[:, None]], axis=1)
+    last_price = prices[:, -1]
+    forecast_mean = last_price[:, None] + np.cumsum(forecast_diffs, axis=1)
+
+    volatility = batch_volatility(prices, periods_per_year)
+    n = (~np.isnan(prices)).sum(axis=1)
+    resid_count = (~np.isnan(resid)).sum(axis=1)
+    rmse = np.sqrt(np.nansum(resid**2, axis=1) / resid_count)
+    resid_mean = np.nanmean(resid, axis=1)
+    resid_std = np.nanstd(resid, axis=1)
+    mae = np.nanmean(np.abs(resid), axis=1)
+    k = order + 2
+    bic = -2 * llf + k * np.log(resid_count)
+    # Forecast dates, step business days apart like _forecast_records
+    dates = np.busday_offset(
+        last_dates[:, None], steps[:, None] * np.arange(1, days + 1)[None, :], roll='forward'
+    )
+
+    column = lambda values: np.asarray(values, dtype=float)[:, None]
+    table = forecast_table(
+        forecast_mean, column(rmse), column(n), column(n - order - 1), column(volatility),
+        column(resid_mean), column(resid_std), column(periods_per_year)
+    )
+    days_ahead = table['day'].tolist()
+
+    for i, symbol in enumerate(symbols):
+        results[symbol] = {
+            'predictions': [
+                {
+                    'day': h,
+                    'date': date,
+                    'predicted_price': pred,
+                    'lower_bound': lower,
+                    'upper_bound': upper,
+                    'confidence': confidence,
+                    'volatility': float(volatility[i])
+                }
+                for h, date, pred, lower, upper, confidence in zip(
+                    days_ahead,
+                    dates[i].astype(str).tolist(),
+                    table['predicted_price'][i].tolist(),
+                    table['lower_bound'][i].tolist(),
+                    table['upper_bound'][i].tolist(),
+                    table['confidence'][i].tolist()
+                )
+            ],
+            'model_metrics': {
+                'aic': float(aic[order[i], i]),
+                'bic': float(bic[i]),
+                'rmse': float(rmse[i]),
+                'mae': float(mae[i]),
+                'accuracy': float(1 - mae[i] / last_price[i]),
+                'volatility': float(volatility[i]),
+                'last_known_price': float(last_price[i]),
+                'last_date': str(last_dates[i]),
+                'order': [int(order[i]), 1, 0],
+                'order_search': 'batch_ar',
+                'order_search_fits': max_p + 1,
+            },
+        }
+    return results
@@ -0,0 +1,111 @@
+import os
+import gzip
+from starlette.datastructures import Headers, MutableHeaders
+from .executors import run_io
+
+try:
+    import brotli
+except ImportError:  # optional, gzip only without it
+    brotli = None
+
+# Responses smaller than this are sent as they are
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+# Bodies at least this large are compressed on the I/O pool, off the event loop
+COMPRESSION_THREAD_SIZE = int(os.getenv('COMPRESSION_THREAD_SIZE', 64 * 1024))
+# Price floats barely compress further at higher levels, which cost
+# about twice the time (benchmarks/bench_payload.py)
+GZIP_LEVEL = int(os.getenv('GZIP_LEVEL', 1))
+BROTLI_QUALITY = int(os.getenv('BROTLI_QUALITY', 5))
+
+COMPRESSIBLE_TYPES = ('application/json', 'text/plain', 'text/html', 'text/css', 'application/javascript')
+
+
+def supported_encodings():
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate(accept_encoding):
+    """
+    Best supported content coding for an Accept-Encoding header, or None for
+    identity. Codings are ranked by q-value, brotli winning ties with gzip.
+    """
+    weights = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        name = name.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            weights[name] = q
+
+    best, best_q = None, 0.0
+    for encoding in supported_encodings():
+        q = weights.get(encoding, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing complete responses with brotli or gzip as
+    negotiated from Accept-Encoding. Streamed responses (Server-Sent Events)
+    are passed through untouched so every event is flushed immediately.
+    """
+
+    def __init__(self, app, minimum_size=COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get('accept-encoding', ''))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        held = {}
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                held['start'] = message
+                return
+            start = held.pop('start', None)
+            if start is None or message['type'] != 'http.response.body':
+                if start is not None:
+                    await send(start)
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start['headers'])
+            media_type = headers.get('content-type', '').partition(';')[0].strip().lower()
+            body = message.get('body', b'')
+            if media_type in COMPRESSIBLE_TYPES:
+                headers.add_vary_header('Accept-Encoding')
+                if (not message.get('more_body', False) and len(body) >= self.minimum_size
+                        and 'content-encoding' not in headers and start['status'] == 200):
+                    if len(body) >= COMPRESSION_THREAD_SIZE:
+                        body = await run_io(compress, body, encoding)
+                    else:
+                        body = compress(body, encoding)
+                    headers['Content-Encoding'] = encoding
+                    headers['Content-Length'] = str(len(body))
+                    message = {**message, 'body': body}
+            await send(start)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,35 @@
+import hashlib
+from starlette.responses import Response
+
+
+def bars_etag(bars, *parts):
+    """
+    Weak validator for a representation derived from bars and request
+    parameters. It changes when a new bar arrives or the last bar is revised.
+    """
+    return make_etag(*parts, len(bars), bars.index[-1], repr(float(bars.close[-1])))
+
+
+def make_etag(*parts):
+    digest = hashlib.sha1('|'.join(str(part) for part in parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match check, using the weak comparison RFC 9110 prescribes for it"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    opaque = etag[2:] if etag.startswith('W/') else etag
+    return any(
+        (candidate[2:] if candidate.startswith('W/') else candidate) == opaque
+        for candidate in (item.strip() for item in if_none_match.split(','))
+    )
+
+
+def not_modified(request, etag):
+    """A 304 response when the client already holds etag, else None"""
+    if etag_matches(request.headers.get('if-none-match'), etag):
+        return Response(status_code=304, headers={'ETag': etag, 'Cache-Control': 'no-cache'})
+    return None
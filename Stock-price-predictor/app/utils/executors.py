@@ -0,0 +1,161 @@
+import os
+import asyncio
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Threads for blocking network and disk calls (yfinance, HTTP probes, bar store)
+IO_WORKERS = int(os.getenv('IO_WORKERS', 32))
+
+# Threads that orchestrate model work; they mostly wait on the process pool
+MODEL_WORKERS = int(os.getenv('MODEL_WORKERS', 4))
+
+# Processes for CPU-bound model fits
+CPU_WORKERS = int(os.getenv('CPU_WORKERS', os.getenv('ORDER_SEARCH_WORKERS', os.cpu_count() or 1)))
+
+
+# Set by the process pool initializer. Processes started by other means
+# (uvicorn --reload or --workers children) are not pool workers.
+_IN_POOL_WORKER = False
+
+
+def _init_pool_worker():
+    global _IN_POOL_WORKER
+    _IN_POOL_WORKER = True
+
+
+def in_worker_process():
+    """True inside a pool worker, where work must not be sent to another pool"""
+    return _IN_POOL_WORKER
+
+
+# Pools are created lazily while the I/O and model threads are running, and
+# forking a multi-threaded process can leave a child stuck on a lock another
+# thread held. Workers start from a clean forkserver process instead.
+START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+def process_pool(max_workers):
+    """A ProcessPoolExecutor whose workers know they are pool workers"""
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context(START_METHOD),
+        initializer=_init_pool_worker,
+    )
+
+
+class _Lane:
+    """
+    A bounded executor plus counters. Thread lanes know when a task starts,
+    so queued and active are exact; for the process lane only in-flight work
+    is known and queued is whatever exceeds the worker count.
+    """
+
+    def __init__(self, name, workers, processes=False):
+        self.name = name
+        self.workers = workers
+        self.processes = processes
+        self._executor = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.active = 0
+        self.completed = 0
+
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                if self.processes:
+                    self._executor = process_pool(self.workers)
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix=f"{self.name}-worker"
+                    )
+            return self._executor
+
+    def _run_tracked(self, func, args, kwargs):
+        with self._lock:
+            self.active += 1
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def _done(self, future):
+        with self._lock:
+            self.in_flight -= 1
+            self.completed += 1
+
+    def submit(self, func, *args, **kwargs):
+        executor = self.executor()
+        with self._lock:
+            self.in_flight += 1
+        try:
+            if self.processes:
+                future = executor.submit(func, *args, **kwargs)
+            else:
+                future = executor.submit(self._run_tracked, func, args, kwargs)
+        except Exception:
+            with self._lock:
+                self.in_flight -= 1
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    @property
+    def queued(self):
+        if self.processes:
+            return max(0, self.in_flight - self.workers)
+        return max(0, self.in_flight - self.active)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'in_flight': self.in_flight,
+                'queued': self.queued,
+                'completed': self.completed,
+            }
+
+
+io_lane = _Lane('io', IO_WORKERS)
+model_lane = _Lane('model', MODEL_WORKERS)
+cpu_lane = _Lane('cpu', CPU_WORKERS, processes=True)
+
+
+def submit_cpu(func, *args, **kwargs):
+    """
+    Submit CPU-bound work to the process pool. Inside a pool worker the call
+    runs inline instead, and the returned future is already resolved.
+    """
+    if in_worker_process():
+        future = Future()
+        try:
+            future.set_result(func(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+    return cpu_lane.submit(func, *args, **kwargs)
+
+
+async def run_io(func, *args, **kwargs):
+    """Run a blocking I/O call on the bounded I/O thread pool"""
+    return await asyncio.wrap_future(io_lane.submit(func, *args, **kwargs))
+
+
+async def run_model(func, *args, **kwargs):
+    """Run blocking model orchestration (train, predict) on the model thread pool"""
+    return await asyncio.wrap_future(model_lane.submit(func, *args, **kwargs))
+
+
+async def run_cpu(func, *args, **kwargs):
+    """Run a picklable CPU-bound function on the process pool"""
+    return await asyncio.wrap_future(submit_cpu(func, *args, **kwargs))
+
+
+def stats():
+    """Worker counts and queue depth for every lane"""
+    return {lane.name: lane.stats() for lane in (io_lane, model_lane, cpu_lane)}
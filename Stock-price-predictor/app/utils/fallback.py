@@ -0,0 +1,96 @@
+import numpy as np
+from .stock_predictor import StockPredictor
+from .metrics import stage_seconds
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class DriftModel:
+    """
+    Random walk with drift, ARIMA(0, 1, 0) with a constant, fitted in closed
+    form: the drift is the mean price change and the forecast a straight line
+    from the last price. Exposes the forecast()/summary() pair StockPredictor
+    reads from CompactARIMA.
+    """
+
+    order = (0, 1, 0)
+
+    def __init__(self, prices):
+        prices = np.asarray(prices, dtype=float)
+        changes = np.diff(prices)
+        self.last_price = float(prices[-1])
+        self.drift = float(changes.mean())
+        self.resid = changes - self.drift
+        self.nobs = len(prices)
+        self.data_mean = float(prices.mean())
+
+    def forecast(self, steps=1):
+        return self.last_price + self.drift * np.arange(1, steps + 1)
+
+    def summary(self):
+        resid = self.resid
+        n = len(resid)
+        variance = float(np.mean(resid**2))
+        # An exact fit (a straight-line history) has no residual variance
+        llf = -0.5 * n * (np.log(2 * np.pi * max(variance, 1e-300)) + 1)
+        params = 2  # drift and variance
+        return {
+            'nobs': self.nobs,
+            'k': 1,
+            'rmse': float(np.sqrt(variance)),
+            'resid_mean': float(resid.mean()),
+            'resid_std': float(resid.std()),
+            'mae': float(np.mean(np.abs(resid))),
+            'fit_rmse': float(np.sqrt(variance)),
+            'data_mean': self.data_mean,
+            'aic': float(-2 * llf + 2 * params),
+            'bic': float(-2 * llf + params * np.log(n)),
+        }
+
+
+class DriftPredictor(StockPredictor):
+    """
+    Fallback forecaster for requests whose deadline the ARIMA order search
+    cannot meet. Prepares the data and builds the prediction bands exactly
+    like StockPredictor (same training window and calculate_volatility
+    bands) but fits in a single vectorized pass, so it answers in
+    milliseconds whatever the history length.
+    """
+
+    model_type = 'drift'
+
+    def train(self, historical_data, progress=None):
+        try:
+            with stage_seconds.time(stage='fallback_fit'):
+                prices, _ = self.prepare_data(historical_data)
+                self.model = DriftModel(prices)
+            if progress is not None:
+                progress('model_fitted', {'order': list(self.order)})
+        except Exception as e:
+            logger.error(f"Error in fallback train: {str(e)}")
+            raise ValueError(f"Error training fallback model: {str(e)}")
+
+    def update(self, historical_data, progress=None):
+        self.train(historical_data, progress)
+        return False
+
+    @property
+    def order(self):
+        return self.model.order
+
+    def _fit_summary(self):
+        return self.model.summary()
+
+    def get_model_metrics(self):
+        metrics = super().get_model_metrics()
+        metrics['order_search'] = None
+        metrics['order_search_fits'] = None
+        return metrics
+
+
+def fallback_forecast(historical_data, days=7):
+    """Fit the drift fallback and return (predictions, model_metrics)"""
+    predictor = DriftPredictor()
+    predictor.train(historical_data)
+    return predictor.predict_next_days(days)['predictions'], predictor.get_model_metrics()
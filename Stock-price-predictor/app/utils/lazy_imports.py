@@ -0,0 +1,90 @@
+import os
+import time
+import logging
+import importlib
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Import the heavy modules in a background thread once the server is up
+PRELOAD_MODULES = os.getenv('PRELOAD_MODULES', '1') not in ('0', 'false', 'False')
+
+_registry = []
+_preload = {'state': 'idle', 'seconds': None, 'modules': {}}
+
+
+class LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access, so
+    importing the app does not pay for pandas, scipy, statsmodels or yfinance
+    until a request needs them. Attributes are cached on the proxy once loaded.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    @property
+    def loaded(self):
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        value = getattr(self._load(), attr)
+        setattr(self, attr, value)
+        return value
+
+    def __repr__(self):
+        return f"<lazy module {self._name!r}{' (loaded)' if self.loaded else ''}>"
+
+
+def lazy_module(name):
+    """Return a shared LazyModule for name, registered for preload()"""
+    for module in _registry:
+        if module._name == name:
+            return module
+    module = LazyModule(name)
+    _registry.append(module)
+    return module
+
+
+def preload():
+    """Import every registered lazy module now, recording how long each took"""
+    _preload['state'] = 'running'
+    started = time.perf_counter()
+    for module in list(_registry):
+        if module.loaded:
+            continue
+        module_started = time.perf_counter()
+        try:
+            module._load()
+        except Exception as e:
+            logger.error(f"Error preloading {module._name}: {str(e)}")
+            continue
+        _preload['modules'][module._name] = round(time.perf_counter() - module_started, 3)
+    _preload['seconds'] = round(time.perf_counter() - started, 3)
+    _preload['state'] = 'done'
+    logger.info(f"Preloaded {len(_preload['modules'])} modules in {_preload['seconds']}s")
+
+
+def preload_in_background():
+    """Start preload() on a daemon thread unless PRELOAD_MODULES is off"""
+    if not PRELOAD_MODULES or _preload['state'] != 'idle':
+        return None
+    _preload['state'] = 'scheduled'
+    thread = threading.Thread(target=preload, name='preload-modules', daemon=True)
+    thread.start()
+    return thread
+
+
+def preload_status():
+    return {
+        'state': _preload['state'],
+        'seconds': _preload['seconds'],
+        'modules': dict(_preload['modules']),
+        'pending': [module._name for module in _registry if not module.loaded],
+    }
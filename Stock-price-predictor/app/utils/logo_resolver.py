@@ -0,0 +1,137 @@
+import os
+import json
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+LOGO_CACHE_PATH = os.getenv('LOGO_CACHE_PATH', 'data/logo_cache.json')
+LOGO_CACHE_TTL = int(os.getenv('LOGO_CACHE_TTL', 7 * 24 * 3600))
+LOGO_NEGATIVE_TTL = int(os.getenv('LOGO_NEGATIVE_TTL', 24 * 3600))
+LOGO_PROBE_TIMEOUT = float(os.getenv('LOGO_PROBE_TIMEOUT', 2))
+
+
+def default_sources(symbol, website=None):
+    """Candidate logo URLs for a symbol, in order of preference"""
+    sources = []
+    domain = (website or '').replace('http://', '').replace('https://', '').split('/')[0]
+    if domain:
+        sources.append(f"https://logo.clearbit.com/{domain}")
+    sources.extend([
+        f"https://storage.googleapis.com/iex/api/logos/{symbol.lower()}.png",
+        f"https://companieslogo.com/img/orig/{symbol}.D-93b0e5e0.png",
+        f"https://companiesmarketcap.com/img/company-logos/64/{symbol}.png"
+    ])
+    return sources
+
+
+class LogoResolver:
+    """
+    Resolve company logo URLs by probing every candidate source at once over
+    a pooled HTTP session and taking the first that answers 200.
+
+    Results, including misses, are kept in a JSON file with a TTL so a
+    symbol is only probed again once its entry has expired.
+    """
+
+    def __init__(self, cache_path=LOGO_CACHE_PATH, ttl=LOGO_CACHE_TTL, negative_ttl=LOGO_NEGATIVE_TTL,
+                 timeout=LOGO_PROBE_TIMEOUT, sources=default_sources, session=None):
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.timeout = timeout
+        self.sources = sources
+        self.session = session or self._make_session()
+        self._executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix='logo-probe')
+        self._lock = threading.Lock()
+        self._cache = self._load()
+
+    @staticmethod
+    def _make_session():
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def _load(self):
+        try:
+            with open(self.cache_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._cache, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def _cached(self, symbol):
+        entry = self._cache.get(symbol)
+        if entry is None:
+            return False, None
+        ttl = self.ttl if entry['url'] else self.negative_ttl
+        if time.time() - entry['checked_at'] > ttl:
+            return False, None
+        return True, entry['url']
+
+    def _probe(self, url):
+        try:
+            response = self.session.head(url, timeout=self.timeout)
+            return url if response.status_code == 200 else None
+        except requests.RequestException:
+            return None
+
+    def _probe_all(self, urls):
+        """
+        Probe every URL concurrently and return the highest-priority success:
+        a success is returned once every URL before it has failed
+        """
+        futures = [self._executor.submit(self._probe, url) for url in urls]
+        pending = set(futures)
+        try:
+            while True:
+                for future in futures:
+                    if not future.done():
+                        break
+                    if future.result():
+                        return future.result()
+                else:
+                    return None
+                _, pending = wait(pending, return_when=FIRST_COMPLETED)
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def resolve(self, symbol, info=None):
+        """
+        Logo URL for symbol, or None. Pass the yfinance info dict when it has
+        already been fetched so its website can be used without a refetch.
+        """
+        symbol = symbol.upper()
+        with self._lock:
+            hit, url = self._cached(symbol)
+        if hit:
+            return url
+
+        website = (info or {}).get('website')
+        url = self._probe_all(self.sources(symbol, website))
+
+        with self._lock:
+            self._cache[symbol] = {'url': url, 'checked_at': time.time()}
+            try:
+                self._save()
+            except OSError as e:
+                logger.warning(f"Could not persist logo cache: {str(e)}")
+        return url
+
+
+logo_resolver = LogoResolver()
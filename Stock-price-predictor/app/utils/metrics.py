@@ -0,0 +1,178 @@
+import os
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+
+# Set METRICS_ENABLED=0 to turn every observation into a no-op
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1') not in ('0', 'false', 'False')
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels, Prometheus style"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = tuple(labels.get(name, '') for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(counts), total, count) for key, (counts, total, count) in self._series.items()]
+        samples = []
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(float(bound))
+                samples.append((self.name + '_bucket', _format_labels(self.labelnames, key, ('le', le)), cumulative))
+            samples.append((self.name + '_sum', _format_labels(self.labelnames, key), total))
+            samples.append((self.name + '_count', _format_labels(self.labelnames, key), count))
+        return samples
+
+
+class Registry:
+    """Holds metrics plus collectors that read counters kept elsewhere at scrape time"""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector):
+        """collector() returns [(name, kind, documentation, [(labels_dict, value), ...]), ...]"""
+        self._collectors.append(collector)
+        return collector
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(f"{name}{labels} {value}" for name, labels, value in metric.samples())
+
+        for collector in self._collectors:
+            for name, kind, documentation, values in collector():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in values:
+                    rendered = _format_labels(tuple(labels), tuple(labels.values()))
+                    lines.append(f"{name}{rendered} {value}")
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+stage_seconds = registry.register(Histogram(
+    'forecast_stage_duration_seconds',
+    'Duration of forecast pipeline stages',
+    labelnames=('stage',)
+))
+
+candidate_fit_seconds = registry.register(Histogram(
+    'order_search_candidate_fit_duration_seconds',
+    'Duration of individual ARIMA candidate fits during order search',
+    labelnames=('order',)
+))
+
+http_request_seconds = registry.register(Histogram(
+    'http_request_duration_seconds',
+    'HTTP request latency by route',
+    labelnames=('method', 'route', 'status')
+))
+
+http_response_bytes = registry.register(Histogram(
+    'http_response_size_bytes',
+    'HTTP response payload size by route',
+    labelnames=('method', 'route'),
+    buckets=SIZE_BUCKETS
+))
+
+
+def route_label(scope):
+    """
+    Path template of the matched route including its router prefix. Newer
+    FastAPI keeps the prefixed template on the effective route context in
+    scope['fastapi'] and leaves scope['route'] as the router-relative route;
+    older releases copy routes into the app with the prefix applied.
+    """
+    context = (scope.get('fastapi') or {}).get('effective_route_context')
+    template = getattr(context, 'path_format', None)
+    if template is None:
+        route = scope.get('route')
+        template = getattr(route, 'path_format', None) or getattr(route, 'path', None)
+    return template or 'unmatched'
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and payload size per matched route"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        state = {'status': 500, 'bytes': 0}
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                state['status'] = message['status']
+            elif message['type'] == 'http.response.body':
+                state['bytes'] += len(message.get('body', b''))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = route_label(scope)
+            method = scope.get('method', '')
+            http_request_seconds.observe(
+                time.perf_counter() - started, method=method, route=route, status=state['status']
+            )
+            http_response_bytes.observe(state['bytes'], method=method, route=route)
@@ -0,0 +1,206 @@
+import numpy as np
+
+ARTIFACT_VERSION = 1
+
+
+def fit_summary(results, data):
+    """
+    Residual and sample statistics that forecasts and metrics are derived
+    from, for a full statsmodels ARIMAResults fitted on data.
+    """
+    resid = np.asarray(results.resid, dtype=float)
+    spec = results.model._spec_arima
+    return {
+        'nobs': len(data),
+        'k': sum(spec.ar_lags) + sum(spec.ma_lags) + 1,
+        'rmse': float(np.sqrt(np.mean(resid**2))),
+        'resid_mean': float(resid.mean()),
+        'resid_std': float(resid.std()),
+        'mae': float(np.mean(np.abs(resid))),
+        'fit_rmse': float(np.sqrt(np.mean(resid[1:]**2))),
+        'data_mean': float(np.mean(data)),
+        'aic': float(results.aic),
+        'bic': float(results.bic),
+    }
+
+
+class CompactARIMA:
+    """
+    Forecasting state of a fitted ARIMA model without the training series.
+
+    Holds the state space matrices for the fitted parameters, the one-step
+    ahead predicted state and its covariance after the last observation, and
+    running residual sums. That is enough to forecast, to append new
+    observations with the Kalman filter (same results as ARIMAResults.append
+    with fixed parameters) and to report the model metrics, in a few KB.
+    """
+
+    _matrices = ('design', 'obs_intercept', 'obs_cov', 'transition', 'state_intercept', 'selection', 'state_cov')
+
+    def __init__(self, order, params, param_names, matrices, state, state_cov,
+                 nobs, burn, llf, k, sums, resid=()):
+        self.order = tuple(order)
+        self.params = np.asarray(params, dtype=float)
+        self.param_names = list(param_names)
+        self.matrices = {name: np.asarray(matrices[name], dtype=float) for name in self._matrices}
+        self.state = np.asarray(state, dtype=float)
+        self.state_cov = np.asarray(state_cov, dtype=float)
+        self.nobs = int(nobs)
+        self.burn = int(burn)
+        self.llf = float(llf)
+        self.k = int(k)
+        # resid_sum, resid_sq_sum, resid_abs_sum, first_resid, data_sum
+        self.sums = {name: float(value) for name, value in sums.items()}
+        # One-step errors of the observations added by the last append()
+        self.resid = np.asarray(resid, dtype=float)
+
+    @classmethod
+    def from_results(cls, results, data):
+        """Compact a statsmodels ARIMAResults fitted on data"""
+        filtered = results.filter_results
+        resid = np.asarray(results.resid, dtype=float)
+        spec = results.model._spec_arima
+        # The matrices are time-invariant apart from a constant trend in the
+        # observation intercept, so the last column describes the future
+        matrices = {
+            name: getattr(filtered, name)[..., -1]
+            for name in cls._matrices
+        }
+        return cls(
+            order=results.model.order,
+            params=results.params,
+            param_names=results.param_names,
+            matrices=matrices,
+            state=filtered.predicted_state[:, -1],
+            state_cov=filtered.predicted_state_cov[:, :, -1],
+            nobs=len(data),
+            burn=filtered.loglikelihood_burn,
+            llf=results.llf,
+            k=sum(spec.ar_lags) + sum(spec.ma_lags) + 1,
+            sums={
+                'resid_sum': resid.sum(),
+                'resid_sq_sum': np.sum(resid**2),
+                'resid_abs_sum': np.sum(np.abs(resid)),
+                'first_resid': resid[0],
+                'data_sum': np.sum(data),
+            },
+        )
+
+    @property
+    def aic(self):
+        return -2 * self.llf + 2 * len(self.params)
+
+    @property
+    def bic(self):
+        return -2 * self.llf + len(self.params) * np.log(self.nobs - self.burn)
+
+    def forecast(self, steps=1):
+        """Point forecasts for the next steps observations"""
+        return self.forecast_from(self.state[None, :], steps)[0]
+
+    def filter(self, values, keep_states=False):
+        """
+        Run the Kalman filter over new observations with the fitted parameters.
+        Returns (state, state_cov, llf, errors[, states]) after the last value;
+        with keep_states, states[i] is the predicted state before values[i]
+        and states[-1] the one after the last value.
+        """
+        values = np.asarray(values, dtype=float)
+        Z = self.matrices['design'][0]
+        d = self.matrices['obs_intercept'][0]
+        H = self.matrices['obs_cov'][0, 0]
+        T = self.matrices['transition']
+        c = self.matrices['state_intercept']
+        R = self.matrices['selection']
+        RQR = R @ self.matrices['state_cov'] @ R.T
+
+        state = self.state.copy()
+        state_cov = self.state_cov.copy()
+        llf = self.llf
+        errors = np.empty(len(values))
+        states = np.empty((len(values) + 1, len(state))) if keep_states else None
+        for i, value in enumerate(values):
+            if keep_states:
+                states[i] = state
+            error = value - (Z @ state + d)
+            variance = Z @ state_cov @ Z + H
+            gain = state_cov @ Z / variance
+            state = T @ (state + gain * error) + c
+            state_cov = T @ (state_cov - np.outer(gain, gain) * variance) @ T.T + RQR
+            llf -= 0.5 * (np.log(2 * np.pi * variance) + error * error / variance)
+            errors[i] = error
+
+        if keep_states:
+            states[-1] = state
+            return state, state_cov, llf, errors, states
+        return state, state_cov, llf, errors
+
+    def forecast_from(self, states, steps):
+        """
+        Point forecasts from many predicted states at once: states is
+        (origins, k_states), the result (origins, steps).
+        """
+        Z = self.matrices['design'][0]
+        d = self.matrices['obs_intercept'][0]
+        T = self.matrices['transition']
+        c = self.matrices['state_intercept']
+
+        current = np.asarray(states, dtype=float).T
+        forecasts = np.empty((current.shape[1], steps))
+        for h in range(steps):
+            forecasts[:, h] = Z @ current + d
+            current = T @ current + c[:, None]
+        return forecasts
+
+    def append(self, values):
+        """Return a new model extended with observations, parameters unchanged"""
+        values = np.asarray(values, dtype=float)
+        state, state_cov, llf, errors = self.filter(values)
+
+        sums = dict(self.sums)
+        sums['resid_sum'] += errors.sum()
+        sums['resid_sq_sum'] += np.sum(errors**2)
+        sums['resid_abs_sum'] += np.sum(np.abs(errors))
+        sums['data_sum'] += values.sum()
+
+        return CompactARIMA(
+            self.order, self.params, self.param_names, self.matrices, state, state_cov,
+            self.nobs + len(values), self.burn, llf, self.k, sums, errors
+        )
+
+    def summary(self):
+        """Same statistics as fit_summary, from the running sums"""
+        n = self.nobs
+        sums = self.sums
+        mean = sums['resid_sum'] / n
+        return {
+            'nobs': n,
+            'k': self.k,
+            'rmse': float(np.sqrt(sums['resid_sq_sum'] / n)),
+            'resid_mean': float(mean),
+            'resid_std': float(np.sqrt(max(0.0, sums['resid_sq_sum'] / n - mean**2))),
+            'mae': float(sums['resid_abs_sum'] / n),
+            'fit_rmse': float(np.sqrt((sums['resid_sq_sum'] - sums['first_resid']**2) / (n - 1))),
+            'data_mean': float(sums['data_sum'] / n),
+            'aic': float(self.aic),
+            'bic': float(self.bic),
+        }
+
+    def to_dict(self):
+        return {
+            'order': list(self.order),
+            'params': self.params.tolist(),
+            'param_names': self.param_names,
+            'matrices': {name: value.tolist() for name, value in self.matrices.items()},
+            'state': self.state.tolist(),
+            'state_cov': self.state_cov.tolist(),
+            'nobs': self.nobs,
+            'burn': self.burn,
+            'llf': self.llf,
+            'k': self.k,
+            'sums': self.sums,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
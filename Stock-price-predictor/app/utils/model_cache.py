@@ -0,0 +1,139 @@
+import os
+import logging
+import threading
+from collections import OrderedDict
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Cached predictors are compact (a few KB each), so thousands fit comfortably
+MODEL_CACHE_MAX_ENTRIES = int(os.getenv('MODEL_CACHE_MAX_ENTRIES', 10000))
+MODEL_CACHE_MAX_BYTES = int(os.getenv('MODEL_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+
+
+def estimate_nbytes(obj, max_depth=6, _seen=None):
+    """
+    Rough memory footprint of an object, counting the NumPy arrays reachable
+    through attributes, dicts and lists. Fitted ARIMA results are dominated by
+    their filter output arrays, so this is close enough for sizing the cache.
+    """
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen or max_depth < 0:
+        return 0
+    _seen.add(id(obj))
+
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if hasattr(obj, 'values') and isinstance(getattr(obj, 'values', None), np.ndarray):
+        return obj.values.nbytes
+
+    total = 0
+    if isinstance(obj, dict):
+        children = obj.values()
+    elif isinstance(obj, (list, tuple)):
+        children = obj
+    elif hasattr(obj, '__dict__'):
+        children = vars(obj).values()
+    else:
+        return 0
+
+    for child in children:
+        total += estimate_nbytes(child, max_depth - 1, _seen)
+    return total
+
+
+class ModelCache:
+    """
+    Thread-safe LRU cache for fitted predictors.
+
+    Entries are evicted least recently used first once either the entry count
+    or the estimated memory footprint goes over its limit.
+    """
+
+    def __init__(self, max_entries=MODEL_CACHE_MAX_ENTRIES, max_bytes=MODEL_CACHE_MAX_BYTES, sizeof=estimate_nbytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(symbol, history_period, interval, last_bar_date, search='grid'):
+        return (symbol.upper(), history_period, interval, search, str(last_bar_date))
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def latest(self, symbol, history_period, interval, search='grid'):
+        """
+        Most recently used value for the same series regardless of its last bar
+        date, used as the starting point for incremental updates. Does not count
+        towards hits or misses.
+        """
+        prefix = (symbol.upper(), history_period, interval, search)
+        with self._lock:
+            for key in reversed(self._entries):
+                if key[:4] == prefix:
+                    return self._entries[key][0]
+        return None
+
+    def put(self, key, value):
+        """Insert or replace a value and evict until the cache fits its limits"""
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self.current_bytes += size
+            self._evict()
+
+    def _evict(self):
+        # Always keep the newest entry, even if it alone exceeds the byte cap
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries or self.current_bytes > self.max_bytes
+        ):
+            key, (_, size) = self._entries.popitem(last=False)
+            self.current_bytes -= size
+            self.evictions += 1
+            logger.debug(f"Evicted model cache entry {key}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+model_cache = ModelCache()
@@ -0,0 +1,78 @@
+import os
+import json
+import logging
+from .stock_predictor import StockPredictor
+from .bar_store import PERIODS, INTERVALS
+from .order_search import ORDER_SEARCH_MODES
+
+logger = logging.getLogger(__name__)
+
+MODEL_DIR = os.getenv('MODEL_DIR', 'data/models')
+
+
+class ModelStore:
+    """
+    Compact model artifacts on disk, one JSON file per series (symbol,
+    period, interval and search mode) holding its latest fit. Files are
+    replaced atomically, and loaded only when a request misses the cache.
+    """
+
+    def __init__(self, root=MODEL_DIR):
+        self.root = root
+
+    def _path(self, symbol, history_period, interval, search):
+        # These come from query parameters and end up in a file name
+        if history_period not in PERIODS:
+            raise ValueError(f"Unsupported period: {history_period}")
+        if interval not in INTERVALS:
+            raise ValueError(f"Unsupported interval: {interval}")
+        if search not in ORDER_SEARCH_MODES:
+            raise ValueError(f"Unsupported search mode: {search}")
+        if os.sep in symbol or (os.altsep and os.altsep in symbol) or symbol.startswith('.'):
+            raise ValueError(f"Unsupported symbol: {symbol}")
+        return os.path.join(self.root, f"{symbol.upper()}_{history_period}_{interval}_{search}.json")
+
+    def save(self, key, predictor):
+        """Persist a predictor under a model cache key"""
+        symbol, history_period, interval, search, last_bar_date = key
+        path = self._path(symbol, history_period, interval, search)
+        document = {'last_bar_date': last_bar_date, 'artifact': predictor.to_artifact()}
+
+        os.makedirs(self.root, exist_ok=True)
+        staging = f"{path}.tmp"
+        with open(staging, 'w') as f:
+            json.dump(document, f)
+        os.replace(staging, path)
+        return path
+
+    def _read(self, symbol, history_period, interval, search):
+        try:
+            path = self._path(symbol, history_period, interval, search)
+        except ValueError as e:
+            logger.error(f"Error loading model artifact: {str(e)}")
+            return None
+        try:
+            with open(path) as f:
+                document = json.load(f)
+            return document['last_bar_date'], StockPredictor.from_artifact(document['artifact'])
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Error loading model artifact {path}: {str(e)}")
+            return None
+
+    def load(self, key):
+        """Predictor saved for exactly this cache key, or None"""
+        symbol, history_period, interval, search, last_bar_date = key
+        stored = self._read(symbol, history_period, interval, search)
+        if stored is None or stored[0] != last_bar_date:
+            return None
+        return stored[1]
+
+    def latest(self, symbol, history_period, interval, search='grid'):
+        """Most recent saved predictor for the series regardless of its last bar date"""
+        stored = self._read(symbol, history_period, interval, search)
+        return stored[1] if stored is not None else None
+
+
+model_store = ModelStore()
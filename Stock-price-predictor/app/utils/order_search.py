@@ -0,0 +1,349 @@
+import os
+import time
+import signal
+import logging
+import threading
+import warnings
+from concurrent.futures import wait, FIRST_COMPLETED
+import numpy as np
+from .executors import CPU_WORKERS, submit_cpu, in_worker_process
+from .metrics import candidate_fit_seconds
+from .lazy_imports import lazy_module
+warnings.filterwarnings('ignore')
+
+logger = logging.getLogger(__name__)
+
+arima_model = lazy_module('statsmodels.tsa.arima.model')
+stattools = lazy_module('statsmodels.tsa.stattools')
+
+DEFAULT_ORDER = (1, 1, 1)
+
+# Candidates fitted at once per search, 1 disables the process pool entirely
+ORDER_SEARCH_WORKERS = int(os.getenv('ORDER_SEARCH_WORKERS', CPU_WORKERS))
+
+# Seconds allowed per candidate fit, 0 disables the limit
+ORDER_SEARCH_TIMEOUT = float(os.getenv('ORDER_SEARCH_TIMEOUT', 30)) or None
+
+# Grid candidates in a row without a better AIC before the search stops,
+# 0 searches the whole grid
+ORDER_SEARCH_PATIENCE = int(os.getenv('ORDER_SEARCH_PATIENCE', 6)) or None
+
+# Strategy used when a request does not pick one: 'grid' or 'stepwise'
+ORDER_SEARCH_MODES = ('grid', 'stepwise')
+ORDER_SEARCH_MODE = os.getenv('ORDER_SEARCH_MODE', 'grid')
+
+
+class CandidateTimeout(Exception):
+    """Raised inside a worker when a candidate fit exceeds its time budget"""
+
+
+class TrainingCancelled(Exception):
+    """Raised from a progress callback to abandon a search or training run"""
+
+
+def candidate_orders(p_values=range(0, 3), d_values=range(0, 2), q_values=range(0, 3)):
+    """Return the (p, d, q) grid in the order the serial search visits it"""
+    return [(p, d, q) for p in p_values for d in d_values for q in q_values]
+
+
+def _raise_timeout(signum, frame):
+    raise CandidateTimeout()
+
+
+def fit_candidate(data, order, timeout=None):
+    """
+    Fit a single ARIMA order and return (aic, seconds), with aic None if the
+    fit failed. Runs inside pool workers; the timeout relies on SIGALRM so it
+    is only enforced where the fit runs on a process main thread.
+    """
+    use_alarm = (
+        timeout is not None
+        and hasattr(signal, 'SIGALRM')
+        and threading.current_thread() is threading.main_thread()
+    )
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, _raise_timeout)
+    started = time.perf_counter()
+    try:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+        results = arima_model.ARIMA(data, order=order).fit()
+        return float(results.aic), time.perf_counter() - started
+    except CandidateTimeout:
+        logger.warning(f"ARIMA{order} fit exceeded {timeout}s, skipping")
+        return None, time.perf_counter() - started
+    except Exception:
+        return None, time.perf_counter() - started
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+
+def fit_model(data, order):
+    """Fit the final ARIMA model, picklable so it can run on the process pool"""
+    return arima_model.ARIMA(data, order=order).fit()
+
+
+def kpss_ndiffs(data, alpha=0.05, max_d=2):
+    """
+    Number of differences needed for stationarity: difference until the KPSS
+    test (level stationarity null) no longer rejects at alpha.
+    """
+    x = np.asarray(data, dtype=float)
+    for d in range(max_d):
+        if len(x) < 10 or np.ptp(x) == 0:
+            return d
+        try:
+            p_value = stattools.kpss(x, regression='c', nlags='auto')[1]
+        except Exception:
+            return d
+        if p_value >= alpha:
+            return d
+        x = np.diff(x)
+    return max_d
+
+
+def make_order_search(mode=None, **kwargs):
+    """Return the order search for a strategy name, ORDER_SEARCH_MODE by default"""
+    mode = mode or ORDER_SEARCH_MODE
+    if mode == 'grid':
+        return OrderSearch(**kwargs)
+    if mode == 'stepwise':
+        return StepwiseSearch(**kwargs)
+    raise ValueError(f"Unknown order search mode {mode!r}, expected one of {', '.join(ORDER_SEARCH_MODES)}")
+
+
+class OrderSearch:
+    """
+    ARIMA order search over a fixed (p, d, q) grid.
+
+    Candidates are fitted on the shared process pool and the results are
+    reduced in grid order, so the chosen order is the same one the serial
+    loop picks (first candidate with the lowest AIC wins ties).
+
+    - max_workers: candidates in flight at once, 1 runs the search serially
+      in-process (as it always does inside a pool worker)
+    - candidate_timeout: seconds allowed per candidate fit, ORDER_SEARCH_TIMEOUT
+      by default; None disables the limit
+    - patience: stop after this many consecutive candidates (in grid order)
+      fail to beat the best AIC so far, ORDER_SEARCH_PATIENCE by default;
+      None searches the whole grid
+    """
+
+    mode = 'grid'
+
+    def __init__(self, max_workers=None, candidate_timeout=ORDER_SEARCH_TIMEOUT,
+                 patience=ORDER_SEARCH_PATIENCE, orders=None):
+        self.max_workers = max_workers or ORDER_SEARCH_WORKERS
+        self.candidate_timeout = candidate_timeout
+        self.patience = patience
+        self.orders = list(orders) if orders is not None else candidate_orders()
+        self.fits = 0
+        self.best_aic = None
+
+    def search(self, data, progress=None):
+        """
+        Return the best (p, d, q) order for the data. progress, if given, is
+        called as progress('candidate', {...}) after every candidate fit and
+        may raise TrainingCancelled to stop the search.
+        """
+        self.fits = 0
+        self.best_aic = None
+
+        if self.max_workers <= 1 or in_worker_process():
+            return self._search_serial(data, progress)
+
+        try:
+            return self._search_parallel(data, progress)
+        except TrainingCancelled:
+            raise
+        except Exception as e:
+            logger.warning(f"Parallel order search unavailable, running serially: {str(e)}")
+            return self._search_serial(data, progress)
+
+    def _report(self, progress, order, aic):
+        if progress is not None:
+            progress('candidate', {
+                'order': list(order),
+                'aic': aic,
+                'fitted': self.fits,
+                'total': len(self.orders),
+            })
+
+    def _search_serial(self, data, progress=None):
+        reducer = _GridReducer(self.patience)
+        for order in self.orders:
+            aic, seconds = fit_candidate(data, order, self.candidate_timeout)
+            candidate_fit_seconds.observe(seconds, order=str(order))
+            self.fits += 1
+            self._report(progress, order, aic)
+            if reducer.add(order, aic):
+                break
+        self.best_aic = reducer.best_aic if reducer.best_order else None
+        return reducer.best_order or DEFAULT_ORDER
+
+    def _search_parallel(self, data, progress=None):
+        futures = {}
+        results = {}
+        reducer = _GridReducer(self.patience)
+        cursor = 0
+        next_index = 0
+        pending = set()
+
+        def submit_next():
+            nonlocal next_index
+            order = self.orders[next_index]
+            future = submit_cpu(fit_candidate, data, order, self.candidate_timeout)
+            futures[future] = next_index
+            pending.add(future)
+            next_index += 1
+
+        # Keep at most max_workers candidates in flight
+        while next_index < len(self.orders) and len(pending) < self.max_workers:
+            submit_next()
+
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.discard(future)
+                    self.fits += 1
+                    index = futures[future]
+                    try:
+                        aic, seconds = future.result()
+                        candidate_fit_seconds.observe(seconds, order=str(self.orders[index]))
+                    except Exception:
+                        aic = None
+                    results[index] = aic
+                    self._report(progress, self.orders[index], aic)
+
+                # Reduce in grid order so early stopping matches the serial search
+                stopped = False
+                while cursor in results:
+                    if reducer.add(self.orders[cursor], results[cursor]):
+                        stopped = True
+                        break
+                    cursor += 1
+                if stopped:
+                    break
+
+                while next_index < len(self.orders) and len(pending) < self.max_workers:
+                    submit_next()
+        finally:
+            for future in pending:
+                future.cancel()
+
+        self.best_aic = reducer.best_aic if reducer.best_order else None
+        return reducer.best_order or DEFAULT_ORDER
+
+
+class StepwiseSearch:
+    """
+    Hyndman-Khandakar style stepwise order search.
+
+    d is chosen up front with repeated KPSS tests, then the search starts from
+    (2, d, 2), (0, d, 0), (1, d, 0) and (0, d, 1) and keeps moving to the best
+    neighbour (p or q changed by one, or both) while that lowers the AIC. Each
+    round of neighbours is fitted on the process pool at once, so wide order
+    ranges cost a few rounds of fits rather than the whole grid.
+    """
+
+    mode = 'stepwise'
+
+    def __init__(self, max_p=5, max_q=5, max_d=2, max_workers=None, candidate_timeout=ORDER_SEARCH_TIMEOUT,
+                 max_steps=50):
+        self.max_p = max_p
+        self.max_q = max_q
+        self.max_d = max_d
+        self.max_workers = max_workers or ORDER_SEARCH_WORKERS
+        self.candidate_timeout = candidate_timeout
+        self.max_steps = max_steps
+        self.fits = 0
+        self.best_aic = None
+
+    def search(self, data, progress=None):
+        """Return the best (p, d, q) order for the data, see OrderSearch.search for progress"""
+        self.fits = 0
+        self.best_aic = None
+        d = kpss_ndiffs(data, max_d=self.max_d)
+
+        tried = {}
+        start = [(2, d, 2), (0, d, 0), (1, d, 0), (0, d, 1)]
+        self._fit_round(data, [order for order in start if self._in_range(order)], tried, progress)
+        best_order = self._best(tried)
+
+        for _ in range(self.max_steps):
+            if best_order is None:
+                break
+            p, _, q = best_order
+            neighbours = [
+                (p + dp, d, q + dq)
+                for dp, dq in ((-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (1, 1), (-1, 1), (1, -1))
+            ]
+            neighbours = [order for order in neighbours if self._in_range(order) and order not in tried]
+            if not neighbours:
+                break
+            self._fit_round(data, neighbours, tried, progress)
+            candidate = self._best(tried)
+            if candidate == best_order:
+                break
+            best_order = candidate
+
+        if best_order is None:
+            return DEFAULT_ORDER
+        self.best_aic = tried[best_order]
+        return best_order
+
+    def _in_range(self, order):
+        p, _, q = order
+        return 0 <= p <= self.max_p and 0 <= q <= self.max_q
+
+    @staticmethod
+    def _best(tried):
+        # Ties keep the order that was fitted first
+        best_order, best_aic = None, float('inf')
+        for order, aic in tried.items():
+            if aic is not None and aic < best_aic:
+                best_order, best_aic = order, aic
+        return best_order
+
+    def _fit_round(self, data, orders, tried, progress=None):
+        """Fit orders and record their AIC (None on failure) in tried"""
+        if self.max_workers <= 1 or len(orders) == 1 or in_worker_process():
+            results = (fit_candidate(data, order, self.candidate_timeout) for order in orders)
+        else:
+            try:
+                futures = [submit_cpu(fit_candidate, data, order, self.candidate_timeout) for order in orders]
+                results = [future.result() for future in futures]
+            except Exception as e:
+                logger.warning(f"Parallel order search unavailable, running serially: {str(e)}")
+                results = (fit_candidate(data, order, self.candidate_timeout) for order in orders)
+
+        for order, (aic, seconds) in zip(orders, results):
+            candidate_fit_seconds.observe(seconds, order=str(order))
+            tried[order] = aic
+            self.fits += 1
+            if progress is not None:
+                # The stepwise search does not know its total up front
+                progress('candidate', {'order': list(order), 'aic': aic, 'fitted': self.fits, 'total': None})
+
+
+class _GridReducer:
+    """Track the best AIC in grid order and decide when to stop early"""
+
+    def __init__(self, patience=None):
+        self.patience = patience
+        self.best_aic = float('inf')
+        self.best_order = None
+        self.since_improvement = 0
+
+    def add(self, order, aic):
+        """Record a candidate result, returns True when the search should stop"""
+        if aic is not None and aic < self.best_aic:
+            self.best_aic = aic
+            self.best_order = order
+            self.since_improvement = 0
+        else:
+            self.since_improvement += 1
+        return self.patience is not None and self.since_improvement >= self.patience
@@ -0,0 +1,81 @@
+import logging
+import numpy as np
+from multiprocessing import shared_memory
+from .bars import Bars, FIELDS, as_bars
+
+logger = logging.getLogger(__name__)
+
+# Row order of the block: the index as int64 epoch seconds, the float64 price
+# columns, then int64 volume. Every column is 8 bytes per bar.
+COLUMNS = ('index',) + FIELDS
+
+
+class SharedBars(Bars):
+    """
+    Bars whose columns are read-only views into one multiprocessing
+    shared_memory block. Pickling one sends only the block name and length,
+    so a process pool worker attaches to the same memory instead of
+    unpickling a copy of the history. The creating process owns the block
+    and unlinks it on release(), on leaving a with block or when collected;
+    attached copies only unmap it.
+    """
+
+    __slots__ = ('shm', 'owner')
+
+    def __init__(self, shm, length, owner=False):
+        self.shm = shm
+        self.owner = owner
+        block = np.ndarray((len(COLUMNS), length), dtype=np.int64, buffer=shm.buf)
+        block.flags.writeable = False
+        super().__init__(
+            block[0].view('datetime64[s]'),
+            *(block[row].view(np.float64) for row in range(1, len(FIELDS))),
+            block[len(FIELDS)]
+        )
+
+    @classmethod
+    def create(cls, historical_data):
+        """Copy Bars (or the list-of-dicts format) into a new shared block"""
+        bars = as_bars(historical_data)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, len(COLUMNS) * 8 * len(bars)))
+        block = np.ndarray((len(COLUMNS), len(bars)), dtype=np.int64, buffer=shm.buf)
+        block[0] = bars.index.astype('datetime64[s]').view(np.int64)
+        for row, field in enumerate(FIELDS[:-1], start=1):
+            block[row] = getattr(bars, field).view(np.int64)
+        block[len(FIELDS)] = bars.volume
+        del block
+        return cls(shm, len(bars), owner=True)
+
+    @classmethod
+    def attach(cls, name, length):
+        """Map an existing block created by SharedBars.create"""
+        return cls(shared_memory.SharedMemory(name=name), length)
+
+    def __reduce__(self):
+        return (SharedBars.attach, (self.shm.name, len(self)))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    def __del__(self):
+        self.release()
+
+    def release(self):
+        """Drop the column views and unmap the block, unlinking it if this process created it"""
+        shm = getattr(self, 'shm', None)
+        if shm is None:
+            return
+        self.shm = None
+        empty = Bars.empty()
+        for field in COLUMNS:
+            setattr(self, field, getattr(empty, field))
+        try:
+            shm.close()
+        except BufferError:
+            # A caller still holds a view of a column; the mapping goes when it does
+            logger.debug(f"Shared bars {shm.name} still referenced, leaving it mapped")
+        if self.owner:
+            shm.unlink()
@@ -0,0 +1,60 @@
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent async calls that share a key: the first caller starts
+    the work as a task, later callers with the same key await that task, and
+    the key is released once it finishes. A caller that gets cancelled (for
+    example on client disconnect) does not cancel the shared work.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._tasks = {}
+        self._joins = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def start(self, key, func, *args, **kwargs):
+        """The in-flight task for key, starting func(*args, **kwargs) as one if there is none"""
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            self._tasks[key] = task
+            self.started += 1
+            task.add_done_callback(lambda done: self._release(key, done))
+        else:
+            self.coalesced += 1
+            self._joins[key] = self._joins.get(key, 0) + 1
+            logger.debug(f"Joining in-flight {self.name} work for {key}")
+        return task
+
+    async def do(self, key, func, *args, **kwargs):
+        return await asyncio.shield(self.start(key, func, *args, **kwargs))
+
+    def running(self, key):
+        """True while work for key is in flight"""
+        return key in self._tasks
+
+    def joined(self, key):
+        """How many callers joined the in-flight work for key after it started"""
+        return self._joins.get(key, 0)
+
+    def _release(self, key, task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+            self._joins.pop(key, None)
+        # Mark the exception as retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self):
+        return {
+            'in_flight': len(self._tasks),
+            'started': self.started,
+            'coalesced': self.coalesced,
+        }
@@ -0,0 +1,251 @@
+"""
+Nightly forecast snapshots.
+
+A batch job trains a StockPredictor for every configured symbol after market
+close, spread over the process pool, and writes the forecasts to a versioned
+directory under SNAPSHOT_DIR. The LATEST file names the current version, and
+the forecast endpoint serves matching requests from it.
+
+    python -m app.utils.snapshots            # build one snapshot now
+    python -m app.utils.snapshots --daemon   # build one every weekday at SNAPSHOT_RUN_AT
+"""
+import os
+import json
+import time
+import shutil
+import logging
+import threading
+from contextlib import ExitStack
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+from .bar_store import bar_store
+from .executors import process_pool
+from .shared_bars import SharedBars
+from .order_search import ORDER_SEARCH_MODE
+from .stock_predictor import train_predictor
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = os.getenv('SNAPSHOT_DIR', 'data/snapshots')
+SNAPSHOT_SYMBOLS = [
+    symbol.strip().upper()
+    for symbol in os.getenv('SNAPSHOT_SYMBOLS', 'AAPL,MSFT,GOOGL,AMZN,META,NVDA,TSLA').split(',')
+    if symbol.strip()
+]
+SNAPSHOT_PERIOD = os.getenv('SNAPSHOT_PERIOD', '5y')
+SNAPSHOT_INTERVAL = os.getenv('SNAPSHOT_INTERVAL', '1d')
+SNAPSHOT_SEARCH = os.getenv('SNAPSHOT_SEARCH', ORDER_SEARCH_MODE)
+
+# Forecasts are stored for the longest horizon; shorter requests get a prefix
+SNAPSHOT_DAYS = int(os.getenv('SNAPSHOT_DAYS', 365))
+
+# Snapshots older than this are ignored; 72h covers Friday's run over a weekend
+SNAPSHOT_MAX_AGE_HOURS = float(os.getenv('SNAPSHOT_MAX_AGE_HOURS', 72))
+
+# Local exchange time the daemon builds a snapshot at, on weekdays
+SNAPSHOT_RUN_AT = os.getenv('SNAPSHOT_RUN_AT', '16:30')
+SNAPSHOT_TIMEZONE = os.getenv('SNAPSHOT_TIMEZONE', 'America/New_York')
+
+# Number of snapshot versions kept on disk
+SNAPSHOT_KEEP = int(os.getenv('SNAPSHOT_KEEP', 7))
+
+
+def forecast_symbol(bars, days, search):
+    """Train and forecast one symbol; runs on a pool worker"""
+    if len(bars) < 252:
+        raise ValueError(f"Insufficient historical data. Got {len(bars)} days, need at least 252 days.")
+    predictor = train_predictor(bars, search)
+    return {
+        'predictions': predictor.predict_next_days(days=days)['predictions'],
+        'model_metrics': predictor.get_model_metrics(),
+        'data_points_used': len(bars),
+        'last_bar_date': bars.last_date,
+    }
+
+
+def build_snapshot(symbols=None, history_period=SNAPSHOT_PERIOD, interval=SNAPSHOT_INTERVAL,
+                   days=SNAPSHOT_DAYS, search=SNAPSHOT_SEARCH, workers=None, store=None):
+    """
+    Forecast every symbol and return the snapshot document. Models are fitted
+    in parallel on a process pool of the job's own (all cores unless workers
+    is given), leaving the shared pool serving requests alone; a symbol that
+    fails is recorded with its error.
+    """
+    symbols = list(dict.fromkeys(symbol.upper() for symbol in (symbols or SNAPSHOT_SYMBOLS)))
+    store = store or bar_store
+    started = time.perf_counter()
+
+    bars_by_symbol = store.get_bars_many(symbols, history_period, interval)
+
+    futures = {}
+    results = {}
+    with process_pool(workers or os.cpu_count()) as pool, ExitStack() as stack:
+        for symbol in symbols:
+            bars = bars_by_symbol[symbol]
+            if isinstance(bars, Exception):
+                results[symbol] = {'error': str(bars)}
+            else:
+                shared = stack.enter_context(SharedBars.create(bars))
+                futures[symbol] = pool.submit(forecast_symbol, shared, days, search)
+
+        for symbol, future in futures.items():
+            try:
+                results[symbol] = future.result()
+            except Exception as e:
+                logger.error(f"Snapshot forecast failed for {symbol}: {str(e)}")
+                results[symbol] = {'error': str(e)}
+
+    created_at = datetime.now(timezone.utc)
+    failed = sum(1 for result in results.values() if 'error' in result)
+    logger.info(
+        f"Built snapshot for {len(symbols)} symbols ({failed} failed) "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+    return {
+        'version': created_at.strftime('%Y%m%dT%H%M%SZ'),
+        'created_at': created_at.isoformat(),
+        'history_period': history_period,
+        'interval': interval,
+        'search': search,
+        'days': days,
+        'symbols': {symbol: results[symbol] for symbol in symbols},
+    }
+
+
+class SnapshotStore:
+    """
+    Versioned snapshots on disk. Each version is a directory holding
+    snapshot.json; LATEST names the version to serve and is swapped
+    atomically, so readers never see a partly written snapshot.
+    """
+
+    def __init__(self, root=SNAPSHOT_DIR, max_age_hours=SNAPSHOT_MAX_AGE_HOURS, keep=SNAPSHOT_KEEP):
+        self.root = root
+        self.max_age_hours = max_age_hours
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._loaded = (None, None)  # (LATEST mtime, snapshot)
+
+    def write(self, snapshot):
+        """Write a snapshot as a new version, point LATEST at it and prune old versions"""
+        version = snapshot['version']
+        os.makedirs(self.root, exist_ok=True)
+
+        staging = os.path.join(self.root, f".{version}.tmp")
+        os.makedirs(staging, exist_ok=True)
+        with open(os.path.join(staging, 'snapshot.json'), 'w') as f:
+            json.dump(snapshot, f)
+        final = os.path.join(self.root, version)
+        if os.path.exists(final):
+            shutil.rmtree(final)
+        os.replace(staging, final)
+
+        pointer = os.path.join(self.root, '.LATEST.tmp')
+        with open(pointer, 'w') as f:
+            f.write(version)
+        os.replace(pointer, os.path.join(self.root, 'LATEST'))
+
+        self._prune()
+        logger.info(f"Snapshot {version} written to {final}")
+        return final
+
+    def versions(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            name for name in os.listdir(self.root)
+            if not name.startswith('.') and os.path.isdir(os.path.join(self.root, name))
+        )
+
+    def _prune(self):
+        for version in self.versions()[:-self.keep]:
+            shutil.rmtree(os.path.join(self.root, version), ignore_errors=True)
+
+    def latest(self):
+        """The current snapshot document, re-read only when LATEST changes"""
+        pointer = os.path.join(self.root, 'LATEST')
+        try:
+            mtime = os.stat(pointer).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+        with self._lock:
+            if self._loaded[0] == mtime:
+                return self._loaded[1]
+            try:
+                with open(pointer) as f:
+                    version = f.read().strip()
+                with open(os.path.join(self.root, version, 'snapshot.json')) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.error(f"Error loading forecast snapshot: {str(e)}")
+                return None
+            self._loaded = (mtime, snapshot)
+            return snapshot
+
+    def lookup(self, symbol, history_period, interval, days, search):
+        """
+        Return (entry, snapshot, age_seconds) when the latest snapshot covers
+        the request, otherwise None.
+        """
+        snapshot = self.latest()
+        if snapshot is None:
+            return None
+        if (snapshot['history_period'], snapshot['interval'], snapshot['search']) != (history_period, interval, search):
+            return None
+        if days > snapshot['days']:
+            return None
+
+        entry = snapshot['symbols'].get(symbol.upper())
+        if entry is None or 'error' in entry:
+            return None
+
+        age = (datetime.now(timezone.utc) - datetime.fromisoformat(snapshot['created_at'])).total_seconds()
+        if age > self.max_age_hours * 3600:
+            return None
+        return entry, snapshot, age
+
+
+snapshot_store = SnapshotStore()
+
+
+def next_run(now=None, run_at=SNAPSHOT_RUN_AT, tz=SNAPSHOT_TIMEZONE):
+    """Next weekday at run_at in the exchange time zone, as an aware datetime"""
+    zone = ZoneInfo(tz)
+    now = (now or datetime.now(timezone.utc)).astimezone(zone)
+    hour, minute = (int(part) for part in run_at.split(':'))
+    candidate = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if candidate <= now:
+        candidate += timedelta(days=1)
+    while candidate.weekday() >= 5:
+        candidate += timedelta(days=1)
+    return candidate
+
+
+def run_daemon(store=None, **kwargs):
+    """Build a snapshot every weekday after market close, forever"""
+    store = store or snapshot_store
+    while True:
+        when = next_run()
+        logger.info(f"Next forecast snapshot at {when.isoformat()}")
+        time.sleep(max(0.0, (when - datetime.now(timezone.utc)).total_seconds()))
+        try:
+            store.write(build_snapshot(**kwargs))
+        except Exception as e:
+            logger.error(f"Error building forecast snapshot: {str(e)}")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description='Precompute forecast snapshots')
+    parser.add_argument('symbols', nargs='*', help='symbols to forecast, SNAPSHOT_SYMBOLS by default')
+    parser.add_argument('--workers', type=int, default=None, help='process pool size, all cores by default')
+    parser.add_argument('--daemon', action='store_true', help='rebuild every weekday at SNAPSHOT_RUN_AT')
+    args = parser.parse_args()
+
+    if args.daemon:
+        run_daemon(symbols=args.symbols or None, workers=args.workers)
+    else:
+        print(snapshot_store.write(build_snapshot(args.symbols or None, workers=args.workers)))
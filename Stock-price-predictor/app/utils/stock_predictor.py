@@ -1,261 +1,460 @@
 import numpy as np
-import pandas as pd
-from statsmodels.tsa.arima.model import ARIMA
-from sklearn.metrics import mean_squared_error
 from datetime import datetime, timedelta
+from .order_search import OrderSearch, TrainingCancelled, fit_model, make_order_search
+from .executors import submit_cpu
+from .metrics import stage_seconds
+from .model_artifact import ARTIFACT_VERSION, CompactARIMA, fit_summary
+from .volatility import TRADING_DAYS, VolatilityState, simple_returns, window_volatility, ewma_volatility
+from .training_data import TrainingWindow, trading_closes
+from .bars import Bars, as_bars
+from .lazy_imports import lazy_module
+import copy
 import logging
 import warnings
 warnings.filterwarnings('ignore')
 
 logger = logging.getLogger(__name__)
 
+pd = lazy_module('pandas')
+stats = lazy_module('scipy.stats')
+
+def forecast_table(forecast_mean, rmse, n, dof, volatility, residual_mean, residual_std,
+                   periods_per_year=TRADING_DAYS):
+    """
+    Prediction bounds and confidence scores for every forecast horizon at once.
+    Returns a dict of NumPy arrays indexed by horizon (step 1 first). Also
+    broadcasts over many series: forecast_mean of shape (series, horizon)
+    with the other arguments as (series, 1) columns.
+    """
+    pred = np.maximum(0.01, np.asarray(forecast_mean, dtype=float))
+    h = np.arange(1, pred.shape[-1] + 1)
+    
+    # Time-varying forecast standard error
+    # Based on: https://stats.stackexchange.com/questions/431467/arima-forecast-confidence-intervals
+    forecast_std = rmse * np.sqrt(1 + h/n + (h * (h-1))/(2 * n))
+    t_value = stats.t.ppf(0.975, dof)
+    
+    # Combine model and market uncertainty
+    model_uncertainty = t_value * forecast_std
+    market_uncertainty = pred * volatility * np.sqrt(h/periods_per_year)
+    total_uncertainty = np.sqrt(model_uncertainty**2 + market_uncertainty**2)
+    
+    lower = np.maximum(0.01, pred - total_uncertainty)
+    upper = pred + total_uncertainty
+    
+    # Residuals of an exact fit (a straight-line history under the drift
+    # fallback) have no spread; count them as centred
+    spread = np.where(np.asarray(residual_std) > 0, residual_std, np.inf)
+    normality = stats.norm.cdf(-np.abs(residual_mean)/spread)
+    
+    # Dynamic confidence score, weighted sum of:
+    confidence = (
+        0.95 * np.exp(-h/periods_per_year) * 0.3  # Time decay (annualized)
+        + (1 - (forecast_std/pred)) * 0.25  # Model accuracy
+        + normality * 0.15  # Residual normality
+        + (1 - np.minimum(1, volatility/0.5)) * 0.15  # Volatility penalty
+        + (1 - (total_uncertainty/pred)) * 0.15  # Relative uncertainty
+    )
+    
+    return {
+        'day': h,
+        'predicted_price': pred,
+        'lower_bound': lower,
+        'upper_bound': upper,
+        'confidence': np.clip(confidence, 0.70, 0.95),
+        'forecast_std': forecast_std
+    }
+
 class StockPredictor:
-    def __init__(self):
+    # Reported as PredictionResponse.model_type
+    model_type = 'ARIMA'
+
+    def __init__(self, order_search=None, reselect_every=21, max_error_ratio=3.0, window=None):
+        self.order_search = order_search or OrderSearch()
+        self.window = window or TrainingWindow()
         self.model = None
         self.training_data = None
         self.last_known_price = None
         self.volatility = None
+        self.volatility_state = None
         self.last_date = None
+        # Business days between observations: 1 unless the bars are weekly or coarser
+        self.step = 1
+        
+        # Incremental update policy: re-run the order search after this many
+        # appended bars, or when new one-step errors exceed the ratio below
+        self.reselect_every = reselect_every
+        self.max_error_ratio = max_error_ratio
+        self.bars_since_search = 0
+        self.search_rmse = None
+        self.search_fits = None
         
     def calculate_volatility(self, prices, window=30):
         """
         Calculate historical volatility using multiple methods and combine them
         Based on research from: https://papers.ssrn.com/sol3/papers.cfm?abstract_id=1502915
+        prices is an array of closes or Bars (including SharedBars), which
+        are put on the model calendar as prepare_data does.
         """
         try:
-            # Calculate returns
-            returns = np.diff(prices) / prices[:-1]
+            periods_per_year = self.periods_per_year
+            if isinstance(prices, Bars):
+                closes, dates, step = trading_closes(prices)
+                prices, _ = self.window.apply(closes, dates)
+                periods_per_year = TRADING_DAYS / step
+            returns = simple_returns(prices)
             
-            # 1. Historical rolling volatility
-            rolling_std = pd.Series(returns).rolling(window=min(window, len(returns))).std()
-            hist_vol = float(rolling_std.iloc[-1] * np.sqrt(252))
+            # 1. Historical volatility over the last window
+            hist_vol = window_volatility(returns, window, periods_per_year)
             
             # 2. EWMA volatility (RiskMetrics approach)
-            lambda_param = 0.94  # RiskMetrics standard
-            weights = np.array([(1 - lambda_param) * lambda_param**i for i in range(len(returns))])
-            weights = weights[::-1]  # Reverse to give more weight to recent observations
-            weights = weights / weights.sum()
-            ewma_vol = np.sqrt(np.sum(weights * returns**2) * 252)
+            ewma_vol = ewma_volatility(returns, periods_per_year=periods_per_year)
             
-            # 3. Parkinson volatility (using high-low range)
-            if hasattr(self, 'high_low_data'):
-                high_prices = self.high_low_data['high'][-window:]
-                low_prices = self.high_low_data['low'][-window:]
-                log_hl = np.log(high_prices / low_prices)
-                park_vol = np.sqrt(1 / (4 * np.log(2)) * np.mean(log_hl**2) * 252)
-            else:
-                park_vol = hist_vol
-            
-            # Combine volatilities with weights
-            combined_vol = (0.4 * hist_vol + 0.4 * ewma_vol + 0.2 * park_vol)
-            
-            return combined_vol
+            return self._combine_volatility(hist_vol, ewma_vol, window, periods_per_year)
             
         except Exception as e:
             logger.error(f"Error calculating volatility: {str(e)}")
             return None
 
+    def _combine_volatility(self, hist_vol, ewma_vol, window=30, periods_per_year=None):
+        periods_per_year = periods_per_year or self.periods_per_year
+        # 3. Parkinson volatility (using high-low range)
+        if hasattr(self, 'high_low_data'):
+            high_prices = self.high_low_data['high'][-window:]
+            low_prices = self.high_low_data['low'][-window:]
+            log_hl = np.log(high_prices / low_prices)
+            park_vol = np.sqrt(1 / (4 * np.log(2)) * np.mean(log_hl**2) * periods_per_year)
+        else:
+            park_vol = hist_vol
+        
+        # Combine volatilities with weights
+        return 0.4 * hist_vol + 0.4 * ewma_vol + 0.2 * park_vol
+
+    @property
+    def periods_per_year(self):
+        return TRADING_DAYS / self.step
+
     def prepare_data(self, historical_data):
-        """Prepare and transform the data for ARIMA modeling"""
+        """
+        Prepare and transform the data for ARIMA modeling. historical_data is
+        Bars (including SharedBars) or the list-of-dicts format.
+        """
         try:
-            # Convert list of dictionaries to DataFrame
-            df = pd.DataFrame(historical_data)
-            
-            # Print sample of raw data for debugging
-            logger.debug(f"Sample date from data: {df['date'].iloc[0]}")
+            bars = as_bars(historical_data)
+            logger.debug(f"Preparing {len(bars)} bars")
             
-            # Convert date strings to datetime
-            df['date'] = pd.to_datetime(df['date'].apply(lambda x: x.split('T')[0]))
-            
-            # Set index and sort
-            df = df.set_index('date').sort_index()
-            logger.debug(f"Index type after conversion: {type(df.index)}")
-            
-            # Create continuous date range
-            full_range = pd.date_range(start=df.index.min(), end=df.index.max(), freq='B')
-            df = df.reindex(full_range)
-            
-            # Forward fill missing values
-            df = df.fillna(method='ffill')
+            # Daily closes on the business-day calendar (weekly and coarser
+            # bars keep their spacing), cut to the training window
+            prices, dates, self.step = trading_closes(bars)
+            prices, dates = self.window.apply(prices, dates)
             
             # Store the last date
-            self.last_date = df.index[-1]
-            
-            # Get closing prices
-            prices = df['close'].values
+            self.last_date = pd.Timestamp(dates[-1])
             
             # Store the last known price
             self.last_known_price = float(prices[-1])
             
-            # Calculate volatility
+            # Calculate volatility, keeping running estimators for update()
             self.volatility = self.calculate_volatility(prices)
+            self.volatility_state = VolatilityState.from_prices(prices, periods_per_year=self.periods_per_year)
             
             logger.debug(f"Processed data shape: {prices.shape}")
-            return prices, df.index
+            return prices, pd.DatetimeIndex(dates)
             
         except Exception as e:
             logger.error(f"Error in prepare_data: {str(e)}")
             raise ValueError(f"Error preparing data: {str(e)}")
 
-    def find_best_parameters(self, data):
+    def find_best_parameters(self, data, progress=None):
         """Find optimal ARIMA parameters"""
-        best_aic = float('inf')
-        best_params = None
-        
-        # Define parameter ranges
-        p_values = range(0, 3)
-        d_values = range(0, 2)
-        q_values = range(0, 3)
-        
-        for p in p_values:
-            for d in d_values:
-                for q in q_values:
-                    try:
-                        model = ARIMA(data, order=(p, d, q))
-                        results = model.fit()
-                        
-                        if results.aic < best_aic:
-                            best_aic = results.aic
-                            best_params = (p, d, q)
-                    except:
-                        continue
-        
-        return best_params or (1, 1, 1)
+        return self.order_search.search(data, progress=progress)
 
-    def train(self, historical_data):
-        """Train ARIMA model with historical data"""
+    def train(self, historical_data, progress=None):
+        """
+        Train ARIMA model with historical data. progress, if given, is called
+        as progress(stage, details) as each stage finishes and may raise
+        TrainingCancelled to abandon the run.
+        """
         try:
             logger.info("Starting data preparation")
-            prices, dates = self.prepare_data(historical_data)
+            with stage_seconds.time(stage='data_preparation'):
+                prices, dates = self.prepare_data(historical_data)
             self.training_data = prices
+            if progress is not None:
+                progress('data_prepared', {'observations': len(prices)})
             
             logger.info("Finding best parameters")
-            best_params = self.find_best_parameters(prices)
+            with stage_seconds.time(stage='order_search'):
+                best_params = self.find_best_parameters(prices, progress)
             logger.info(f"Best ARIMA parameters: {best_params}")
+            if progress is not None:
+                progress('order_selected', {
+                    'order': list(best_params),
+                    'aic': self.order_search.best_aic,
+                    'fits': self.order_search.fits
+                })
             
-            # Fit ARIMA model
-            self.model = ARIMA(prices, order=best_params)
-            self.model = self.model.fit()
+            # Fit ARIMA model on the process pool
+            with stage_seconds.time(stage='final_fit'):
+                self.model = submit_cpu(fit_model, prices, best_params).result()
+            self.search_fits = self.order_search.fits
+            self.bars_since_search = 0
+            self.search_rmse = float(np.sqrt(np.mean(self.model.resid[1:]**2)))
             logger.info("Model training completed")
+            if progress is not None:
+                progress('model_fitted', {'order': list(best_params)})
             
+        except TrainingCancelled:
+            logger.info("Training cancelled")
+            raise
         except Exception as e:
             logger.error(f"Error in train method: {str(e)}")
             raise ValueError(f"Error training model: {str(e)}")
 
-    def predict_next_days(self, days=7):
+    def _new_prices(self, historical_data):
+        """Closing prices after last_date, on the same calendar as prepare_data"""
+        bars = as_bars(historical_data)
+        closes, dates, _ = trading_closes(bars)
+        new = dates > np.datetime64(self.last_date.date())
+        if not new.any():
+            return np.array([]), self.last_date
+        return closes[new].astype(float), pd.Timestamp(dates[new][-1])
+
+    def update(self, historical_data, progress=None):
+        """
+        Extend the fitted model with bars newer than last_date instead of retraining.
+        The chosen order and fitted parameters are kept; a full train() runs instead
+        when the order is due for re-selection or the new one-step errors degrade.
+        Returns True if the model was updated incrementally.
+        """
         if self.model is None:
-            raise ValueError("Model not trained. Call train() first.")
+            self.train(historical_data, progress)
+            return False
         
         try:
-            # Get forecast and confidence intervals
-            forecast_result = self.model.get_forecast(steps=days)
-            forecast_mean = forecast_result.predicted_mean
-            conf_int = forecast_result.conf_int(alpha=0.05)  # 95% confidence interval
+            new_prices, new_last_date = self._new_prices(historical_data)
+            if len(new_prices) == 0:
+                return True
             
-            # Calculate prediction intervals using sophisticated method
-            residuals = self.model.resid
-            rmse = np.sqrt(np.mean(residuals**2))
+            if self.bars_since_search + len(new_prices) >= self.reselect_every:
+                logger.info("Scheduled order re-selection, retraining")
+                self.train(historical_data, progress)
+                return False
             
-            # Calculate degrees of freedom
-            n = len(self.training_data)
-            k = sum(self.model.specification.ar_lags) + sum(self.model.specification.ma_lags) + 1
-            dof = n - k
+            with stage_seconds.time(stage='incremental_update'):
+                model = self.model.append(new_prices)
+            new_errors = np.asarray(model.resid)[-len(new_prices):]
+            new_rmse = float(np.sqrt(np.mean(new_errors**2)))
+            if self.search_rmse and new_rmse > self.max_error_ratio * self.search_rmse:
+                logger.info(f"One-step error {new_rmse:.4f} above threshold, retraining")
+                self.train(historical_data, progress)
+                return False
             
-            predictions = []
-            for i in range(days):
-                pred = max(0.01, float(forecast_mean[i]))
-                
-                # Time-varying forecast standard error
-                # Based on: https://stats.stackexchange.com/questions/431467/arima-forecast-confidence-intervals
-                h = i + 1  # forecast horizon
-                forecast_std = rmse * np.sqrt(1 + h/n + (h * (h-1))/(2 * n))
-                
-                # Calculate t-statistic for confidence interval
-                from scipy import stats
-                t_value = stats.t.ppf(0.975, dof)
-                
-                # Calculate uncertainty components
-                model_uncertainty = t_value * forecast_std
-                market_uncertainty = pred * self.volatility * np.sqrt(h/252)
-                
-                # Combine uncertainties
-                total_uncertainty = np.sqrt(model_uncertainty**2 + market_uncertainty**2)
-                
-                # Calculate bounds
-                lower = max(0.01, pred - total_uncertainty)
-                upper = pred + total_uncertainty
-                
-                # Calculate dynamic confidence score
-                confidence_factors = [
-                    0.95 * np.exp(-h/252),  # Time decay (annualized)
-                    1 - (forecast_std/pred),  # Model accuracy
-                    stats.norm.cdf(-abs(residuals.mean())/residuals.std()),  # Residual normality
-                    1 - min(1, self.volatility/0.5),  # Volatility penalty
-                    1 - (total_uncertainty/pred)  # Relative uncertainty
-                ]
-                
-                # Weight factors based on importance
-                weights = [0.3, 0.25, 0.15, 0.15, 0.15]
-                confidence_level = max(0.70, min(0.95,
-                    sum(f * w for f, w in zip(confidence_factors, weights))
-                ))
-                
-                predictions.append({
-                    'date': forecast_result.row_labels[i].strftime('%Y-%m-%d'),
-                    'predicted_price': float(pred),
-                    'lower_bound': float(lower),
-                    'upper_bound': float(upper),
-                    'confidence': float(confidence_level),
-                    'volatility': float(self.volatility),
-                    'prediction_interval': f"{float(lower):.2f} - {float(upper):.2f}"
-                })
-            
-            # Calculate model accuracy instead of confidence
-            accuracy = float(1 - rmse/np.mean(self.training_data))
-            
-            return {
-                'predictions': predictions,
-                'model_metrics': {
-                    'accuracy': accuracy,  # Use this as the main metric in header
-                    'rmse': float(rmse),
-                    'volatility': float(self.volatility),
-                    'last_known_price': float(self.last_known_price)
-                }
-            }
+            self.model = model
+            if self.training_data is not None:
+                self.training_data = np.concatenate([self.training_data, new_prices])
+            self.bars_since_search += len(new_prices)
+            self.last_date = new_last_date
+            self.last_known_price = float(new_prices[-1])
+            # Copy first: cached predictors are shallow-copied before update()
+            self.volatility_state = self.volatility_state.copy()
+            self.volatility_state.update(new_prices)
+            self.volatility = self._combine_volatility(
+                self.volatility_state.window_volatility(),
+                self.volatility_state.ewma_volatility()
+            )
+            logger.info(f"Appended {len(new_prices)} new observations to the model")
+            if progress is not None:
+                progress('model_updated', {'appended': len(new_prices)})
+            return True
             
+        except TrainingCancelled:
+            raise
+        except Exception as e:
+            logger.error(f"Error in update method: {str(e)}")
+            raise ValueError(f"Error updating model: {str(e)}")
+
+    def predict_next_days(self, days=7):
+        if self.model is None:
+            raise ValueError("Model not trained. Call train() first.")
+        
+        try:
+            with stage_seconds.time(stage='prediction'):
+                return self._forecast_records(days)
         except Exception as e:
             logger.error(f"Error in predict_next_days: {str(e)}")
             raise ValueError(f"Error generating predictions: {str(e)}")
 
+    def _forecast_records(self, days):
+        """Forecast table for predict_next_days as response records"""
+        forecast_mean = np.asarray(self.model.forecast(steps=days), dtype=float)
+        
+        # Calculate prediction intervals using sophisticated method
+        summary = self._fit_summary()
+        rmse = summary['rmse']
+        
+        # Calculate degrees of freedom
+        n = summary['nobs']
+        dof = n - summary['k']
+        
+        table = forecast_table(
+            forecast_mean, rmse, n, dof, self.volatility,
+            summary['resid_mean'], summary['resid_std'], self.periods_per_year
+        )
+        step = self.step
+        dates = pd.bdate_range(self.last_date, periods=days * step + 1)[step::step].strftime('%Y-%m-%d')
+        
+        predictions = [
+            {
+                'day': h,
+                'date': date,
+                'predicted_price': pred,
+                'lower_bound': lower,
+                'upper_bound': upper,
+                'confidence': confidence,
+                'volatility': float(self.volatility)
+            }
+            for h, date, pred, lower, upper, confidence in zip(
+                table['day'].tolist(),
+                dates,
+                table['predicted_price'].tolist(),
+                table['lower_bound'].tolist(),
+                table['upper_bound'].tolist(),
+                table['confidence'].tolist()
+            )
+        ]
+        
+        # Calculate model accuracy instead of confidence
+        accuracy = float(1 - rmse/summary['data_mean'])
+        
+        return {
+            'predictions': predictions,
+            'model_metrics': {
+                'accuracy': accuracy,  # Use this as the main metric in header
+                'rmse': float(rmse),
+                'volatility': float(self.volatility),
+                'last_known_price': float(self.last_known_price)
+            }
+        }
+
+    @property
+    def order(self):
+        return tuple(self.model.order if isinstance(self.model, CompactARIMA) else self.model.model.order)
+
+    def _fit_summary(self):
+        """Residual and sample statistics for the forecast bounds and metrics"""
+        if isinstance(self.model, CompactARIMA):
+            return self.model.summary()
+        return fit_summary(self.model, self.training_data)
+
+    def compact(self):
+        """
+        Copy of this predictor holding a CompactARIMA instead of the full
+        results and training series. It forecasts, updates and reports
+        metrics the same way at a fraction of the memory.
+        """
+        if self.model is None:
+            raise ValueError("Model not trained. Call train() first.")
+        predictor = copy.copy(self)
+        if not isinstance(self.model, CompactARIMA):
+            predictor.model = CompactARIMA.from_results(self.model, self.training_data)
+        predictor.training_data = None
+        return predictor
+
+    def to_artifact(self):
+        """JSON-serializable model artifact for persistence"""
+        model = self.compact().model
+        state = self.volatility_state
+        return {
+            'version': ARTIFACT_VERSION,
+            'model': model.to_dict(),
+            'order_search': self.order_search.mode,
+            'search_fits': self.search_fits,
+            'search_rmse': self.search_rmse,
+            'bars_since_search': self.bars_since_search,
+            'reselect_every': self.reselect_every,
+            'max_error_ratio': self.max_error_ratio,
+            'last_date': self.last_date.strftime('%Y-%m-%d'),
+            'step': self.step,
+            'last_known_price': self.last_known_price,
+            'volatility': self.volatility,
+            'volatility_state': {
+                'window': state.window,
+                'lambda_param': state.lambda_param,
+                'periods_per_year': state.periods_per_year,
+                'last_price': state.last_price,
+                'recent_returns': list(state.recent_returns),
+                'weighted_squares': state.weighted_squares,
+                'weight_total': state.weight_total,
+            },
+            'metrics': self.get_model_metrics(),
+        }
+
+    @classmethod
+    def from_artifact(cls, artifact):
+        """Rebuild a compact predictor from to_artifact() output"""
+        if artifact.get('version') != ARTIFACT_VERSION:
+            raise ValueError(f"Unsupported model artifact version {artifact.get('version')}")
+        predictor = cls(
+            make_order_search(artifact['order_search']),
+            reselect_every=artifact['reselect_every'],
+            max_error_ratio=artifact['max_error_ratio']
+        )
+        predictor.model = CompactARIMA.from_dict(artifact['model'])
+        predictor.search_fits = artifact['search_fits']
+        predictor.search_rmse = artifact['search_rmse']
+        predictor.bars_since_search = artifact['bars_since_search']
+        predictor.last_date = pd.Timestamp(artifact['last_date'])
+        predictor.step = artifact.get('step', 1)
+        predictor.last_known_price = artifact['last_known_price']
+        predictor.volatility = artifact['volatility']
+
+        saved = artifact['volatility_state']
+        state = VolatilityState(saved['window'], saved['lambda_param'], saved.get('periods_per_year', TRADING_DAYS))
+        state.last_price = saved['last_price']
+        state.recent_returns.extend(saved['recent_returns'])
+        state.weighted_squares = saved['weighted_squares']
+        state.weight_total = saved['weight_total']
+        predictor.volatility_state = state
+        return predictor
+
     def get_model_metrics(self):
         """Return model performance metrics"""
         if self.model is None:
             raise ValueError("Model not trained. Call train() first.")
         
         try:
-            # Get in-sample predictions and residuals
-            fitted_values = self.model.fittedvalues
-            residuals = self.model.resid
-            
-            # Calculate error metrics
-            mse = mean_squared_error(self.training_data[1:], fitted_values[1:])
-            rmse = np.sqrt(mse)
-            mae = np.mean(np.abs(residuals))
+            summary = self._fit_summary()
+            rmse = summary['fit_rmse']
+            mae = summary['mae']
             
             # Calculate prediction accuracy
             accuracy = 1 - (mae / self.last_known_price)
             
             return {
-                'aic': float(self.model.aic),
-                'bic': float(self.model.bic),
+                'aic': summary['aic'],
+                'bic': summary['bic'],
                 'rmse': float(rmse),
                 'mae': float(mae),
                 'accuracy': float(accuracy),
                 'volatility': float(self.volatility),
                 'last_known_price': float(self.last_known_price),
-                'last_date': self.last_date.strftime('%Y-%m-%d')
+                'last_date': self.last_date.strftime('%Y-%m-%d'),
+                'order': list(self.order),
+                'order_search': self.order_search.mode,
+                'order_search_fits': self.search_fits
             }
             
         except Exception as e:
             logger.error(f"Error in get_model_metrics: {str(e)}")
-            raise ValueError(f"Error calculating metrics: {str(e)}")
\ No newline at end of file
+            raise ValueError(f"Error calculating metrics: {str(e)}")
+
+def train_predictor(bars, search=None):
+    """
+    Train a predictor on bars and return it compacted. Meant to run on pool
+    workers, where the order search and final fit run inline; only the small
+    compact model is pickled back.
+    """
+    predictor = StockPredictor(make_order_search(search))
+    predictor.train(bars)
+    return predictor.compact()
@@ -0,0 +1,70 @@
+import os
+import numpy as np
+
+# Training window policy: fit on at most this many observations, none older
+# than this many years before the last one. 0 disables either limit.
+TRAINING_MAX_OBSERVATIONS = int(os.getenv('TRAINING_MAX_OBSERVATIONS', 2520))
+TRAINING_LOOKBACK_YEARS = float(os.getenv('TRAINING_LOOKBACK_YEARS', 10))
+
+
+def bar_step(days):
+    """Median spacing of sorted bar dates in business days, 1 for daily bars"""
+    if len(days) < 3:
+        return 1
+    step = int(round(float(np.median(np.busday_count(days[:-1], days[1:])))))
+    return step if step >= 2 else 1
+
+
+def trading_closes(bars):
+    """
+    Closing prices on the calendar the model is fitted on, built with
+    vectorized NumPy ops. Intraday bars are reduced to the last close of each
+    session and daily bars are placed on the business-day calendar with gaps
+    forward-filled, so one observation is one trading day. Weekly and coarser
+    bars keep their own spacing instead of being repeated over the days in
+    between. Returns (closes, dates, step) with step the spacing in business
+    days, 1 for daily and intraday bars.
+    """
+    days = bars.index.astype('datetime64[D]')
+    last_of_day = np.append(days[1:] != days[:-1], True)
+    days, closes = days[last_of_day], bars.close[last_of_day]
+
+    step = bar_step(days)
+    if step > 1:
+        return closes, days, step
+
+    business = np.is_busday(days)
+    days, closes = days[business], closes[business]
+    positions = np.busday_count(days[0], days)
+    # Index of the latest bar at or before every business day
+    latest = np.full(positions[-1] + 1, -1)
+    latest[positions] = np.arange(len(days))
+    latest = np.maximum.accumulate(latest)
+    dates = np.busday_offset(days[0], np.arange(len(latest)))
+    return closes[latest], dates, 1
+
+
+class TrainingWindow:
+    """
+    How much of a prepared series a model is fitted on. Limits apply after
+    resampling, so the lookback covers the same span of time whatever the
+    bar interval, and fit cost stays bounded whatever period was requested.
+    """
+
+    def __init__(self, max_observations=TRAINING_MAX_OBSERVATIONS, lookback_years=TRAINING_LOOKBACK_YEARS):
+        self.max_observations = max_observations or None
+        self.lookback_years = lookback_years or None
+
+    def start(self, dates):
+        """Position of the first observation inside the window"""
+        start = 0
+        if self.lookback_years is not None and len(dates):
+            cutoff = dates[-1] - np.timedelta64(int(round(self.lookback_years * 365.25)), 'D')
+            start = int(np.searchsorted(dates, cutoff))
+        if self.max_observations is not None:
+            start = max(start, len(dates) - self.max_observations)
+        return start
+
+    def apply(self, closes, dates):
+        start = self.start(dates)
+        return closes[start:], dates[start:]
@@ -0,0 +1,89 @@
+from collections import deque
+import numpy as np
+
+TRADING_DAYS = 252
+RISKMETRICS_LAMBDA = 0.94  # RiskMetrics standard
+
+
+def ewma_horizon(lambda_param=RISKMETRICS_LAMBDA, tolerance=1e-18):
+    """Number of most recent returns whose EWMA weight is above tolerance"""
+    return int(np.ceil(np.log(tolerance) / np.log(lambda_param))) + 1
+
+
+def simple_returns(prices):
+    prices = np.asarray(prices, dtype=float)
+    return np.diff(prices) / prices[:-1]
+
+
+def window_volatility(returns, window=30, periods_per_year=TRADING_DAYS):
+    """Annualized sample std of the last window returns (the last value of a rolling std)"""
+    tail = returns[-min(window, len(returns)):]
+    return float(np.std(tail, ddof=1) * np.sqrt(periods_per_year))
+
+
+def _ewma_sums(returns, lambda_param):
+    """Weighted sums of squared returns and of weights, newest return weighted 1"""
+    tail = returns[-ewma_horizon(lambda_param):]
+    weights = lambda_param ** np.arange(len(tail) - 1, -1, -1, dtype=float)
+    return float(np.dot(weights, tail**2)), float(weights.sum())
+
+
+def ewma_volatility(returns, lambda_param=RISKMETRICS_LAMBDA, periods_per_year=TRADING_DAYS):
+    """
+    Annualized RiskMetrics EWMA volatility. Weights older than ewma_horizon()
+    are below 1e-18 of the newest one, so only that tail is summed.
+    """
+    weighted, total = _ewma_sums(returns, lambda_param)
+    return float(np.sqrt(weighted / total * periods_per_year))
+
+
+class VolatilityState:
+    """
+    Running rolling-window and EWMA estimators that take new prices one at a
+    time, so an appended bar costs O(1) instead of a pass over the history.
+    """
+
+    def __init__(self, window=30, lambda_param=RISKMETRICS_LAMBDA, periods_per_year=TRADING_DAYS):
+        self.window = window
+        self.lambda_param = lambda_param
+        self.periods_per_year = periods_per_year
+        self.last_price = None
+        self.recent_returns = deque(maxlen=window)
+        self.weighted_squares = 0.0
+        self.weight_total = 0.0
+
+    @classmethod
+    def from_prices(cls, prices, window=30, lambda_param=RISKMETRICS_LAMBDA, periods_per_year=TRADING_DAYS):
+        state = cls(window, lambda_param, periods_per_year)
+        prices = np.asarray(prices, dtype=float)
+        returns = simple_returns(prices)
+        state.last_price = float(prices[-1])
+        state.recent_returns.extend(returns[-window:].tolist())
+        state.weighted_squares, state.weight_total = _ewma_sums(returns, lambda_param)
+        return state
+
+    def copy(self):
+        state = VolatilityState(self.window, self.lambda_param, self.periods_per_year)
+        state.last_price = self.last_price
+        state.recent_returns.extend(self.recent_returns)
+        state.weighted_squares = self.weighted_squares
+        state.weight_total = self.weight_total
+        return state
+
+    def update(self, prices):
+        """Add new prices in chronological order"""
+        for price in np.asarray(prices, dtype=float).tolist():
+            if self.last_price is not None:
+                r = (price - self.last_price) / self.last_price
+                self.recent_returns.append(r)
+                self.weighted_squares = self.lambda_param * self.weighted_squares + r * r
+                self.weight_total = self.lambda_param * self.weight_total + 1.0
+            self.last_price = price
+
+    def window_volatility(self):
+        return window_volatility(
+            np.fromiter(self.recent_returns, dtype=float), self.window, self.periods_per_year
+        )
+
+    def ewma_volatility(self):
+        return float(np.sqrt(self.weighted_squares / self.weight_total * self.periods_per_year))
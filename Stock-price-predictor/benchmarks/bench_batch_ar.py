@@ -0,0 +1,96 @@
+"""
+Cross-sectional forecasting benchmark.
+
+Forecasts a universe of synthetic daily symbols with the batched AR engine
+(one vectorized fit of ARIMA(p,1,0), p <= 3, for every symbol) and compares
+it with fitting StockPredictor one symbol at a time. Sequential fits are
+timed on a sample of the universe and scaled up, since fitting all of them
+takes minutes:
+
+    python benchmarks/bench_batch_ar.py
+    python benchmarks/bench_batch_ar.py --symbols 500 --length 1260 --sample 20 --output benchmarks/results/batch_ar.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import logging
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import synthetic_bars
+from app.utils.batch_ar import batch_forecast
+from app.utils.stock_predictor import StockPredictor
+from app.utils.order_search import OrderSearch, ORDER_SEARCH_MODES, make_order_search
+
+logging.disable(logging.INFO)
+warnings.filterwarnings('ignore')
+
+
+def sequential_seconds(bars_list, days, make_search):
+    """Seconds per symbol to train a StockPredictor and forecast, one symbol at a time"""
+    started = time.perf_counter()
+    for bars in bars_list:
+        predictor = StockPredictor(make_search())
+        predictor.train(bars)
+        predictor.predict_next_days(days)
+        predictor.get_model_metrics()
+    return (time.perf_counter() - started) / len(bars_list)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--symbols', type=int, default=500)
+    parser.add_argument('--length', type=int, default=1260, help='bars per symbol')
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--sample', type=int, default=10, help='symbols fitted sequentially')
+    parser.add_argument('--search', choices=ORDER_SEARCH_MODES, default='grid',
+                        help='order search of the sequential baseline')
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--output', default=None, help='JSON file to write results to')
+    args = parser.parse_args(argv)
+
+    universe = {f"SYM{i:04d}": synthetic_bars(args.length, seed=i) for i in range(args.symbols)}
+
+    batch_forecast(universe, args.days)  # warm up imports
+    times = []
+    for _ in range(args.repeats):
+        started = time.perf_counter()
+        results = batch_forecast(universe, args.days)
+        times.append(time.perf_counter() - started)
+    batch = statistics.median(times)
+    failed = sum(isinstance(result, Exception) for result in results.values())
+
+    sample = list(universe.values())[:args.sample]
+    fixed = sequential_seconds(sample, args.days, lambda: OrderSearch(max_workers=1, orders=[(1, 1, 0)]))
+    searched = sequential_seconds(sample, args.days, lambda: make_order_search(args.search, max_workers=1))
+
+    summary = {
+        'symbols': args.symbols,
+        'length': args.length,
+        'batch_seconds': batch,
+        'batch_failed': failed,
+        'sequential_fixed_order_seconds': fixed * args.symbols,
+        'sequential_search_seconds': searched * args.symbols,
+    }
+    rows = [
+        (f"batch AR, {args.symbols} symbols", batch),
+        (f"sequential ARIMA(1,1,0), scaled from {len(sample)}", fixed * args.symbols),
+        (f"sequential {args.search} search, scaled from {len(sample)}", searched * args.symbols),
+    ]
+    for label, seconds in rows:
+        print(f"{label:<44} {seconds:9.2f} s   {seconds / batch:6.0f}x")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""
+Offline benchmark for the forecast pipeline.
+
+Times every StockPredictor stage separately on synthetic and recorded OHLCV
+fixtures across history lengths, intervals and forecast horizons, and writes
+the results as JSON so runs from different versions can be compared:
+
+    python benchmarks/bench_forecast_pipeline.py --output results/base.json
+    python benchmarks/bench_forecast_pipeline.py --compare results/base.json
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+import statistics
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import FIXTURES_DIR, synthetic_bars, recorded_fixtures
+from app.utils.stock_predictor import StockPredictor
+from app.utils.order_search import ORDER_SEARCH_MODES, make_order_search, fit_model
+
+logging.disable(logging.INFO)
+
+STAGES = [
+    'prepare_data',
+    'calculate_volatility',
+    'find_best_parameters',
+    'fit',
+    'predict_next_days',
+    'get_model_metrics',
+]
+
+DEFAULT_LENGTHS = [252, 1260, 2520]
+DEFAULT_INTERVALS = ['1d', '1h']
+DEFAULT_HORIZONS = [7, 30, 365]
+
+
+def _timed(func, *args, **kwargs):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def run_pipeline(bars, horizons, workers, search='grid'):
+    """Run every stage once and return {stage: seconds}, prediction timed per horizon"""
+    predictor = StockPredictor(make_order_search(search, max_workers=workers))
+    timings = {}
+
+    (prices, _), timings['prepare_data'] = _timed(predictor.prepare_data, bars)
+    _, timings['calculate_volatility'] = _timed(predictor.calculate_volatility, prices)
+    order, timings['find_best_parameters'] = _timed(predictor.find_best_parameters, prices)
+    predictor.model, timings['fit'] = _timed(fit_model, prices, order)
+    predictor.training_data = prices
+
+    for days in horizons:
+        _, timings[f'predict_next_days[{days}]'] = _timed(predictor.predict_next_days, days=days)
+    _, timings['get_model_metrics'] = _timed(predictor.get_model_metrics)
+
+    return timings, {
+        'order': list(order),
+        'fits': predictor.order_search.fits,
+        'observations': int(len(prices)),
+    }
+
+
+def summarize(samples):
+    return {
+        'median': statistics.median(samples),
+        'min': min(samples),
+        'max': max(samples),
+        'runs': len(samples),
+    }
+
+
+def benchmark_case(name, bars, horizons, repeats, workers, search='grid'):
+    runs = []
+    info = None
+    for _ in range(repeats):
+        timings, info = run_pipeline(bars, horizons, workers, search)
+        runs.append(timings)
+
+    stages = {stage: summarize([run[stage] for run in runs]) for stage in runs[0]}
+    total = summarize([sum(run.values()) for run in runs])
+    print(f"{name:<32} total {total['median'] * 1000:9.1f} ms  order {tuple(info['order'])}  fits {info['fits']}")
+    for stage, summary in stages.items():
+        print(f"    {stage:<28} {summary['median'] * 1000:9.2f} ms")
+    return {'name': name, 'bars': len(bars), **info, 'stages': stages, 'total': total}
+
+
+def environment():
+    try:
+        revision = subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+
+    import numpy, pandas, statsmodels
+    return {
+        'git_revision': revision,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': numpy.__version__,
+        'pandas': pandas.__version__,
+        'statsmodels': statsmodels.__version__,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def compare(results, baseline_path, threshold):
+    """Print stages that got slower than the baseline by more than threshold"""
+    with open(baseline_path) as f:
+        baseline = {case['name']: case for case in json.load(f)['cases']}
+
+    regressions = []
+    for case in results['cases']:
+        previous = baseline.get(case['name'])
+        if previous is None:
+            continue
+        for stage, summary in case['stages'].items():
+            before = previous['stages'].get(stage, {}).get('median')
+            if before and summary['median'] > before * (1 + threshold):
+                regressions.append((case['name'], stage, before, summary['median']))
+
+    for name, stage, before, after in regressions:
+        print(f"REGRESSION {name} {stage}: {before * 1000:.2f} ms -> {after * 1000:.2f} ms")
+    if not regressions:
+        print(f"No stage slower than baseline by more than {threshold:.0%}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lengths', type=int, nargs='+', default=DEFAULT_LENGTHS)
+    parser.add_argument('--intervals', nargs='+', default=DEFAULT_INTERVALS)
+    parser.add_argument('--horizons', type=int, nargs='+', default=DEFAULT_HORIZONS)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=1, help='order search workers, 1 = serial')
+    parser.add_argument('--search', choices=ORDER_SEARCH_MODES, default='grid', help='order search strategy')
+    parser.add_argument('--fixtures', default=FIXTURES_DIR, help='directory of recorded CSV fixtures')
+    parser.add_argument('--require-recorded', action='store_true',
+                        help='fail instead of running on synthetic bars only when no fixture is recorded')
+    parser.add_argument('--output', default=None, help='JSON file to write results to')
+    parser.add_argument('--compare', default=None, help='baseline JSON to check for regressions')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed slowdown before flagging')
+    args = parser.parse_args(argv)
+
+    recorded = recorded_fixtures(args.fixtures)
+    if not recorded:
+        print(f"No recorded fixtures in {args.fixtures}, results are for synthetic bars only. "
+              f"Record one with: python benchmarks/fixtures.py AAPL --period 5y --interval 1d")
+        if args.require_recorded:
+            return 2
+
+    cases = []
+    for interval in args.intervals:
+        for length in args.lengths:
+            bars = synthetic_bars(length, interval=interval, seed=length)
+            cases.append(benchmark_case(f"synthetic_{interval}_{length}", bars, args.horizons, args.repeats, args.workers, args.search))
+
+    for name, bars in recorded.items():
+        cases.append(benchmark_case(f"recorded_{name}", bars, args.horizons, args.repeats, args.workers, args.search))
+
+    results = {
+        'environment': environment(), 'workers': args.workers, 'search': args.search,
+        'recorded_fixtures': sorted(recorded), 'cases': cases,
+    }
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        return 1 if compare(results, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
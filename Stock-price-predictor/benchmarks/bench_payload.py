@@ -0,0 +1,122 @@
+"""
+Payload benchmark for the historical data and forecast endpoints.
+
+Encodes the same synthetic bars and forecasts the way the endpoints used to
+(row records run through FastAPI's jsonable_encoder, sent uncompressed) and
+the way they do now (JSONResponse straight from the lists, records or
+columnar, then gzip and brotli when installed), and reports the bytes on the
+wire and the encode time of each:
+
+    python benchmarks/bench_payload.py
+    python benchmarks/bench_payload.py --lengths 1260 --output benchmarks/results/payload.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import JSONResponse
+from benchmarks.fixtures import synthetic_bars
+from app.utils import compression
+from app.utils.stock_predictor import StockPredictor
+from app.utils.order_search import OrderSearch
+from app.routers.predictions import PredictionResponse
+
+logging.disable(logging.INFO)
+
+DEFAULT_LENGTHS = [252, 1260, 2520]
+DEFAULT_HORIZONS = [30, 365]
+
+
+def _timed(func, repeats):
+    """(result, median seconds) of repeats calls"""
+    times = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - started)
+    return result, statistics.median(times)
+
+
+def measure(name, encode, repeats):
+    """Rows for the identity body and every supported compression of it"""
+    body, seconds = _timed(encode, repeats)
+    rows = [{'case': name, 'encoding': 'identity', 'bytes': len(body), 'encode_ms': seconds * 1000}]
+    for encoding in compression.supported_encodings():
+        compressed, compress_seconds = _timed(lambda: compression.compress(body, encoding), repeats)
+        rows.append({
+            'case': name, 'encoding': encoding, 'bytes': len(compressed),
+            'encode_ms': (seconds + compress_seconds) * 1000,
+        })
+    return rows
+
+
+def historical_cases(bars, repeats):
+    symbol = 'BENCH'
+    before = lambda: JSONResponse(jsonable_encoder({'symbol': symbol, 'data': bars.to_records()})).body
+    records = lambda: JSONResponse({'symbol': symbol, 'data': bars.to_records()}).body
+    columnar = lambda: JSONResponse({'symbol': symbol, 'format': 'columnar', 'data': bars.to_columns()}).body
+    name = f"historical_{len(bars)}"
+    return (
+        measure(f"{name}_before", before, repeats)[:1]
+        + measure(f"{name}_records", records, repeats)
+        + measure(f"{name}_columnar", columnar, repeats)
+    )
+
+
+def forecast_cases(bars, horizons, repeats):
+    predictor = StockPredictor(OrderSearch(max_workers=1, orders=[(1, 1, 1)]))
+    predictor.train(bars)
+    metrics = predictor.get_model_metrics()
+    rows = []
+    for days in horizons:
+        predictions = predictor.predict_next_days(days)['predictions']
+        # What predict_next_days used to add to every row
+        legacy = [
+            {**row, 'prediction_interval': f"{row['lower_bound']:.2f} - {row['upper_bound']:.2f}"}
+            for row in predictions
+        ]
+        response = lambda rows: PredictionResponse(
+            symbol='BENCH', predictions=rows, forecast_days=days, training_period='5y',
+            data_points_used=len(bars), model_metrics=metrics
+        )
+        before = lambda: JSONResponse(jsonable_encoder({'symbol': 'BENCH', 'predictions': legacy})).body
+        after = lambda: response(predictions).model_dump_json().encode()
+        rows += measure(f"forecast_{days}d_before", before, repeats)[:1]
+        rows += measure(f"forecast_{days}d", after, repeats)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lengths', type=int, nargs='+', default=DEFAULT_LENGTHS)
+    parser.add_argument('--horizons', type=int, nargs='+', default=DEFAULT_HORIZONS)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--output', default=None, help='JSON file to write results to')
+    args = parser.parse_args(argv)
+
+    rows = []
+    for length in args.lengths:
+        rows += historical_cases(synthetic_bars(length, seed=length), args.repeats)
+    rows += forecast_cases(synthetic_bars(max(args.lengths), seed=0), args.horizons, args.repeats)
+
+    print(f"{'case':<32} {'encoding':<9} {'bytes':>10} {'encode ms':>10}")
+    for row in rows:
+        print(f"{row['case']:<32} {row['encoding']:<9} {row['bytes']:>10} {row['encode_ms']:>10.2f}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump({'brotli': compression.brotli is not None, 'rows': rows}, f, indent=2)
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
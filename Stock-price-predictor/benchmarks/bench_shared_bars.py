@@ -0,0 +1,83 @@
+"""
+Shared-memory bars benchmark.
+
+Sends a universe of synthetic daily histories to a process pool worker three
+ways: the list-of-dicts format from get_historical_data, pickled Bars and
+SharedBars (only the block name is pickled, the worker attaches to it), and
+reports the pickled bytes and the wall time for the workers to run
+prepare_data on every history:
+
+    python benchmarks/bench_shared_bars.py
+    python benchmarks/bench_shared_bars.py --symbols 500 --length 2520 --output benchmarks/results/shared_bars.json
+"""
+import os
+import sys
+import json
+import time
+import pickle
+import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import synthetic_bars
+from app.utils.shared_bars import SharedBars
+from app.utils.stock_predictor import StockPredictor
+
+logging.disable(logging.INFO)
+
+
+def prepare(history):
+    """Worker task: prepare a history for fitting, returning only its volatility"""
+    predictor = StockPredictor()
+    predictor.prepare_data(history)
+    return predictor.volatility
+
+
+def worker_seconds(pool, histories):
+    """Seconds for the pool to prepare every history"""
+    started = time.perf_counter()
+    list(pool.map(prepare, histories, chunksize=16))
+    return time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--symbols', type=int, default=200)
+    parser.add_argument('--length', type=int, default=2520, help='bars per symbol')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--output', default=None, help='JSON file to write results to')
+    args = parser.parse_args(argv)
+
+    bars = [synthetic_bars(args.length, seed=i) for i in range(args.symbols)]
+    cases = {'records': [b.to_records() for b in bars], 'bars': bars}
+    shared = [SharedBars.create(b) for b in bars]
+    cases['shared_bars'] = shared
+
+    rows = []
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        worker_seconds(pool, bars[:args.workers])  # start the workers
+        for name, histories in cases.items():
+            rows.append({
+                'case': name,
+                'pickled_bytes': sum(len(pickle.dumps(h)) for h in histories),
+                'seconds': worker_seconds(pool, histories),
+            })
+    for block in shared:
+        block.release()
+
+    print(f"{'case':<12} {'pickled bytes':>14} {'seconds':>9}")
+    for row in rows:
+        print(f"{row['case']:<12} {row['pickled_bytes']:>14} {row['seconds']:>9.3f}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump({'symbols': args.symbols, 'length': args.length, 'rows': rows}, f, indent=2)
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""
+Startup benchmark for the API server.
+
+Starts a fresh interpreter per run, imports main, answers GET /health through
+the ASGI app and then preloads the lazily imported modules, timing each step.
+The -X importtime output of the runs gives a per-package breakdown of where
+import time goes:
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeats 10 --output benchmarks/results/startup.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PRELOAD_MARKER = '--- preload ---'
+
+CHILD = r'''
+import sys, json, time, asyncio
+PRELOAD_MARKER = %r
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+async def health():
+    messages = []
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': '/health', 'raw_path': b'/health', 'query_string': b'',
+        'headers': [], 'server': ('bench', 80), 'client': ('bench', 1), 'root_path': '',
+    }
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+    async def send(message):
+        messages.append(message)
+    await main.app(scope, receive, send)
+    return messages[0]['status']
+
+status = asyncio.run(health())
+answered = time.perf_counter()
+
+print(PRELOAD_MARKER, file=sys.stderr, flush=True)
+from app.utils import lazy_imports
+lazy_imports.preload()
+preloaded = time.perf_counter()
+
+print(json.dumps({
+    'import_main': imported - started,
+    'first_health': answered - imported,
+    'health_status': status,
+    'preload': preloaded - answered,
+    'preload_modules': lazy_imports.preload_status()['modules'],
+}))
+''' % PRELOAD_MARKER
+
+
+def parse_importtime(stderr):
+    """
+    {module: self_us} from -X importtime output, split into the imports done
+    by starting the app and those done by the background preload
+    """
+    startup, preload = {}, {}
+    modules = startup
+    for line in stderr.splitlines():
+        if line.strip() == PRELOAD_MARKER:
+            modules = preload
+            continue
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = int(self_us)
+    return startup, preload
+
+
+def run_once():
+    """One cold start in a new interpreter, returns (timings, importtime modules)"""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD],
+        cwd=ROOT, capture_output=True, text=True,
+        env={**os.environ, 'PRELOAD_MODULES': '0'},
+    )
+    wall = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-2000:])
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings['process_wall'] = wall
+    return timings, parse_importtime(result.stderr)
+
+
+def package_breakdown(runs):
+    """Median self import time per top-level package across runs"""
+    totals = defaultdict(list)
+    for modules in runs:
+        per_package = defaultdict(int)
+        for name, self_us in modules.items():
+            per_package[name.split('.')[0]] += self_us
+        for package, self_us in per_package.items():
+            totals[package].append(self_us)
+    return {package: statistics.median(values) / 1e6 for package, values in totals.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15, help='packages to list in the breakdown')
+    parser.add_argument('--output', default=None, help='JSON file to write results to')
+    args = parser.parse_args(argv)
+
+    runs = [run_once() for _ in range(args.repeats)]
+    timings = [timing for timing, _ in runs]
+
+    summary = {
+        step: statistics.median(timing[step] for timing in timings)
+        for step in ('import_main', 'first_health', 'preload', 'process_wall')
+    }
+    startup = package_breakdown([modules[0] for _, modules in runs])
+    preload = package_breakdown([modules[1] for _, modules in runs])
+    top = sorted(startup.items(), key=lambda item: item[1], reverse=True)[:args.top]
+    top_preload = sorted(preload.items(), key=lambda item: item[1], reverse=True)[:args.top]
+
+    print(f"import main        {summary['import_main'] * 1000:9.1f} ms")
+    print(f"first /health      {summary['first_health'] * 1000:9.1f} ms")
+    print(f"background preload {summary['preload'] * 1000:9.1f} ms")
+    print(f"process wall       {summary['process_wall'] * 1000:9.1f} ms")
+    print("startup import time by package:")
+    for package, seconds in top:
+        print(f"    {package:<28} {seconds * 1000:9.1f} ms")
+    print("preload import time by package:")
+    for package, seconds in top_preload:
+        print(f"    {package:<28} {seconds * 1000:9.1f} ms")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump({
+                'summary': summary,
+                'startup_packages': dict(top),
+                'preload_packages': dict(top_preload),
+                'runs': timings,
+            }, f, indent=2)
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
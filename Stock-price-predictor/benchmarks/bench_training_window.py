@@ -0,0 +1,96 @@
+"""
+Training window benchmark.
+
+Fits StockPredictor on synthetic daily bars of increasing length with the
+training window off and on, timing data preparation, the order search and
+the final fit. With the window on, fit cost levels off at the window size
+however long the requested history is:
+
+    python benchmarks/bench_training_window.py
+    python benchmarks/bench_training_window.py --lengths 1260 5040 15120 --max-observations 1260
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import logging
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import synthetic_bars
+from app.utils.stock_predictor import StockPredictor
+from app.utils.order_search import ORDER_SEARCH_MODES, make_order_search, fit_model
+from app.utils.training_data import TRAINING_MAX_OBSERVATIONS, TRAINING_LOOKBACK_YEARS, TrainingWindow
+
+logging.disable(logging.INFO)
+warnings.filterwarnings('ignore')
+
+DEFAULT_LENGTHS = [252, 1260, 2520, 5040, 10080, 15120]
+
+
+def run_case(bars, window, search, repeats):
+    """Median seconds per stage of training on bars under window"""
+    timings = {'prepare_data': [], 'order_search': [], 'fit': []}
+    for _ in range(repeats):
+        predictor = StockPredictor(make_order_search(search, max_workers=1), window=window)
+
+        started = time.perf_counter()
+        prices, _ = predictor.prepare_data(bars)
+        timings['prepare_data'].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        order = predictor.find_best_parameters(prices)
+        timings['order_search'].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        fit_model(prices, order)
+        timings['fit'].append(time.perf_counter() - started)
+
+    result = {stage: statistics.median(values) for stage, values in timings.items()}
+    result['observations'] = len(prices)
+    result['total'] = sum(result[stage] for stage in timings)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lengths', type=int, nargs='+', default=DEFAULT_LENGTHS, help='bars in the history')
+    parser.add_argument('--max-observations', type=int, default=TRAINING_MAX_OBSERVATIONS)
+    parser.add_argument('--lookback-years', type=float, default=TRAINING_LOOKBACK_YEARS)
+    parser.add_argument('--search', choices=ORDER_SEARCH_MODES, default='grid', help='order search strategy')
+    parser.add_argument('--repeats', type=int, default=1)
+    parser.add_argument('--output', default=None, help='JSON file to write results to')
+    args = parser.parse_args(argv)
+
+    windows = {
+        'unbounded': TrainingWindow(None, None),
+        'window': TrainingWindow(args.max_observations, args.lookback_years),
+    }
+    rows = []
+    print(f"{'bars':>7} {'window':<10} {'obs':>6} {'prepare':>9} {'search':>9} {'fit':>9} {'total':>9}")
+    for length in args.lengths:
+        bars = synthetic_bars(length, seed=length, start='1960-01-04')
+        for name, window in windows.items():
+            result = {'bars': length, 'window': name, **run_case(bars, window, args.search, args.repeats)}
+            rows.append(result)
+            print(f"{length:>7} {name:<10} {result['observations']:>6} {result['prepare_data']:>9.3f} "
+                  f"{result['order_search']:>9.3f} {result['fit']:>9.3f} {result['total']:>9.3f}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump({
+                'max_observations': args.max_observations,
+                'lookback_years': args.lookback_years,
+                'search': args.search,
+                'rows': rows,
+            }, f, indent=2)
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+OHLCV fixtures for the offline benchmarks.
+
+Synthetic bars are generated deterministically from a seed. Recorded bars are
+CSV files with date, open, high, low, close and volume columns; record_fixture
+writes one from yfinance so it can be replayed offline afterwards.
+"""
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.bars import Bars
+
+# Recorded fixtures the benchmarks pick up by default
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+BARS_PER_DAY = {
+    '1m': 390, '2m': 195, '5m': 78, '15m': 26, '30m': 13,
+    '60m': 7, '90m': 5, '1h': 7, '1d': 1,
+}
+
+
+def synthetic_bars(n, interval='1d', seed=0, start='2010-01-04', drift=0.0003, vol=0.015, gap_every=37):
+    """
+    Geometric random walk bars. Every gap_every-th bar is dropped to mimic
+    holidays and missing data, which prepare_data has to fill.
+    """
+    rng = np.random.default_rng(seed)
+    per_day = BARS_PER_DAY.get(interval, 1)
+    step_vol = vol / np.sqrt(per_day)
+
+    days = pd.bdate_range(start, periods=int(np.ceil(n / per_day)) + 1)
+    if per_day == 1:
+        index = days[:n].values
+    else:
+        minutes = 390 // per_day
+        offsets = pd.to_timedelta(570 + minutes * np.arange(per_day), unit='m')
+        index = (days.values[:, None] + offsets.values[None, :]).ravel()[:n]
+
+    returns = rng.normal(drift / per_day, step_vol, n)
+    close = 100 * np.exp(np.cumsum(returns))
+    spread = np.abs(rng.normal(0, step_vol, n)) * close
+    open_ = close * np.exp(rng.normal(0, step_vol / 2, n))
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    volume = rng.integers(1_000_000, 5_000_000, n)
+
+    keep = np.ones(n, dtype=bool)
+    if gap_every:
+        keep[gap_every::gap_every] = False
+    return Bars(index[keep], open_[keep], high[keep], low[keep], close[keep], volume[keep])
+
+
+def load_csv_fixture(path):
+    """Load a recorded fixture written by record_fixture"""
+    df = pd.read_csv(path, parse_dates=['date']).set_index('date')
+    df.columns = [column.capitalize() for column in df.columns]
+    return Bars.from_frame(df)
+
+
+def recorded_fixtures(directory):
+    """{name: Bars} for every CSV fixture in a directory"""
+    if not directory or not os.path.isdir(directory):
+        return {}
+    return {
+        os.path.splitext(name)[0]: load_csv_fixture(os.path.join(directory, name))
+        for name in sorted(os.listdir(directory))
+        if name.endswith('.csv')
+    }
+
+
+def record_fixture(symbol, period, interval, path):
+    """Download bars once with yfinance and save them as a CSV fixture"""
+    import yfinance as yf
+
+    hist = yf.Ticker(symbol).history(period=period, interval=interval)
+    bars = Bars.from_frame(hist)
+    columns = bars.to_columns()
+    pd.DataFrame(columns).to_csv(path, index=False)
+    return path
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Record an OHLCV fixture from yfinance')
+    parser.add_argument('symbol')
+    parser.add_argument('--period', default='5y')
+    parser.add_argument('--interval', default='1d')
+    parser.add_argument('--output', default=None)
+    args = parser.parse_args()
+
+    output = args.output or os.path.join(FIXTURES_DIR, f"{args.symbol}_{args.period}_{args.interval}.csv")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    print(record_fixture(args.symbol, args.period, args.interval, output))
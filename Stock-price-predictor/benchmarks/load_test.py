@@ -0,0 +1,314 @@
+"""
+Offline load test for the API.
+
+Boots the app from main.py in-process with yfinance and the logo probes
+replaced by deterministic local stand-ins (synthetic daily bars per symbol,
+a fixed info dict, a stub HTTP session for logos) and empty model, snapshot
+and bar stores in a temporary directory. An async client drives a seeded mix
+of historical, info and forecast requests through the ASGI app at each
+concurrency level and reports requests per second and p50/p95/p99 latency
+per endpoint:
+
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --concurrency 1 8 32 --requests 600 --output benchmarks/results/load.json
+    python benchmarks/load_test.py --compare benchmarks/results/load.json
+
+Every symbol is requested once on each endpoint before measuring, so bars
+are stored and models trained; pass --cold to measure from empty stores.
+Set --provider-latency-ms to add simulated market data latency to downloads.
+"""
+import os
+import sys
+import json
+import time
+import types
+import zlib
+import random
+import asyncio
+import argparse
+import tempfile
+import logging
+import warnings
+from contextlib import contextmanager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+import httpx
+
+from benchmarks.fixtures import synthetic_bars
+from benchmarks.bench_forecast_pipeline import environment
+from app.utils.bar_store import BarStore, period_start
+from app.utils.logo_resolver import LogoResolver
+from app.utils.model_cache import ModelCache
+from app.utils.model_store import ModelStore
+from app.utils.snapshots import SnapshotStore
+
+# Request paths per endpoint, formatted with the symbol
+ENDPOINTS = {
+    'historical': '/api/stocks/historical/{symbol}?period=1y',
+    'info': '/api/stocks/info/{symbol}',
+    'forecast': '/api/predictions/forecast/{symbol}?days=30',
+}
+DEFAULT_MIX = 'historical=6,info=3,forecast=1'
+DEFAULT_CONCURRENCY = [1, 4, 16]
+
+# First session of the synthetic history served for every symbol
+HISTORY_START = pd.Timestamp('2000-01-03')
+
+
+class SyntheticProvider:
+    """
+    BarStore provider serving a fixed random walk per symbol, seeded from the
+    symbol name, so full downloads and tails agree across calls. Bars are
+    daily whatever the interval. latency seconds are slept per call.
+    """
+
+    def __init__(self, end=None, latency=0.0):
+        self.end = end or pd.Timestamp.now().normalize()
+        self.latency = latency
+        self.calls = 0
+
+    def _bars(self, symbol):
+        n = len(pd.bdate_range(HISTORY_START, self.end))
+        return synthetic_bars(n, seed=zlib.crc32(symbol.upper().encode()), start=HISTORY_START, gap_every=0)
+
+    def history(self, symbol, interval, period=None, start=None):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        first = pd.Timestamp(start) if start is not None else period_start(period or 'max', self.end)
+        bars = self._bars(symbol)
+        keep = bars.index >= np.datetime64(first or HISTORY_START, 's')
+        return pd.DataFrame({
+            'Open': bars.open[keep],
+            'High': bars.high[keep],
+            'Low': bars.low[keep],
+            'Close': bars.close[keep],
+            'Volume': bars.volume[keep],
+        }, index=pd.DatetimeIndex(bars.index[keep], name='Date'))
+
+    def history_many(self, symbols, interval, period=None, start=None):
+        return {symbol: self.history(symbol, interval, period=period, start=start) for symbol in symbols}
+
+
+class FakeTicker:
+    """The part of yfinance.Ticker the info endpoint reads"""
+
+    def __init__(self, symbol):
+        self.symbol = symbol.upper()
+
+    @property
+    def info(self):
+        return {
+            'symbol': self.symbol,
+            'shortName': f"{self.symbol} Corporation",
+            'longName': f"{self.symbol} Corporation",
+            'sector': 'Technology',
+            'industry': 'Software',
+            'currency': 'USD',
+            'exchange': 'NMS',
+            'website': f"https://www.{self.symbol.lower()}.example.com",
+            'marketCap': 1_000_000_000 + zlib.crc32(self.symbol.encode()),
+        }
+
+
+class StubLogoSession:
+    """requests.Session stand-in: the first logo source answers 200, the rest 404"""
+
+    def head(self, url, timeout=None):
+        return types.SimpleNamespace(status_code=200 if 'clearbit' in url else 404)
+
+
+@contextmanager
+def offline_app(root, provider_latency=0.0):
+    """
+    main.app with its market data, logo and model storage pointed at local
+    stand-ins under root. The patched module attributes are restored on exit.
+    """
+    import main
+    from app.routers import stocks, predictions
+
+    store = BarStore(os.path.join(root, 'bars'), SyntheticProvider(latency=provider_latency), refresh_seconds=3600)
+    patches = [
+        (stocks, 'bar_store', store),
+        (predictions, 'bar_store', store),
+        (stocks, 'yf', types.SimpleNamespace(Ticker=FakeTicker)),
+        (stocks, 'logo_resolver', LogoResolver(cache_path=os.path.join(root, 'logos.json'), session=StubLogoSession())),
+        (predictions, 'model_cache', ModelCache()),
+        (predictions, 'model_store', ModelStore(os.path.join(root, 'models'))),
+        (predictions, 'snapshot_store', SnapshotStore(os.path.join(root, 'snapshots'))),
+    ]
+    saved = [(module, name, getattr(module, name)) for module, name, _ in patches]
+    for module, name, value in patches:
+        setattr(module, name, value)
+    try:
+        yield main.app
+    finally:
+        for module, name, value in saved:
+            setattr(module, name, value)
+
+
+def parse_mix(mix):
+    """'historical=6,info=3' -> {'historical': 6.0, 'info': 3.0}"""
+    weights = {}
+    for part in mix.split(','):
+        name, _, weight = part.partition('=')
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint {name!r}, expected one of: {', '.join(ENDPOINTS)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def request_plan(weights, symbols, count, seed):
+    """count (endpoint, path) pairs drawn from the mix with a seeded RNG"""
+    rng = random.Random(seed)
+    names = list(weights)
+    endpoints = rng.choices(names, weights=[weights[name] for name in names], k=count)
+    return [(name, ENDPOINTS[name].format(symbol=rng.choice(symbols))) for name in endpoints]
+
+
+async def run_level(client, plan, concurrency):
+    """Send plan with concurrency requests in flight; returns (samples, wall seconds)"""
+    samples = []
+    pending = iter(plan)
+
+    async def worker():
+        for endpoint, path in pending:
+            started = time.perf_counter()
+            try:
+                status = (await client.get(path)).status_code
+            except Exception:
+                status = None
+            samples.append((endpoint, time.perf_counter() - started, status))
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return samples, time.perf_counter() - started
+
+
+def summarize(samples, wall):
+    """Request rate and latency percentiles (ms) per endpoint and for all requests"""
+    groups = {endpoint: [] for endpoint in ENDPOINTS}
+    for sample in samples:
+        groups[sample[0]].append(sample)
+    groups = {endpoint: group for endpoint, group in groups.items() if group}
+    groups['all'] = samples
+    summary = {}
+    for endpoint, group in groups.items():
+        latencies = np.array([latency for _, latency, _ in group]) * 1000
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        summary[endpoint] = {
+            'requests': len(group),
+            'errors': sum(1 for _, _, status in group if status is None or status >= 400),
+            'rps': len(group) / wall,
+            'p50_ms': float(p50),
+            'p95_ms': float(p95),
+            'p99_ms': float(p99),
+        }
+    return summary
+
+
+async def load_test(app, symbols, weights, concurrency_levels, requests, seed=0, warm=True):
+    """Run every concurrency level against app; returns one result per level"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://loadtest', timeout=None) as client:
+        if warm:
+            warmup = [(name, ENDPOINTS[name].format(symbol=symbol)) for name in weights for symbol in symbols]
+            await run_level(client, warmup, max(concurrency_levels))
+
+        levels = []
+        for concurrency in concurrency_levels:
+            plan = request_plan(weights, symbols, requests, seed + concurrency)
+            samples, wall = await run_level(client, plan, concurrency)
+            levels.append({
+                'concurrency': concurrency,
+                'seconds': wall,
+                'endpoints': summarize(samples, wall),
+            })
+    return levels
+
+
+def print_levels(levels):
+    print(f"{'conc':>5} {'endpoint':<11} {'requests':>8} {'errors':>6} {'rps':>9} "
+          f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for level in levels:
+        for endpoint, row in level['endpoints'].items():
+            print(f"{level['concurrency']:>5} {endpoint:<11} {row['requests']:>8} {row['errors']:>6} "
+                  f"{row['rps']:>9.1f} {row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} {row['p99_ms']:>9.2f}")
+
+
+def compare(levels, baseline_path, threshold):
+    """Print endpoints whose rps fell or p95 rose by more than threshold against the baseline"""
+    with open(baseline_path) as f:
+        baseline = {level['concurrency']: level['endpoints'] for level in json.load(f)['levels']}
+
+    regressions = []
+    for level in levels:
+        previous = baseline.get(level['concurrency'], {})
+        for endpoint, row in level['endpoints'].items():
+            before = previous.get(endpoint)
+            if before is None:
+                continue
+            if row['rps'] < before['rps'] * (1 - threshold):
+                regressions.append((level['concurrency'], endpoint, 'rps', before['rps'], row['rps']))
+            if row['p95_ms'] > before['p95_ms'] * (1 + threshold):
+                regressions.append((level['concurrency'], endpoint, 'p95_ms', before['p95_ms'], row['p95_ms']))
+
+    for concurrency, endpoint, metric, before, after in regressions:
+        print(f"REGRESSION concurrency={concurrency} {endpoint} {metric}: {before:.2f} -> {after:.2f}")
+    if not regressions:
+        print(f"No endpoint worse than baseline by more than {threshold:.0%}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=DEFAULT_CONCURRENCY)
+    parser.add_argument('--requests', type=int, default=300, help='requests per concurrency level')
+    parser.add_argument('--symbols', type=int, default=8, help='size of the symbol universe')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='endpoint weights, e.g. historical=6,info=3,forecast=1')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--cold', action='store_true', help='skip the warm-up pass')
+    parser.add_argument('--provider-latency-ms', type=float, default=0.0)
+    parser.add_argument('--output', default=None, help='JSON file to write results to')
+    parser.add_argument('--compare', default=None, help='baseline JSON to check for regressions')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed slowdown before flagging')
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.INFO)
+    warnings.filterwarnings('ignore')
+    # main mounts app/static relative to the working directory
+    os.chdir(ROOT)
+    weights = parse_mix(args.mix)
+    symbols = [f"SYM{i:03d}" for i in range(args.symbols)]
+
+    with tempfile.TemporaryDirectory() as root, offline_app(root, args.provider_latency_ms / 1000) as app:
+        levels = asyncio.run(load_test(
+            app, symbols, weights, args.concurrency, args.requests, seed=args.seed, warm=not args.cold
+        ))
+    print_levels(levels)
+
+    results = {
+        'environment': environment(),
+        'mix': weights,
+        'symbols': args.symbols,
+        'requests': args.requests,
+        'warm': not args.cold,
+        'levels': levels,
+    }
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        return 1 if compare(levels, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -241,7 +241,7 @@ const PredictionDashboard: React.FC<PredictionDashboardProps> = ({ predictions }
                                         {formatCurrency(pred.predicted_price)}
                                     </td>
                                     <td className={`${theme.tableCell} p-4`}>
-                                        {pred.prediction_interval}
+                                        {formatCurrency(pred.lower_bound)} - {formatCurrency(pred.upper_bound)}
                                     </td>
                                     <td className={`${theme.tableCell} p-4`}>
                                         {formatPercentage(pred.confidence)}
@@ -1,6 +1,6 @@
 import axios from 'axios';
 import { handleApiError } from '../utils/errorHandling';
-import { StockInfo, HistoricalDataPoint, ApiError, HistoricalDataResponse, PredictionDataPoint, ModelMetrics, PredictionResponse } from '../types/StockTypes';
+import { StockInfo, HistoricalDataPoint, ApiError, HistoricalDataResponse, HistoricalColumnsResponse, PredictionDataPoint, ModelMetrics, PredictionResponse } from '../types/StockTypes';
 
 const API_BASE_URL = 'http://localhost:8000/api';
 
@@ -30,21 +30,27 @@ class ApiService {
   async getHistoricalData(symbol: string, period: string = '5y', interval: string = '1wk'): Promise<HistoricalDataResponse> {
     try {
       this.validateSymbol(symbol);
-      console.log('Fetching historical data:', { symbol, period, interval });
-      const response = await axios.get<HistoricalDataResponse>(
+      // The columnar format avoids repeating every key per bar
+      const response = await axios.get<HistoricalColumnsResponse>(
         `${API_BASE_URL}/stocks/historical/${symbol.toUpperCase()}`,
-        { params: { period, interval } }
+        { params: { period, interval, format: 'columnar' } }
       );
       
-      console.log('API Response:', response.data);
-      
       // Validate the response structure
-      const data = response.data.data;
-      if (!Array.isArray(data)) {
+      const columns = response.data.data;
+      if (!columns || !Array.isArray(columns.date)) {
         throw new Error('Invalid historical data format');
       }
       
-      return response.data;
+      const data: HistoricalDataPoint[] = columns.date.map((date, i) => ({
+        date,
+        open: columns.open[i],
+        high: columns.high[i],
+        low: columns.low[i],
+        close: columns.close[i],
+        volume: columns.volume[i],
+      }));
+      return { symbol: response.data.symbol, data };
     } catch (error) {
       throw handleApiError(error);
     }
@@ -79,6 +85,44 @@ class ApiService {
       throw handleApiError(error);
     }
   }
+
+  /**
+   * Stream a forecast over Server-Sent Events. onProgress receives every
+   * stage event (history_loaded, candidate, order_selected, ...) before the
+   * final forecast. Returns a function that closes the stream, which also
+   * cancels training on the server.
+   */
+  streamPredictions(
+    symbol: string,
+    onProgress: (stage: string, details: any) => void,
+    onForecast: (forecast: PredictionResponse) => void,
+    onError: (error: Error) => void,
+    days: number = 7,
+    period: string = '5y',
+    interval: string = '1d'
+  ): () => void {
+    this.validateSymbol(symbol);
+    const params = new URLSearchParams({ days: String(days), history_period: period, interval });
+    const source = new EventSource(
+      `${API_BASE_URL}/predictions/forecast/${symbol.toUpperCase()}/stream?${params}`
+    );
+    const stages = ['started', 'history_loaded', 'waiting', 'model_cached', 'data_prepared',
+                    'candidate', 'order_selected', 'model_fitted', 'model_updated'];
+
+    stages.forEach((stage) =>
+      source.addEventListener(stage, (event) => onProgress(stage, JSON.parse((event as MessageEvent).data)))
+    );
+    source.addEventListener('forecast', (event) => {
+      source.close();
+      onForecast(JSON.parse((event as MessageEvent).data));
+    });
+    source.addEventListener('error', (event) => {
+      source.close();
+      const data = (event as MessageEvent).data;
+      onError(new Error(data ? JSON.parse(data).detail : 'Forecast stream failed'));
+    });
+    return () => source.close();
+  }
 }
 
 export type { ApiError };
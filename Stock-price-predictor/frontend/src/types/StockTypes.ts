@@ -5,8 +5,8 @@ export interface HistoricalDataPoint {
   low: number;
   close: number;
   volume: number;
-  dividends: number;
-  stockSplits: number;
+  dividends?: number;
+  stockSplits?: number;
 }
 
 export interface HistoricalDataResponse {
@@ -14,6 +14,19 @@ export interface HistoricalDataResponse {
   data: HistoricalDataPoint[];
 }
 
+export interface HistoricalColumnsResponse {
+  symbol: string;
+  format: 'columnar';
+  data: {
+    date: string[];
+    open: number[];
+    high: number[];
+    low: number[];
+    close: number[];
+    volume: number[];
+  };
+}
+
 export interface StockChartProps {
   symbol: string;
   data: HistoricalDataPoint[];
@@ -69,7 +82,6 @@ export interface PredictionDataPoint {
   upper_bound: number;
   confidence: number;
   volatility: number;
-  prediction_interval: number;
 }
 
 export interface ModelMetrics {
@@ -91,7 +103,6 @@ export interface PredictionResponse {
     upper_bound: number;
     confidence: number;
     volatility: number;
-    prediction_interval: string;
   }[];
   model_metrics: {
     accuracy: number;
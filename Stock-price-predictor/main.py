@@ -1,12 +1,24 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-import uvicorn
+from contextlib import asynccontextmanager
+from app.utils.metrics import MetricsMiddleware, registry
+from app.utils.compression import CompressionMiddleware
+from app.utils import lazy_imports
+
+@asynccontextmanager
+async def lifespan(app):
+    # pandas, scipy, statsmodels and yfinance are imported lazily; warm them
+    # up off the event loop so the first forecast does not pay for it
+    lazy_imports.preload_in_background()
+    yield
 
 app = FastAPI(
     title="Stock Price Predictor",
     description="An advanced stock price prediction application using machine learning",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -18,11 +30,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip or brotli for complete JSON responses; SSE streams pass through
+app.add_middleware(CompressionMiddleware)
+
+# Record latency and payload size (as sent) per route for /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
 # Import routers after app creation
 from app.routers import stocks, predictions
+from app.utils import executors
+from app.utils.model_cache import model_cache
 
 # Include routers
 app.include_router(stocks.router, prefix="/api/stocks", tags=["stocks"])
@@ -36,5 +56,52 @@ async def root():
         "version": "1.0.0"
     }
 
+@app.get("/health")
+async def health():
+    """Liveness check that answers before the heavy modules are loaded"""
+    return {"status": "ok", "preload": lazy_imports.preload_status()["state"]}
+
+@app.get("/status")
+async def status():
+    """Worker pool sizes and queue depths"""
+    return {
+        "executors": executors.stats(),
+        "preload": lazy_imports.preload_status(),
+        "single_flight": {
+            "history": stocks.history_flight.stats(),
+            "training": predictions.training_flight.stats()
+        }
+    }
+
+@registry.register_collector
+def collect_runtime_metrics():
+    """Cache, executor and request coalescing counters, read at scrape time"""
+    cache = model_cache.stats()
+    lanes = executors.stats()
+    flights = {
+        "history": stocks.history_flight.stats(),
+        "training": predictions.training_flight.stats()
+    }
+    return [
+        ("model_cache_lookups_total", "counter", "Model cache lookups by result",
+         [({"result": "hit"}, cache["hits"]), ({"result": "miss"}, cache["misses"])]),
+        ("model_cache_evictions_total", "counter", "Models evicted from the cache",
+         [({}, cache["evictions"])]),
+        ("model_cache_bytes", "gauge", "Estimated memory held by cached models",
+         [({}, cache["bytes"])]),
+        ("executor_queue_depth", "gauge", "Tasks waiting for a worker per executor lane",
+         [({"lane": name}, lane["queued"]) for name, lane in lanes.items()]),
+        ("executor_in_flight", "gauge", "Tasks queued or running per executor lane",
+         [({"lane": name}, lane["in_flight"]) for name, lane in lanes.items()]),
+        ("single_flight_coalesced_total", "counter", "Requests that joined in-flight work",
+         [({"flight": name}, flight["coalesced"]) for name, flight in flights.items()]),
+    ]
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text exposition of stage timings and runtime counters"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host="127.0.0.1", port=8000)
@@ -0,0 +1,67 @@
+import asyncio
+import httpx
+import pytest
+from fastapi import FastAPI
+from app.routers import predictions, stocks
+from app.utils.bar_store import BarStore
+from app.utils.model_cache import ModelCache
+from app.utils.model_store import ModelStore
+from app.utils.snapshots import SnapshotStore
+from app.utils.single_flight import SingleFlight
+from tests.test_bar_store import FakeProvider
+
+
+class RouterApp:
+    """An app serving the routers under test, called in-process over ASGI"""
+
+    def __init__(self, app, bar_store):
+        self.app = app
+        self.bar_store = bar_store
+
+    def client(self):
+        """An AsyncClient for tests that keep several requests in flight"""
+        return httpx.AsyncClient(transport=httpx.ASGITransport(app=self.app), base_url='http://test')
+
+    def request(self, method, path, **kwargs):
+        async def send():
+            async with self.client() as client:
+                return await client.request(method, path, **kwargs)
+        return asyncio.run(send())
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+
+@pytest.fixture
+def make_app(tmp_path, monkeypatch):
+    """
+    Factory for a RouterApp whose bar, model and snapshot stores live under
+    tmp_path, with fresh model cache and request coalescing. By default only
+    the predictions router is mounted, at the root; with prefixed=True both
+    routers are, under /stocks and /predictions.
+    """
+
+    def make(provider=None, middleware=(), prefixed=False):
+        store = BarStore(str(tmp_path / 'bars'), provider or FakeProvider(), 3600)
+        monkeypatch.setattr(stocks, 'bar_store', store)
+        monkeypatch.setattr(stocks, 'history_flight', SingleFlight('history'))
+        monkeypatch.setattr(predictions, 'bar_store', store)
+        monkeypatch.setattr(predictions, 'model_cache', ModelCache())
+        monkeypatch.setattr(predictions, 'model_store', ModelStore(str(tmp_path / 'models')))
+        monkeypatch.setattr(predictions, 'snapshot_store', SnapshotStore(str(tmp_path / 'snapshots')))
+        monkeypatch.setattr(predictions, 'training_flight', SingleFlight('training'))
+
+        app = FastAPI()
+        for cls in middleware:
+            app.add_middleware(cls)
+        if prefixed:
+            app.include_router(stocks.router, prefix='/stocks')
+            app.include_router(predictions.router, prefix='/predictions')
+        else:
+            app.include_router(predictions.router)
+        return RouterApp(app, store)
+
+    return make
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from app.utils.backtest import _segment_forecasts, backtest
+from app.utils.stock_predictor import StockPredictor
+from app.utils.order_search import OrderSearch
+from app.utils.training_data import TrainingWindow
+from tests.test_stock_predictor import make_history
+
+def test_segment_forecasts_match_predictor_at_each_origin():
+    history = make_history(330)
+    predictor = StockPredictor(OrderSearch(max_workers=1, orders=[(1, 1, 1)]), reselect_every=1000)
+    prices, _ = predictor.prepare_data(history)
+    origins = np.array([300, 320])
+
+    predicted, lower, upper = _segment_forecasts(prices, (1, 1, 1), 300, origins, 5)
+
+    predictor.train(history[:300])
+    predictor = predictor.compact()
+    for j, origin in enumerate(origins):
+        if origin > 300:
+            predictor.update(history[:origin])
+        rows = predictor.predict_next_days(5)['predictions']
+        np.testing.assert_allclose(predicted[j], [row['predicted_price'] for row in rows], rtol=1e-9)
+        np.testing.assert_allclose(lower[j], [row['lower_bound'] for row in rows], rtol=1e-9)
+        np.testing.assert_allclose(upper[j], [row['upper_bound'] for row in rows], rtol=1e-9)
+
+def test_backtest_reports_every_horizon():
+    result = backtest(make_history(400), horizon=5, step=5, refit_every=60)
+
+    assert result['initial'] == 252
+    assert result['refits'] == 3
+    assert [row['horizon'] for row in result['per_horizon']] == [1, 2, 3, 4, 5]
+    for row in result['per_horizon']:
+        assert row['count'] > 0
+        assert 0.0 <= row['coverage'] <= 1.0
+        assert row['mae'] > 0
+
+def test_backtest_rejects_short_history():
+    with pytest.raises(ValueError):
+        backtest(make_history(260), horizon=30)
+
+def test_backtest_evaluates_history_beyond_the_training_window():
+    history = make_history(700)
+    result = backtest(history, horizon=5, step=20, initial=300, window=TrainingWindow(300, None))
+
+    # Every observation is evaluated, not just the last 300
+    assert result['observations'] == 700
+    assert result['origins'] == len(range(300, 700, 20))
+    assert all(row['count'] > 0 for row in result['per_horizon'])
+
+def test_origins_split_across_workers_match_one_task(monkeypatch):
+    from app.utils import backtest as backtest_module
+    history = make_history(400)
+    single = backtest(history, horizon=5, step=1, search='grid')
+
+    monkeypatch.setattr(backtest_module, 'CPU_WORKERS', 3)
+    monkeypatch.setattr(backtest_module, 'MIN_ORIGINS_PER_TASK', 16)
+    assert len(backtest_module._origin_chunks(148, 3)) == 3
+    split = backtest(history, horizon=5, step=1, search='grid')
+
+    assert split['origins'] == single['origins'] == 148
+    for a, b in zip(split['per_horizon'], single['per_horizon']):
+        for key in ('count', 'mae', 'rmse', 'coverage', 'mean_width_pct'):
+            assert a[key] == pytest.approx(b[key], rel=1e-12)
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+from app.utils.bar_store import BarStore, period_start
+
+class FakeProvider:
+    """Deterministic daily bars ending today, records every call"""
+
+    def __init__(self, end=None):
+        self.end = end or pd.Timestamp.now().normalize()
+        self.calls = []
+
+    def history(self, symbol, interval, period=None, start=None):
+        self.calls.append({'period': period, 'start': start})
+        first = pd.Timestamp(start) if start is not None else period_start(period or 'max', self.end) or pd.Timestamp('2000-01-01')
+        index = pd.bdate_range(first, self.end, name='Date')
+        closes = 100 + np.arange(len(index), dtype=float)
+        return pd.DataFrame({
+            'Open': closes,
+            'High': closes + 1,
+            'Low': closes - 1,
+            'Close': closes,
+            'Volume': np.full(len(index), 1000),
+        }, index=index)
+
+def test_first_read_downloads_then_serves_from_disk(tmp_path):
+    provider = FakeProvider()
+    store = BarStore(root=str(tmp_path), provider=provider, refresh_seconds=3600)
+
+    first = store.get_bars('AAPL', period='1y', interval='1d')
+    second = store.get_bars('AAPL', period='6mo', interval='1d')
+
+    assert provider.calls == [{'period': '1y', 'start': None}]
+    assert len(first) > 0
+    assert second.index[0] >= period_start('6mo')
+    assert second.index[-1] == first.index[-1]
+    np.testing.assert_array_equal(first.close[-len(second):], second.close)
+
+def test_stale_store_fetches_only_the_tail(tmp_path):
+    provider = FakeProvider()
+    store = BarStore(root=str(tmp_path), provider=provider, refresh_seconds=0)
+
+    store.get_bars('AAPL', period='1y', interval='1d')
+    bars = store.get_bars('AAPL', period='1y', interval='1d')
+
+    assert len(provider.calls) == 2
+    assert provider.calls[1]['period'] is None
+    assert provider.calls[1]['start'] == bars.last_date
+
+def test_longer_period_triggers_full_download(tmp_path):
+    provider = FakeProvider()
+    store = BarStore(root=str(tmp_path), provider=provider, refresh_seconds=3600)
+
+    store.get_bars('AAPL', period='1y', interval='1d')
+    bars = store.get_bars('AAPL', period='2y', interval='1d')
+
+    assert [call['period'] for call in provider.calls] == ['1y', '2y']
+    assert bars.index[0] >= period_start('2y')
+    assert bars.index[0] < period_start('1y')
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+from app.utils.bars import Bars
+from app.utils.batch_ar import batch_forecast, fit_ar, stack_series
+
+def ar1_bars(n, phi, seed):
+    rng = np.random.default_rng(seed)
+    diffs = np.zeros(n)
+    for t in range(1, n):
+        diffs[t] = 0.02 + phi * diffs[t - 1] + rng.normal(0, 0.5)
+    close = 100 + np.cumsum(diffs)
+    index = pd.bdate_range('2015-01-01', periods=n).values
+    return Bars(index, close, close + 1, close - 1, close, np.full(n, 1000))
+
+def test_batched_fit_matches_least_squares_per_series():
+    series = [ar1_bars(600, 0.3, 0).close, ar1_bars(400, -0.2, 1).close]
+    diffs = np.diff(stack_series(series), axis=1)
+
+    params, resid, _ = fit_ar(diffs, 2, 3)
+
+    for row, closes in enumerate(series):
+        d = np.diff(closes)
+        X = np.column_stack([np.ones(len(d) - 3), d[2:-1], d[1:-2]])
+        expected, *_ = np.linalg.lstsq(X, d[3:], rcond=None)
+        np.testing.assert_allclose(params[row], expected, rtol=1e-8)
+        assert np.count_nonzero(~np.isnan(resid[row])) == len(d) - 3
+
+def test_batch_forecast_output_matches_predict_next_days_shape():
+    bars = {'UP': ar1_bars(800, 0.5, 2), 'DOWN': ar1_bars(500, -0.4, 3), 'SHORT': ar1_bars(20, 0.1, 4)}
+
+    results = batch_forecast(bars, days=10)
+
+    assert isinstance(results['SHORT'], ValueError)
+    for symbol in ('UP', 'DOWN'):
+        rows = results[symbol]['predictions']
+        assert len(rows) == 10
+        assert set(rows[0]) == {'day', 'date', 'predicted_price', 'lower_bound', 'upper_bound', 'confidence', 'volatility'}
+        assert all(row['lower_bound'] < row['predicted_price'] < row['upper_bound'] for row in rows)
+        assert pd.Timestamp(rows[0]['date']) > pd.Timestamp(bars[symbol].index[-1])
+        metrics = results[symbol]['model_metrics']
+        assert metrics['order'][0] >= 1 and metrics['order'][1:] == [1, 0]
+
+def test_batch_endpoint_uses_vectorized_engine(make_app):
+    api = make_app()
+
+    def post(body):
+        return api.post('/forecast/batch', json=body)
+
+    response = post({'symbols': ['AAPL', 'MSFT'], 'days': 3, 'history_period': '2y', 'engine': 'batch_ar'})
+    assert response.status_code == 200
+    body = response.json()
+    assert body['succeeded'] == 2
+    assert {item['forecast']['model_type'] for item in body['results']} == {'batch_ar'}
+
+    assert post({'symbols': ['AAPL'], 'engine': 'nope'}).status_code == 400
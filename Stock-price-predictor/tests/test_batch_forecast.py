@@ -0,0 +1,52 @@
+from app.utils.bar_store import BarStore
+from tests.test_bar_store import FakeProvider
+
+class BulkProvider(FakeProvider):
+    """FakeProvider with a bulk download that leaves out failing symbols, which also fail alone"""
+
+    def __init__(self, failing=(), bulk_error=None):
+        super().__init__()
+        self.failing = set(failing)
+        self.bulk_error = bulk_error
+        self.bulk_calls = []
+
+    def history(self, symbol, interval, period=None, start=None):
+        if symbol in self.failing:
+            raise ValueError(f"No data found for {symbol}")
+        return super().history(symbol, interval, period=period, start=start)
+
+    def history_many(self, symbols, interval, period=None, start=None):
+        self.bulk_calls.append(list(symbols))
+        if self.bulk_error is not None:
+            raise self.bulk_error
+        return {
+            symbol: FakeProvider.history(self, symbol, interval, period=period, start=start)
+            for symbol in symbols if symbol not in self.failing
+        }
+
+def test_batch_forecast_isolates_a_failing_symbol(make_app):
+    provider = BulkProvider(failing={'BAD'})
+    api = make_app(provider)
+
+    response = api.post('/forecast/batch', json={
+        'symbols': ['AAA', 'BAD', 'CCC'], 'days': 5, 'history_period': '2y'
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert len(provider.bulk_calls) == 1
+    assert (body['succeeded'], body['failed']) == (2, 1)
+    results = {item['symbol']: item for item in body['results']}
+    assert 'BAD' in results['BAD']['error']
+    for symbol in ('AAA', 'CCC'):
+        assert results[symbol]['error'] is None
+        assert len(results[symbol]['forecast']['predictions']) == 5
+
+def test_get_bars_many_falls_back_to_single_downloads(tmp_path):
+    provider = BulkProvider(bulk_error=RuntimeError('rate limited'))
+    store = BarStore(str(tmp_path), provider, 3600)
+
+    results = store.get_bars_many(['AAA', 'BBB'], period='1y', interval='1d')
+
+    assert provider.bulk_calls == [['AAA', 'BBB']]
+    assert len(provider.calls) == 2
+    assert all(len(results[symbol]) > 0 for symbol in ('AAA', 'BBB'))
@@ -0,0 +1,61 @@
+import gzip
+import json
+import pytest
+from app.routers import predictions
+from app.utils import compression
+from app.utils.compression import CompressionMiddleware, negotiate
+
+@pytest.fixture
+def api(make_app):
+    return make_app(middleware=[CompressionMiddleware], prefixed=True)
+
+def test_negotiate_uses_q_values(monkeypatch):
+    monkeypatch.setattr(compression, 'brotli', None)
+    assert negotiate('gzip, deflate, br') == 'gzip'
+    assert negotiate('gzip;q=0, deflate') is None
+    assert negotiate('identity') is None
+    assert negotiate('*') == 'gzip'
+
+    monkeypatch.setattr(compression, 'brotli', object())
+    assert negotiate('gzip, deflate, br') == 'br'
+    assert negotiate('gzip;q=1.0, br;q=0.5') == 'gzip'
+
+def test_historical_is_compressed_and_revalidated(api):
+    params = {'period': '2y', 'format': 'columnar'}
+
+    plain = api.get('/stocks/historical/AAPL', params=params, headers={'accept-encoding': 'identity'})
+    raw = api.get('/stocks/historical/AAPL', params=params, headers={'accept-encoding': 'gzip'})
+    assert raw.status_code == 200 and 'content-encoding' not in plain.headers
+    assert raw.headers['content-encoding'] == 'gzip'
+    assert raw.headers['vary'] == 'Accept-Encoding'
+    # httpx decodes the body, the wire size is in content-length
+    assert int(raw.headers['content-length']) < len(plain.content) / 2
+    assert json.loads(raw.content) == json.loads(plain.content)
+
+    etag = raw.headers['etag']
+    assert etag == plain.headers['etag']
+    again = api.get('/stocks/historical/AAPL', params=params, headers={'if-none-match': etag})
+    assert again.status_code == 304 and again.content == b''
+    other = api.get('/stocks/historical/AAPL', params={'period': '2y'}, headers={'if-none-match': etag})
+    assert other.status_code == 200
+
+def test_forecast_etag_skips_model_run(api, monkeypatch):
+    params = {'days': 5, 'history_period': '2y'}
+    first = api.get('/predictions/forecast/AAPL', params=params)
+    assert first.status_code == 200
+    assert 'prediction_interval' not in first.json()['predictions'][0]
+
+    calls = []
+    monkeypatch.setattr(predictions, '_forecast_response', lambda *args: calls.append(args))
+    second = api.get('/predictions/forecast/AAPL', params=params, headers={'if-none-match': first.headers['etag']})
+    assert second.status_code == 304 and calls == []
+
+def test_event_stream_is_not_compressed(api):
+    response = api.get('/predictions/forecast/AAPL/stream', params={'days': 5, 'history_period': '2y'},
+                       headers={'accept-encoding': 'gzip'})
+    assert response.headers['content-type'].startswith('text/event-stream')
+    assert 'content-encoding' not in response.headers
+
+def test_gzip_round_trip():
+    body = json.dumps({'data': list(range(1000))}).encode()
+    assert gzip.decompress(compression.compress(body, 'gzip')) == body
@@ -0,0 +1,23 @@
+import multiprocessing
+from app.utils import executors
+
+def report_in_worker_process(queue):
+    queue.put(executors.in_worker_process())
+
+def test_pool_workers_are_flagged_but_other_children_are_not():
+    assert not executors.in_worker_process()
+    with executors.process_pool(1) as pool:
+        assert pool.submit(executors.in_worker_process).result()
+
+    # Like a uvicorn --reload or --workers child: spawned, but not a pool worker
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    child = context.Process(target=report_in_worker_process, args=(queue,))
+    child.start()
+    assert queue.get(timeout=60) is False
+    child.join()
+
+def test_pool_workers_are_not_forked_from_the_server():
+    with executors.process_pool(1) as pool:
+        assert pool._mp_context.get_start_method() in ('forkserver', 'spawn')
+        assert pool.submit(executors.in_worker_process).result()
@@ -0,0 +1,56 @@
+import asyncio
+import warnings
+import numpy as np
+from app.routers import predictions
+from app.utils.fallback import DriftModel, DriftPredictor
+from tests.test_stock_predictor import make_history
+
+def test_drift_predictor_extends_the_mean_change():
+    history = make_history(400)
+    closes = np.array([bar['close'] for bar in history])
+    predictor = DriftPredictor()
+    predictor.train(history)
+
+    rows = predictor.predict_next_days(5)['predictions']
+    drift = np.diff(closes).mean()
+    np.testing.assert_allclose(
+        [row['predicted_price'] for row in rows], closes[-1] + drift * np.arange(1, 6), rtol=1e-12
+    )
+    assert all(row['lower_bound'] < row['predicted_price'] < row['upper_bound'] for row in rows)
+    metrics = predictor.get_model_metrics()
+    assert metrics['order'] == [0, 1, 0] and metrics['order_search'] is None
+
+def test_deadline_answers_with_fallback_while_training_continues(make_app, monkeypatch):
+    api = make_app()
+    fit_predictor = predictions._fit_predictor
+
+    async def slow_fit(*args, **kwargs):
+        await asyncio.sleep(0.5)
+        return await fit_predictor(*args, **kwargs)
+
+    monkeypatch.setattr(predictions, '_fit_predictor', slow_fit)
+
+    async def run():
+        async with api.client() as client:
+            params = {'days': 5, 'history_period': '2y', 'deadline_ms': 100}
+            fallback = await client.get('/forecast/AAPL', params=params)
+            assert predictions.training_flight.stats()['in_flight'] == 1
+            while predictions.training_flight.stats()['in_flight']:
+                await asyncio.sleep(0.05)
+            full = await client.get('/forecast/AAPL', params=params)
+            return fallback, full
+
+    fallback, full = asyncio.run(run())
+    assert fallback.status_code == 200
+    assert fallback.json()['model_type'] == 'drift'
+    assert 'etag' not in fallback.headers
+    assert len(fallback.json()['predictions']) == 5
+    assert full.json()['model_type'] == 'ARIMA'
+    assert 'etag' in full.headers
+
+def test_drift_model_summary_is_finite_for_an_exact_fit():
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', RuntimeWarning)
+        summary = DriftModel(100 + np.arange(300, dtype=float)).summary()
+    assert np.isfinite(summary['aic']) and np.isfinite(summary['bic'])
+    assert summary['rmse'] == 0
@@ -0,0 +1,19 @@
+import subprocess
+import sys
+from app.utils.lazy_imports import LazyModule, lazy_module
+
+def test_lazy_module_imports_on_first_attribute_access():
+    module = LazyModule('colorsys')
+    assert not module.loaded
+    assert module.rgb_to_hsv(1, 0, 0) == (0.0, 1.0, 1)
+    assert module.loaded
+    assert lazy_module('colorsys') is lazy_module('colorsys')
+
+def test_importing_app_does_not_load_heavy_dependencies():
+    code = (
+        "import sys\n"
+        "from app.routers import stocks, predictions\n"
+        "print(','.join(m for m in ('pandas', 'scipy', 'statsmodels', 'yfinance') if m in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ''
@@ -0,0 +1,21 @@
+import asyncio
+from app.routers import stocks
+from benchmarks.load_test import offline_app, load_test, parse_mix
+
+def test_load_test_runs_offline_and_restores_the_app(tmp_path):
+    original_store = stocks.bar_store
+    with offline_app(str(tmp_path)) as app:
+        provider = stocks.bar_store.provider
+        levels = asyncio.run(load_test(
+            app, ['AAA', 'BBB'], parse_mix('historical=2,info=1,forecast=1'), [1, 3], requests=12
+        ))
+
+    assert [level['concurrency'] for level in levels] == [1, 3]
+    for level in levels:
+        assert level['endpoints']['all']['requests'] == 12
+        assert level['endpoints']['all']['errors'] == 0
+        assert level['endpoints']['all']['p50_ms'] <= level['endpoints']['all']['p99_ms']
+    # At most one download per symbol and period (1y historical, 5y forecast);
+    # measured requests are served from the store
+    assert 2 <= provider.calls <= 4
+    assert stocks.bar_store is original_store
@@ -0,0 +1,74 @@
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from app.utils.logo_resolver import LogoResolver
+
+class StubLogoHandler(BaseHTTPRequestHandler):
+    """200 for /good/*, a slow 200 for /slow/*, 404 for everything else"""
+    requests_seen = []
+
+    def do_HEAD(self):
+        StubLogoHandler.requests_seen.append(self.path)
+        if self.path.startswith('/slow/'):
+            time.sleep(1)
+            self.send_response(200)
+        elif self.path.startswith('/good/'):
+            self.send_response(200)
+        else:
+            self.send_response(404)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def stub_server():
+    StubLogoHandler.requests_seen = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubLogoHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+def make_resolver(tmp_path, base_url, paths):
+    return LogoResolver(
+        cache_path=str(tmp_path / 'logos.json'),
+        sources=lambda symbol, website: [f"{base_url}/{path}/{symbol}" for path in paths]
+    )
+
+def test_returns_success_without_waiting_for_lower_priority_sources(tmp_path, stub_server):
+    resolver = make_resolver(tmp_path, stub_server, ['missing', 'good', 'slow'])
+
+    started = time.time()
+    url = resolver.resolve('AAPL')
+
+    assert url == f"{stub_server}/good/AAPL"
+    assert time.time() - started < 1
+
+def test_prefers_higher_priority_source_over_faster_one(tmp_path, stub_server):
+    resolver = make_resolver(tmp_path, stub_server, ['slow', 'good'])
+    assert resolver.resolve('AAPL') == f"{stub_server}/slow/AAPL"
+
+def test_results_are_cached_including_misses(tmp_path, stub_server):
+    resolver = make_resolver(tmp_path, stub_server, ['missing', 'good'])
+    assert resolver.resolve('AAPL') == f"{stub_server}/good/AAPL"
+
+    missing = make_resolver(tmp_path, stub_server, ['missing'])
+    assert missing.resolve('MSFT') is None
+    probes = len(StubLogoHandler.requests_seen)
+
+    # A fresh resolver reads both entries back from disk without probing
+    reloaded = make_resolver(tmp_path, stub_server, ['missing', 'good'])
+    assert reloaded.resolve('AAPL') == f"{stub_server}/good/AAPL"
+    assert reloaded.resolve('MSFT') is None
+    assert len(StubLogoHandler.requests_seen) == probes
+
+def test_expired_entries_are_probed_again(tmp_path, stub_server):
+    resolver = make_resolver(tmp_path, stub_server, ['missing'])
+    resolver.negative_ttl = 0
+    resolver.resolve('AAPL')
+    time.sleep(0.01)
+    resolver.resolve('AAPL')
+    assert len(StubLogoHandler.requests_seen) == 2
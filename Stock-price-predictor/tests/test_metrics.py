@@ -0,0 +1,57 @@
+import asyncio
+import httpx
+from fastapi import APIRouter, FastAPI
+from app.utils.metrics import Histogram, MetricsMiddleware, Registry, registry as app_registry
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    histogram = registry.register(Histogram('stage_seconds', 'Stage durations', labelnames=('stage',), buckets=(0.1, 1)))
+    histogram.observe(0.05, stage='fit')
+    histogram.observe(0.1, stage='fit')
+    histogram.observe(5, stage='fit')
+
+    lines = registry.render().splitlines()
+    assert '# TYPE stage_seconds histogram' in lines
+    assert 'stage_seconds_bucket{stage="fit",le="0.1"} 2' in lines
+    assert 'stage_seconds_bucket{stage="fit",le="1.0"} 2' in lines
+    assert 'stage_seconds_bucket{stage="fit",le="+Inf"} 3' in lines
+    assert 'stage_seconds_count{stage="fit"} 3' in lines
+
+def test_collectors_render_counters_kept_elsewhere():
+    registry = Registry()
+    registry.register_collector(lambda: [
+        ('cache_lookups_total', 'counter', 'Cache lookups', [({'result': 'hit'}, 3)]),
+        ('cache_bytes', 'gauge', 'Cache size', [({}, 42)]),
+    ])
+
+    lines = registry.render().splitlines()
+    assert '# TYPE cache_lookups_total counter' in lines
+    assert 'cache_lookups_total{result="hit"} 3' in lines
+    assert 'cache_bytes 42' in lines
+
+def test_route_label_keeps_the_router_prefix():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    for prefix in ('/api/alpha', '/api/beta'):
+        router = APIRouter()
+
+        @router.get('/items/{item_id}')
+        async def item(item_id: str):
+            return {'id': item_id}
+
+        app.include_router(router, prefix=prefix)
+
+    async def get(path):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            return await client.get(path)
+
+    assert asyncio.run(get('/api/alpha/items/1')).status_code == 200
+    assert asyncio.run(get('/api/beta/items/2')).status_code == 200
+    assert asyncio.run(get('/missing')).status_code == 404
+
+    lines = app_registry.render().splitlines()
+    for route in ('/api/alpha/items/{item_id}', '/api/beta/items/{item_id}'):
+        assert f'http_request_duration_seconds_count{{method="GET",route="{route}",status="200"}} 1' in lines
+    assert 'http_request_duration_seconds_count{method="GET",route="unmatched",status="404"} 1' in lines
+    assert not any('route="/items/{item_id}"' in line for line in lines)
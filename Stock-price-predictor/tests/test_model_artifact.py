@@ -0,0 +1,67 @@
+import json
+import numpy as np
+import pytest
+from app.utils.stock_predictor import StockPredictor
+from app.utils.order_search import OrderSearch
+from app.utils.model_store import ModelStore
+from tests.test_stock_predictor import make_history
+
+def trained_predictor(history, order=(2, 1, 1)):
+    predictor = StockPredictor(OrderSearch(max_workers=1, orders=[order]), reselect_every=1000)
+    predictor.train(history)
+    return predictor
+
+def assert_same_forecast(full, compact, days=30):
+    expected = full.predict_next_days(days)['predictions']
+    actual = compact.predict_next_days(days)['predictions']
+    for field in ('predicted_price', 'lower_bound', 'upper_bound', 'confidence'):
+        np.testing.assert_allclose(
+            [row[field] for row in actual], [row[field] for row in expected], rtol=1e-9
+        )
+    for name, value in full.get_model_metrics().items():
+        assert compact.get_model_metrics()[name] == pytest.approx(value, rel=1e-9)
+
+def test_compact_predictor_matches_full_model():
+    full = trained_predictor(make_history(700))
+    compact = full.compact()
+
+    assert compact.training_data is None
+    assert_same_forecast(full, compact)
+
+def test_compact_update_matches_appending_to_full_model():
+    history = make_history(720)
+    full = trained_predictor(history[:700])
+    compact = full.compact()
+
+    assert full.update(history) and compact.update(history)
+    assert_same_forecast(full, compact)
+
+def test_artifact_round_trips_through_model_store(tmp_path):
+    predictor = trained_predictor(make_history(700)).compact()
+    store = ModelStore(root=str(tmp_path))
+    key = ('AAPL', '5y', '1d', 'grid', predictor.last_date.strftime('%Y-%m-%d'))
+
+    path = store.save(key, predictor)
+    assert len(json.dumps(json.load(open(path)))) < 20000
+
+    loaded = store.load(key)
+    assert_same_forecast(predictor, loaded)
+    assert store.load(key[:4] + ('2000-01-03',)) is None
+    assert store.latest('AAPL', '5y', '1d', 'grid') is not None
+    assert store.latest('MSFT', '5y', '1d', 'grid') is None
+
+def test_model_store_rejects_values_that_would_leave_its_directory(tmp_path):
+    predictor = trained_predictor(make_history(400)).compact()
+    store = ModelStore(root=str(tmp_path / 'models'))
+
+    for key in [
+        ('AAPL', '../../escape', '1d', 'grid', '2024-01-02'),
+        ('AAPL', '5y', '1d/../../escape', 'grid', '2024-01-02'),
+        ('AAPL', '5y', '1d', '../grid', '2024-01-02'),
+        ('../AAPL', '5y', '1d', 'grid', '2024-01-02'),
+    ]:
+        with pytest.raises(ValueError):
+            store.save(key, predictor)
+        assert store.load(key) is None
+    assert not (tmp_path / 'escape').exists()
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,32 @@
+import numpy as np
+from app.utils.model_cache import ModelCache, estimate_nbytes
+
+def test_evicts_least_recently_used_entry():
+    cache = ModelCache(max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1  # 'b' is now least recently used
+    cache.put('c', 3)
+
+    assert 'b' not in cache
+    assert cache.get('b') is None
+    assert cache.get('c') == 3
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions']) == (2, 1, 1)
+    assert stats['hit_rate'] == 2 / 3
+
+def test_byte_cap_evicts_but_keeps_the_newest_entry():
+    cache = ModelCache(max_bytes=100, sizeof=lambda value: value)
+    cache.put('a', 40)
+    cache.put('b', 40)
+    cache.put('c', 40)
+    assert 'a' not in cache and len(cache) == 2
+    assert cache.stats()['bytes'] == 80
+
+    cache.put('big', 500)
+    assert list(cache._entries) == ['big']
+    assert cache.stats()['evictions'] == 3
+
+def test_estimate_nbytes_counts_reachable_arrays():
+    value = {'params': np.zeros(10), 'resid': [np.zeros(5), np.zeros(5)]}
+    assert estimate_nbytes(value) == 20 * 8
@@ -0,0 +1,80 @@
+import time
+import types
+import numpy as np
+import pytest
+from app.utils import order_search
+from app.utils.order_search import OrderSearch, StepwiseSearch, kpss_ndiffs, make_order_search
+
+def test_kpss_ndiffs_differences_random_walks_only():
+    rng = np.random.default_rng(0)
+    noise = rng.normal(size=500)
+    assert kpss_ndiffs(noise) == 0
+    assert kpss_ndiffs(np.cumsum(noise)) == 1
+
+def test_stepwise_search_fits_fewer_candidates_than_its_range():
+    rng = np.random.default_rng(1)
+    prices = 100 + np.cumsum(rng.normal(0, 1, 400))
+    search = StepwiseSearch(max_workers=1)
+    order = search.search(prices)
+
+    assert order[1] == 1
+    assert search.best_aic is not None
+    assert 4 <= search.fits < (search.max_p + 1) * (search.max_q + 1)
+
+def test_make_order_search_modes():
+    assert isinstance(make_order_search('grid'), OrderSearch)
+    assert isinstance(make_order_search('stepwise', max_workers=1), StepwiseSearch)
+    with pytest.raises(ValueError):
+        make_order_search('exhaustive')
+
+def test_progress_reports_candidates_and_can_cancel():
+    from app.utils.order_search import TrainingCancelled
+    prices = 100 + np.cumsum(np.random.default_rng(2).normal(0, 1, 300))
+    seen = []
+
+    def progress(stage, details):
+        seen.append(details)
+        if len(seen) == 3:
+            raise TrainingCancelled()
+
+    search = OrderSearch(max_workers=1)
+    with pytest.raises(TrainingCancelled):
+        search.search(prices, progress=progress)
+    assert search.fits == 3
+    assert [details['fitted'] for details in seen] == [1, 2, 3]
+    assert seen[0]['total'] == 18
+
+def test_pool_search_picks_the_same_order_as_the_serial_grid():
+    prices = 100 + np.cumsum(np.random.default_rng(3).normal(0, 1, 400))
+    serial = OrderSearch(max_workers=1, patience=None)
+    pooled = OrderSearch(max_workers=2, patience=None)
+
+    assert pooled.search(prices) == serial.search(prices)
+    assert pooled.best_aic == pytest.approx(serial.best_aic)
+    assert pooled.fits == serial.fits == len(serial.orders)
+
+def test_candidate_over_its_timeout_is_skipped(monkeypatch):
+    class SlowARIMA:
+        def __init__(self, data, order):
+            self.order = order
+
+        def fit(self):
+            if self.order == (1, 1, 0):
+                time.sleep(5)
+            return types.SimpleNamespace(aic=float(sum(self.order)))
+
+    monkeypatch.setattr(order_search, 'arima_model', types.SimpleNamespace(ARIMA=SlowARIMA))
+    seen = []
+    search = OrderSearch(max_workers=1, candidate_timeout=0.2, patience=None, orders=[(1, 1, 0), (2, 1, 0)])
+    started = time.perf_counter()
+
+    assert search.search(np.arange(50.0), progress=lambda stage, details: seen.append(details)) == (2, 1, 0)
+    assert time.perf_counter() - started < 2
+    assert [details['aic'] for details in seen] == [None, 3.0]
+    assert search.fits == 2
+
+def test_service_searches_use_the_configured_timeout_and_patience():
+    for search in (make_order_search('grid'), make_order_search('stepwise')):
+        assert search.candidate_timeout == order_search.ORDER_SEARCH_TIMEOUT
+    assert make_order_search('grid').patience == order_search.ORDER_SEARCH_PATIENCE
+    assert order_search.ORDER_SEARCH_PATIENCE is not None
@@ -0,0 +1,37 @@
+import pickle
+import numpy as np
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+from app.utils.bars import Bars, FIELDS
+from app.utils.shared_bars import SharedBars
+from app.utils.stock_predictor import StockPredictor
+from tests.test_stock_predictor import make_history
+
+def test_shared_bars_round_trip_and_pickle_by_name():
+    bars = Bars.from_records(make_history(300))
+    with SharedBars.create(bars) as shared:
+        attached = pickle.loads(pickle.dumps(shared))
+        assert len(pickle.dumps(shared)) < 200
+        for copy in (shared, attached):
+            np.testing.assert_array_equal(copy.index, bars.index)
+            for field in FIELDS:
+                np.testing.assert_array_equal(getattr(copy, field), getattr(bars, field))
+        assert not shared.close.flags.writeable
+        attached.release()
+    assert len(shared) == 0
+
+def test_prepare_data_and_volatility_accept_shared_bars():
+    history = make_history(400)
+    expected_prices, expected_dates = StockPredictor().prepare_data(history)
+    with SharedBars.create(history) as shared:
+        predictor = StockPredictor()
+        prices, dates = predictor.prepare_data(shared)
+        np.testing.assert_array_equal(prices, expected_prices)
+        assert dates.equals(expected_dates)
+        assert predictor.calculate_volatility(shared) == pytest.approx(predictor.calculate_volatility(prices))
+
+def test_pool_worker_attaches_to_shared_bars():
+    history = make_history(400)
+    expected = StockPredictor().calculate_volatility(Bars.from_records(history))
+    with SharedBars.create(history) as shared, ProcessPoolExecutor(max_workers=1) as pool:
+        assert pool.submit(StockPredictor().calculate_volatility, shared).result() == pytest.approx(expected)
@@ -0,0 +1,55 @@
+import asyncio
+import pytest
+from app.utils.single_flight import SingleFlight
+
+def test_concurrent_calls_share_one_computation():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def work(key):
+        calls.append(key)
+        await asyncio.sleep(0.05)
+        return f"result-{key}"
+
+    async def run():
+        return await asyncio.gather(
+            *[flight.do('a', work, 'a') for _ in range(5)],
+            flight.do('b', work, 'b')
+        )
+
+    results = asyncio.run(run())
+    assert results == ['result-a'] * 5 + ['result-b']
+    assert sorted(calls) == ['a', 'b']
+    assert flight.stats() == {'in_flight': 0, 'started': 2, 'coalesced': 4}
+
+def test_errors_reach_every_waiter_and_release_the_key():
+    flight = SingleFlight("test")
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def run():
+        return await asyncio.gather(*[flight.do('a', fail) for _ in range(3)], return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flight.stats()['in_flight'] == 0
+
+def test_cancelled_waiter_does_not_cancel_shared_work():
+    flight = SingleFlight("test")
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return 42
+
+    async def run():
+        first = asyncio.ensure_future(flight.do('a', work))
+        second = asyncio.ensure_future(flight.do('a', work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == 42
@@ -0,0 +1,68 @@
+import asyncio
+import threading
+from fastapi import Request, Response
+from datetime import datetime, timedelta, timezone
+from app.routers import predictions
+from app.utils import executors
+from app.utils.bar_store import BarStore
+from app.utils.snapshots import SnapshotStore, build_snapshot, next_run
+from tests.test_bar_store import FakeProvider
+
+def make_snapshot(tmp_path):
+    bars = BarStore(root=str(tmp_path / 'bars'), provider=FakeProvider(), refresh_seconds=3600)
+    return build_snapshot(['AAPL', 'NEW'], history_period='2y', interval='1d', days=30,
+                          search='grid', workers=1, store=bars)
+
+def test_snapshot_is_written_versioned_and_served(tmp_path, monkeypatch):
+    store = SnapshotStore(root=str(tmp_path / 'snapshots'), keep=2)
+    workers = executors.cpu_lane.workers
+    snapshot = make_snapshot(tmp_path)
+    # The job runs on its own pool and leaves the shared one at its size
+    assert executors.cpu_lane.workers == workers
+    assert len(snapshot['symbols']['AAPL']['predictions']) == 30
+
+    store.write(snapshot)
+    assert store.versions() == [snapshot['version']]
+    assert store.lookup('aapl', '2y', '1d', 7, 'grid') is not None
+    assert store.lookup('AAPL', '2y', '1d', 60, 'grid') is None
+    assert store.lookup('AAPL', '5y', '1d', 7, 'grid') is None
+    assert store.lookup('AAPL', '2y', '1d', 7, 'stepwise') is None
+
+    lookup_threads = []
+    lookup = store.lookup
+
+    def recording_lookup(*args):
+        lookup_threads.append(threading.current_thread().name)
+        return lookup(*args)
+
+    monkeypatch.setattr(store, 'lookup', recording_lookup)
+    monkeypatch.setattr(predictions, 'snapshot_store', store)
+    response = asyncio.run(predictions.get_stock_forecast(
+        Request({'type': 'http', 'headers': []}), Response(), 'AAPL', days=7, history_period='2y', search='grid'))
+    assert response.source == 'snapshot'
+    # The snapshot file is read on the I/O pool, not the event loop
+    assert lookup_threads and all(name.startswith('io-worker') for name in lookup_threads)
+    assert response.snapshot_version == snapshot['version']
+    assert response.snapshot_age_seconds >= 0
+    assert [item.predicted_price for item in response.predictions] == [
+        item['predicted_price'] for item in snapshot['symbols']['AAPL']['predictions'][:7]
+    ]
+
+def test_stale_snapshot_is_ignored_and_old_versions_pruned(tmp_path):
+    store = SnapshotStore(root=str(tmp_path), max_age_hours=1, keep=2)
+    entry = {'predictions': [], 'model_metrics': {}, 'data_points_used': 300, 'last_bar_date': '2024-01-02'}
+    for hours_ago in (30, 20, 2):
+        created = datetime.now(timezone.utc) - timedelta(hours=hours_ago)
+        store.write({
+            'version': created.strftime('%Y%m%dT%H%M%SZ'), 'created_at': created.isoformat(),
+            'history_period': '5y', 'interval': '1d', 'search': 'grid', 'days': 30,
+            'symbols': {'AAPL': entry},
+        })
+
+    assert len(store.versions()) == 2
+    assert store.lookup('AAPL', '5y', '1d', 7, 'grid') is None
+
+def test_next_run_skips_weekends():
+    saturday = datetime(2024, 6, 8, 12, 0, tzinfo=timezone.utc)
+    run = next_run(saturday, run_at='16:30', tz='America/New_York')
+    assert (run.weekday(), run.hour, run.minute) == (0, 16, 30)
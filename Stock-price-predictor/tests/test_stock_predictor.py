@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+from statsmodels.tsa.arima.model import ARIMA
+from app.utils.stock_predictor import StockPredictor
+from app.utils.order_search import OrderSearch
+
+def make_history(n=600, seed=0):
+    """Synthetic daily bars shaped like get_historical_data output"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2020-01-01', periods=n)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return [
+        {
+            'date': date.strftime('%Y-%m-%d'),
+            'open': float(close),
+            'high': float(close * 1.01),
+            'low': float(close * 0.99),
+            'close': float(close),
+            'volume': 1000,
+        }
+        for date, close in zip(dates, closes)
+    ]
+
+def fitted_predictor(order=(1, 1, 1), n=600):
+    predictor = StockPredictor()
+    prices, _ = predictor.prepare_data(make_history(n))
+    predictor.training_data = prices
+    predictor.model = ARIMA(prices, order=order).fit()
+    return predictor
+
+def per_step_predictions(predictor, days):
+    """The original one-horizon-at-a-time loop, kept as the reference"""
+    forecast_mean = predictor.model.forecast(steps=days)
+    residuals = predictor.model.resid
+    rmse = np.sqrt(np.mean(residuals**2))
+    n = len(predictor.training_data)
+    spec = predictor.model.model._spec_arima
+    dof = n - (sum(spec.ar_lags) + sum(spec.ma_lags) + 1)
+
+    rows = []
+    for i in range(days):
+        pred = max(0.01, float(forecast_mean[i]))
+        h = i + 1
+        forecast_std = rmse * np.sqrt(1 + h/n + (h * (h-1))/(2 * n))
+        t_value = stats.t.ppf(0.975, dof)
+        model_uncertainty = t_value * forecast_std
+        market_uncertainty = pred * predictor.volatility * np.sqrt(h/252)
+        total_uncertainty = np.sqrt(model_uncertainty**2 + market_uncertainty**2)
+        lower = max(0.01, pred - total_uncertainty)
+        upper = pred + total_uncertainty
+        confidence_factors = [
+            0.95 * np.exp(-h/252),
+            1 - (forecast_std/pred),
+            stats.norm.cdf(-abs(residuals.mean())/residuals.std()),
+            1 - min(1, predictor.volatility/0.5),
+            1 - (total_uncertainty/pred)
+        ]
+        weights = [0.3, 0.25, 0.15, 0.15, 0.15]
+        confidence = max(0.70, min(0.95, sum(f * w for f, w in zip(confidence_factors, weights))))
+        rows.append((pred, lower, upper, confidence))
+    return np.array(rows)
+
+def test_vectorized_predictions_match_per_step_loop():
+    for order in [(1, 1, 1), (2, 0, 1), (0, 1, 2)]:
+        predictor = fitted_predictor(order)
+        result = predictor.predict_next_days(days=365)
+        expected = per_step_predictions(predictor, 365)
+        actual = np.array([
+            (p['predicted_price'], p['lower_bound'], p['upper_bound'], p['confidence'])
+            for p in result['predictions']
+        ])
+        np.testing.assert_allclose(actual, expected, rtol=1e-12, atol=1e-12)
+
+def test_prediction_dates_follow_last_business_day():
+    predictor = fitted_predictor()
+    predictions = predictor.predict_next_days(days=5)['predictions']
+    expected = pd.bdate_range(predictor.last_date, periods=6)[1:].strftime('%Y-%m-%d')
+    assert [p['date'] for p in predictions] == list(expected)
+    assert [p['day'] for p in predictions] == [1, 2, 3, 4, 5]
+
+def counting_predictor(**kwargs):
+    """Predictor with a one-order search that counts how often the search runs"""
+    predictor = StockPredictor(OrderSearch(max_workers=1, orders=[(1, 1, 0)]), **kwargs)
+    searches = []
+    search = predictor.find_best_parameters
+    predictor.find_best_parameters = lambda data, progress=None: searches.append(len(data)) or search(data, progress)
+    return predictor, searches
+
+def test_update_reselects_the_order_every_reselect_every_bars():
+    history = make_history(600)
+    predictor, searches = counting_predictor(reselect_every=5)
+    predictor.train(history[:590])
+
+    assert predictor.update(history[:593]) is True
+    assert len(searches) == 1 and predictor.bars_since_search == 3
+
+    # 3 + 7 new bars reach reselect_every: the order search runs again
+    assert predictor.update(history) is False
+    assert len(searches) == 2 and predictor.bars_since_search == 0
+    assert predictor.last_date == pd.Timestamp(history[-1]['date'])
+
+def test_update_retrains_when_one_step_errors_degrade():
+    history = make_history(600)
+    predictor, searches = counting_predictor(max_error_ratio=1e-6)
+    predictor.train(history[:595])
+
+    assert predictor.update(history) is False
+    assert len(searches) == 2
@@ -0,0 +1,64 @@
+import asyncio
+import json
+from app.routers import predictions
+
+def parse_events(body):
+    events = []
+    for block in body.strip().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.split('\n'))
+        events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+def test_stream_sends_progress_then_forecast(make_app):
+    api = make_app()
+
+    def get(days):
+        return api.get('/forecast/AAPL/stream', params={'days': days, 'history_period': '2y'})
+
+    response = get(5)
+    assert response.headers['content-type'].startswith('text/event-stream')
+    events = parse_events(response.text)
+    names = [name for name, _ in events]
+    assert names[:3] == ['started', 'history_loaded', 'data_prepared']
+    assert names.count('candidate') == 18
+    assert names[-3:] == ['order_selected', 'model_fitted', 'forecast']
+    assert len(events[-1][1]['predictions']) == 5
+
+    # The second request finds the trained model in the cache
+    names = [name for name, _ in parse_events(get(5).text)]
+    assert names == ['started', 'history_loaded', 'model_cached', 'forecast']
+
+    assert get(0).status_code == 400
+
+def test_forecast_joins_a_streamed_training_run(make_app, monkeypatch):
+    api = make_app()
+    params = {'days': 5, 'history_period': '2y'}
+
+    # Hold the streamed fit until the plain forecast request has arrived
+    fit_predictor = predictions._fit_predictor
+    async def gated_fit(*args):
+        for _ in range(500):
+            if predictions.training_flight.coalesced:
+                break
+            await asyncio.sleep(0.01)
+        return await fit_predictor(*args)
+    monkeypatch.setattr(predictions, '_fit_predictor', gated_fit)
+
+    async def overlap():
+        async with api.client() as client:
+            async def forecast():
+                # Send the plain forecast once the stream is training
+                while not predictions.training_flight.stats()['in_flight']:
+                    await asyncio.sleep(0.01)
+                return await client.get('/forecast/AAPL', params=params)
+            stream, response = await asyncio.gather(
+                client.get('/forecast/AAPL/stream', params=params), forecast()
+            )
+            assert parse_events(stream.text)[-1][0] == 'forecast'
+            return response
+
+    response = asyncio.run(overlap())
+    assert response.status_code == 200
+    stats = predictions.training_flight.stats()
+    assert stats['started'] == 1
+    assert stats['coalesced'] == 1
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+from app.utils.bars import Bars
+from app.utils.order_search import OrderSearch
+from app.utils.stock_predictor import StockPredictor
+from app.utils.training_data import TrainingWindow, trading_closes
+
+def make_bars(index, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+    return Bars(index, close, close * 1.01, close * 0.99, close, np.full(len(index), 1000))
+
+def test_daily_closes_match_business_day_reindex():
+    index = pd.bdate_range('2020-01-01', periods=400).delete([5, 6, 50, 51, 52]).values
+    index = np.concatenate([index, pd.date_range('2020-06-06', periods=2).values])  # a weekend
+    bars = make_bars(np.sort(index))
+
+    closes, dates, step = trading_closes(bars)
+
+    expected = pd.Series(bars.close, index=pd.DatetimeIndex(bars.index))
+    expected = expected.reindex(pd.bdate_range(expected.index.min(), expected.index.max())).ffill().dropna()
+    assert step == 1
+    np.testing.assert_array_equal(closes, expected.values)
+    np.testing.assert_array_equal(dates, expected.index.values.astype('datetime64[D]'))
+
+def test_intraday_bars_reduce_to_session_closes():
+    days = pd.bdate_range('2024-01-01', periods=30)
+    index = (days.values[:, None] + pd.to_timedelta([570, 630, 900], unit='m').values[None, :]).ravel()
+    bars = make_bars(index)
+
+    closes, dates, step = trading_closes(bars)
+
+    assert step == 1 and len(closes) == 30
+    np.testing.assert_array_equal(closes, bars.close[2::3])
+
+def test_weekly_bars_keep_their_spacing():
+    bars = make_bars(pd.date_range('2010-01-04', periods=300, freq='W-MON').values)
+    predictor = StockPredictor(OrderSearch(max_workers=1, orders=[(1, 1, 0)]))
+
+    prices, _ = predictor.prepare_data(bars)
+    assert predictor.step == 5 and len(prices) == 300
+
+    predictor.train(bars)
+    dates = pd.to_datetime([row['date'] for row in predictor.predict_next_days(3)['predictions']])
+    assert list(np.diff(dates).astype('timedelta64[D]').astype(int)) == [7, 7]
+
+def test_training_window_bounds_observations():
+    bars = make_bars(pd.bdate_range('2000-01-03', periods=6000).values)
+
+    prices, dates = StockPredictor(window=TrainingWindow(1000, None)).prepare_data(bars)
+    assert len(prices) == 1000 and dates[-1] == pd.Timestamp(bars.index[-1])
+
+    prices, dates = StockPredictor(window=TrainingWindow(None, 2)).prepare_data(bars)
+    assert 520 <= len(prices) <= 523
+
+    prices, _ = StockPredictor(window=TrainingWindow(None, None)).prepare_data(bars)
+    assert len(prices) == 6000
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.utils.stock_predictor import StockPredictor
+from app.utils.volatility import VolatilityState, simple_returns, window_volatility, ewma_volatility
+
+def reference_volatility(prices, window=30):
+    """The original rolling-std and full power-weight EWMA computation"""
+    returns = np.diff(prices) / prices[:-1]
+    rolling_std = pd.Series(returns).rolling(window=min(window, len(returns))).std()
+    hist_vol = float(rolling_std.iloc[-1] * np.sqrt(252))
+    weights = np.array([(1 - 0.94) * 0.94**i for i in range(len(returns))])[::-1]
+    weights = weights / weights.sum()
+    ewma_vol = np.sqrt(np.sum(weights * returns**2) * 252)
+    return hist_vol, ewma_vol, 0.4 * hist_vol + 0.4 * ewma_vol + 0.2 * hist_vol
+
+def random_prices(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+
+@pytest.mark.parametrize('n', [5, 31, 500, 20000])
+def test_estimators_match_original_computation(n):
+    prices = random_prices(n)
+    hist_vol, ewma_vol, combined = reference_volatility(prices)
+    returns = simple_returns(prices)
+
+    assert window_volatility(returns) == pytest.approx(hist_vol, rel=1e-12)
+    assert ewma_volatility(returns) == pytest.approx(ewma_vol, rel=1e-12)
+    assert StockPredictor().calculate_volatility(prices) == pytest.approx(combined, rel=1e-12)
+
+def test_incremental_state_matches_full_recomputation():
+    prices = random_prices(3000, seed=1)
+    state = VolatilityState.from_prices(prices[:2900])
+    state.update(prices[2900:2950])
+    state.update(prices[2950:])
+
+    hist_vol, ewma_vol, _ = reference_volatility(prices)
+    assert state.window_volatility() == pytest.approx(hist_vol, rel=1e-12)
+    assert state.ewma_volatility() == pytest.approx(ewma_vol, rel=1e-12)